@@ -9,8 +9,13 @@ from utils.streamlit_helpers import (
     setup_sidebar,
     initialize_session_state,
     display_chat_messages,
-    process_user_input,
-    process_image_upload,
+    chat_fragment,
+    process_uploads,
+    has_pending_ocr,
+    ocr_progress_fragment,
+    show_ocr_notices,
+    process_sweep_upload,
+    what_if_fragment,
     clear_conversation
 )
 
@@ -27,7 +32,7 @@ def main():
     # Configura a sidebar
     setup_sidebar()
 
-    # CSS para interface moderna
+    # CSS para interface moderna (um único bloco, injetado só nos reruns completos)
     st.markdown("""
     <style>
     .main-header {
@@ -64,27 +69,6 @@ def main():
         border-radius: 10px;
         border-left: 4px solid #667eea;
     }
-    </style>
-    """, unsafe_allow_html=True)
-
-    # Header moderno
-    st.markdown("""
-    <div class="main-header">
-        <div class="main-title">🍖 Milanesa</div>
-        <div class="subtitle">🎯 Seu Assistente Especializado em Teoria das Filas M/M/1</div>
-        <div class="tech-stack">🧠 Powered by Groq Llama 3.1 8B + 📸 OCR EasyOCR</div>
-    </div>
-    """, unsafe_allow_html=True)
-
-    # Inicializa o estado da sessão
-    initialize_session_state()
-
-    # Exibe mensagens do chat
-    display_chat_messages()
-
-    # CSS para estilizar o botão de câmera
-    st.markdown("""
-    <style>
     .camera-upload {
         position: fixed;
         bottom: 80px;
@@ -104,9 +88,22 @@ def main():
     </style>
     """, unsafe_allow_html=True)
 
-    # Input de texto principal
-    if prompt := st.chat_input("🍖 Pergunte ao Milanesa sobre M/M/1 ou envie uma foto 📸"):
-        process_user_input(prompt)
+    # Header moderno
+    st.markdown("""
+    <div class="main-header">
+        <div class="main-title">🍖 Milanesa</div>
+        <div class="subtitle">🎯 Seu Assistente Especializado em Teoria das Filas M/M/1</div>
+        <div class="tech-stack">🧠 Powered by Groq Llama 3.1 8B + 📸 OCR EasyOCR</div>
+    </div>
+    """, unsafe_allow_html=True)
+
+    # Inicializa o estado da sessão
+    initialize_session_state()
+
+    # Histórico (desenhado só nos reruns completos) e turnos novos em um fragmento:
+    # cada pergunta reexecuta apenas o chat_fragment, sem sidebar, CSS e histórico
+    display_chat_messages()
+    chat_fragment()
 
     # Upload de imagem estilizado na sidebar
     with st.sidebar:
@@ -116,19 +113,44 @@ def main():
             <h4 style="margin-top: 0; color: #667eea;">📸 Upload de Exercício</h4>
             <p style="font-size: 0.9rem; color: #666; margin-bottom: 1rem;">
                 Envie uma foto clara do exercício de M/M/1 e o Milanesa resolverá automaticamente!
+                Listas com várias fotos ou PDF são resolvidas em lote.
             </p>
         </div>
         """, unsafe_allow_html=True)
 
-        uploaded_file = st.file_uploader(
+        uploaded_files = st.file_uploader(
             "Escolher arquivo",
-            type=['png', 'jpg', 'jpeg'],
-            help="📸 Formatos aceitos: PNG, JPG, JPEG",
+            type=['png', 'jpg', 'jpeg', 'pdf'],
+            accept_multiple_files=True,
+            help="📸 Formatos aceitos: PNG, JPG, JPEG e PDF (vários arquivos de uma vez)",
             label_visibility="collapsed"
         )
 
-        if uploaded_file is not None:
-            process_image_upload(uploaded_file)
+        if uploaded_files:
+            process_uploads(uploaded_files)
+
+        # Acompanha o OCR em andamento sem bloquear a sessão (só o fragmento reexecuta)
+        show_ocr_notices()
+        if has_pending_ocr():
+            ocr_progress_fragment()
+
+        # Varredura de milhares de cenários (λ, μ, n, k, c) em arquivo
+        st.markdown("---")
+        st.markdown("#### 📊 Varredura de Cenários")
+        sweep_file = st.file_uploader(
+            "Arquivo de cenários",
+            type=['csv', 'parquet'],
+            help="Colunas lambda e mu (n, k e c servidores opcionais); uma linha por cenário",
+            key="sweep_upload"
+        )
+        sweep_format = st.radio("Formato do resultado", ["csv", "parquet"], horizontal=True, key="sweep_format")
+        if sweep_file:
+            process_sweep_upload(sweep_file, sweep_format)
+
+        # E se λ subir 10%? Métricas e curvas na hora, sem uma nova pergunta à IA
+        st.markdown("---")
+        st.markdown("#### 🔀 E se...?")
+        what_if_fragment()
 
     # Botão para limpar conversa
     clear_conversation()
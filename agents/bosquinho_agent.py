@@ -3,20 +3,33 @@ Agente principal Bosquinho - Especialista em Teoria das Filas M/M/1
 VERSÃO UNIVERSAL: A IA resolve QUALQUER problema
 """
 
+import time
+import logging
+from typing import Callable, Optional
+from langchain_core.messages import RemoveMessage
 from langgraph.graph import StateGraph, END
 from models.state import BosquinhoState
+from utils import tracing
 from agents.nodes import (
     extract_parameters,
+    match_catalog,
     identify_calculation_type,
     perform_calculation,
     generate_response
 )
 
+logger = tracing.get_logger("agent")
+
 
 class BosquinhoAgent:
     """Agente especializado em M/M/1 - IA resolve qualquer problema"""
 
-    def __init__(self):
+    def __init__(self, checkpointer=None):
+        """
+        checkpointer (ex.: utils.conversation_store.ConversationStore) guarda o estado por
+        thread_id; sem ele, cada chamada recebe o histórico inteiro em messages
+        """
+        self.checkpointer = checkpointer
         self.graph = self._create_graph()
 
     def _create_graph(self) -> StateGraph:
@@ -25,37 +38,122 @@ class BosquinhoAgent:
 
         # Adiciona os nós
         workflow.add_node("extract_parameters", extract_parameters)
+        workflow.add_node("match_catalog", match_catalog)
         workflow.add_node("identify_calculation", identify_calculation_type)
         workflow.add_node("perform_calculation", perform_calculation)
         workflow.add_node("generate_response", generate_response)
 
         # Define o fluxo
         workflow.set_entry_point("extract_parameters")
-        workflow.add_edge("extract_parameters", "identify_calculation")
+        workflow.add_edge("extract_parameters", "match_catalog")
+        workflow.add_edge("match_catalog", "identify_calculation")
         workflow.add_edge("identify_calculation", "perform_calculation")
         workflow.add_edge("perform_calculation", "generate_response")
         workflow.add_edge("generate_response", END)
 
-        return workflow.compile()
-
-    def process_message(self, messages: list) -> dict:
-        """Processa qualquer mensagem usando pipeline inteligente"""
+        return workflow.compile(checkpointer=self.checkpointer)
+
+    def _thread_input(self, message: dict, config: dict) -> dict:
+        """
+        Entrada de um turno em uma conversa persistida: só a nova mensagem, os campos do
+        turno anterior zerados e as mensagens além de CONVERSATION_WINDOW descartadas
+        """
+        from utils.conversation_store import CONVERSATION_WINDOW
+
+        history = self.graph.get_state(config).values.get("messages", [])
+        # A pergunta e a resposta deste turno entram na janela
+        excess = len(history) + 2 - CONVERSATION_WINDOW
+        removals = [RemoveMessage(id=old.id) for old in history[:max(excess, 0)]]
+
+        turn = {key: None for key in BosquinhoState.__annotations__ if key != "messages"}
+        turn["messages"] = removals + [{"role": "user", "content": message["content"]}]
+        return turn
+
+    def _run_graph(self, initial_state: dict, on_partial: Optional[Callable[[str], None]] = None,
+                   config: Optional[dict] = None) -> dict:
+        """
+        Executa o grafo registrando o tempo de cada nó em result["node_timings"]
+        Se um nó produz partial_response, on_partial recebe o texto antes dos nós seguintes
+        """
+        node_timings = {}
+        partial_sent = False
+        result = initial_state
+        last = time.perf_counter()
+
+        # Com checkpointer, o estado vai para o disco uma vez por turno (ao final)
+        stream = self.graph.stream(initial_state, config, stream_mode=["updates", "values"],
+                                   durability="exit" if config else None)
+        for mode, chunk in stream:
+            if mode == "updates":
+                now = time.perf_counter()
+                for node, update in chunk.items():
+                    node_timings[node] = now - last
+                    tracing.record_span(f"node.{node}", now - last)
+                    # Os nós devolvem o estado inteiro: a parcial é repassada só na primeira vez
+                    if on_partial and not partial_sent and (update or {}).get("partial_response"):
+                        on_partial(update["partial_response"])
+                        partial_sent = True
+                last = now
+            else:
+                result = chunk
+
+        result["node_timings"] = node_timings
+        return result
+
+    def process_message(self, messages: list, on_partial: Optional[Callable[[str], None]] = None,
+                        thread_id: Optional[str] = None) -> dict:
+        """
+        Processa qualquer mensagem usando pipeline inteligente
+        on_partial recebe a tabela calculada localmente assim que ela existe (antes da IA)
+        Com thread_id (e checkpointer), o histórico vem do disco: basta enviar a nova mensagem
+        """
         
-        print(f"🔍 DEBUG AGENT - Mensagem: {messages[-1]['content'][:100]}...")
+        with tracing.trace("agent.process_message", messages=len(messages)) as attributes:
+            result = self._process_message(messages, on_partial, thread_id)
+            if thread_id and self.checkpointer is not None:
+                self._save_turn(thread_id, messages[-1], result)
+            attributes["route"] = (result.get("calculation_result") or {}).get("type", "fallback")
+            return result
+
+    def _save_turn(self, thread_id: str, message: dict, result: dict):
+        """Acrescenta a pergunta e a resposta ao histórico completo da conversa"""
+        answer = result["messages"][-1] if result.get("messages") else None
+        content = answer.get("content", "") if isinstance(answer, dict) else str(getattr(answer, "content", ""))
+        # A mensagem vai inteira: append_messages só grava os campos extras que cabem em JSON
+        # (tempos e confiança do OCR) e descarta imagens e outros objetos
+        self.checkpointer.append_messages(thread_id, [
+            message,
+            {"role": "assistant", "content": content}
+        ])
+
+    def _process_message(self, messages: list, on_partial: Optional[Callable[[str], None]] = None,
+                         thread_id: Optional[str] = None) -> dict:
+        """Executa o pipeline, com a IA direta como fallback"""
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("🔍 Mensagem: %s...", messages[-1]['content'][:100])
         
         try:
             # Usa o pipeline LangGraph completo
-            initial_state = {"messages": messages}
+            config = None
+            if thread_id and self.checkpointer is not None:
+                config = {"configurable": {"thread_id": thread_id}}
+                initial_state = self._thread_input(messages[-1], config)
+            else:
+                initial_state = {"messages": messages}
+
+            # Pergunta vinda de imagem: repassa a confiança do OCR ao grafo
+            if isinstance(messages[-1], dict) and messages[-1].get("ocr"):
+                initial_state["ocr_result"] = messages[-1]["ocr"]
             
-            print("🔍 DEBUG AGENT - Executando pipeline universal...")
-            result = self.graph.invoke(initial_state)
+            logger.debug("🔍 Executando pipeline universal...")
+            result = self._run_graph(initial_state, on_partial, config)
             
-            print(f"✅ DEBUG AGENT - Pipeline concluído. Mensagens: {len(result['messages'])}")
+            logger.debug("✅ Pipeline concluído. Mensagens: %d", len(result['messages']))
             
             return result
 
         except Exception as e:
-            print(f"❌ ERROR AGENT - Erro no pipeline: {str(e)}")
+            logger.exception("❌ Erro no pipeline: %s", e)
             # Fallback: chama IA diretamente
             from utils.groq_client import groq_client
             
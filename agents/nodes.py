@@ -7,6 +7,11 @@ import re
 from typing import Dict, Any
 from models.state import BosquinhoState
 from utils.mm1_calculator import MM1Calculator
+from utils.exercise_catalog import get_catalog, format_solution, metric_label, STANDARD_METRICS, METRIC_SPEC
+from utils.semantic_cache import ASKED_METRICS
+from utils.tracing import get_logger
+
+logger = get_logger("nodes")
 
 
 def extract_parameters(state: BosquinhoState) -> BosquinhoState:
@@ -98,11 +103,55 @@ def extract_parameters(state: BosquinhoState) -> BosquinhoState:
     return state
 
 
+def _last_content(state: BosquinhoState) -> str:
+    last_message = state["messages"][-1]
+    if isinstance(last_message, dict):
+        return last_message.get("content", "")
+    return str(getattr(last_message, "content", last_message))
+
+
+def _metric_family(metric: str) -> str:
+    """Nome do catálogo (P2, P_greater_3, P_leq_1) na família de métrica pedida (Pn, P_greater, P_leq)"""
+    spec = METRIC_SPEC.match(metric)
+    if spec is None:
+        return metric
+    return "Pn" if spec.group("n") else "P_greater" if spec.group("k") else "P_leq"
+
+
+def catalog_answers(exercise_id: str, question: str) -> bool:
+    """A solução do catálogo traz todas as métricas que a pergunta pede"""
+    exercise = get_catalog().get(exercise_id)
+    answered = set(STANDARD_METRICS) | {_metric_family(metric) for metric in exercise["metrics"]}
+    return all(name in answered for name, pattern in ASKED_METRICS.items() if pattern.search(question))
+
+
+def match_catalog(state: BosquinhoState) -> BosquinhoState:
+    """Procura a pergunta no catálogo de exercícios com solução verificada"""
+    if not state.get("messages"):
+        return state
+
+    content = _last_content(state)
+    exercise = get_catalog().match(content, state.get("lambda_rate"), state.get("mu_rate"))
+    if exercise:
+        logger.debug("📚 Exercício do catálogo: %s", exercise["id"])
+        state["catalog_exercise_id"] = exercise["id"]
+
+    return state
+
+
 def identify_calculation_type(state: BosquinhoState) -> BosquinhoState:
     """Identifica tipo de cálculo - versão que prioriza a IA"""
     if not state.get("messages"):
         return state
 
+    # PRIORIDADE 0: Exercício conhecido, respondido com a solução verificada do catálogo -
+    # só se ela traz as métricas pedidas (outra métrica do mesmo cenário segue as rotas abaixo)
+    if state.get("catalog_exercise_id"):
+        if catalog_answers(state["catalog_exercise_id"], _last_content(state)):
+            state["calculation_result"] = {"type": "catalog", "exercise_id": state["catalog_exercise_id"]}
+            return state
+        state["catalog_exercise_id"] = None
+
     # PRIORIDADE 1: Se é um problema completo, deixa a IA resolver tudo
     if state.get("is_complete_problem"):
         state["calculation_result"] = {"type": "ai_solve_complete"}
@@ -131,6 +180,14 @@ def perform_calculation(state: BosquinhoState) -> BosquinhoState:
 
     calc_type = state["calculation_result"].get("type")
 
+    # Exercício do catálogo: resultados memorizados, sem recalcular
+    if calc_type == "catalog":
+        exercise = get_catalog().get(state["catalog_exercise_id"])
+        state["calculation_result"].update(get_catalog().solve(exercise["id"]))
+        state["calculation_result"]["lambda"] = exercise["lambda_rate"]
+        state["calculation_result"]["mu"] = exercise["mu_rate"]
+        return state
+
     # ÚNICA situação onde fazemos cálculos: quando temos λ e μ claros
     if calc_type == "calculate_and_explain":
         if state.get("lambda_rate") is not None and state.get("mu_rate") is not None:
@@ -152,12 +209,46 @@ def perform_calculation(state: BosquinhoState) -> BosquinhoState:
 
                 state["calculation_result"].update(results)
 
+                # Resposta parcial: a tabela já pode ser mostrada enquanto a IA escreve a explicação
+                state["partial_response"] = format_metrics_table(state["calculation_result"])
+
             except Exception as e:
                 state["error_message"] = f"Erro no cálculo: {str(e)}"
 
     return state
 
 
+def describe_ocr_confidence(ocr_result: Dict) -> str:
+    """Resume a confiança do OCR para a IA saber quais números conferir"""
+    description = f"\nTexto lido de imagem (confiança média do OCR: {ocr_result.get('confidence', 0):.0%})\n"
+
+    uncertain = ocr_result.get("low_confidence_numbers") or []
+    if uncertain:
+        readings = ", ".join(f"'{item['text']}' ({item['confidence']:.0%})" for item in uncertain)
+        description += f"Números com leitura incerta (confira pelo contexto): {readings}\n"
+
+    return description
+
+
+def format_metrics_table(calc_result: Dict) -> str:
+    """Tabela markdown com as métricas calculadas localmente (primeira parte da resposta)"""
+    lines = [
+        f"🍖 **Resultados calculados** (λ = {calc_result['lambda']:.4g} · μ = {calc_result['mu']:.4g})",
+        "",
+        "| Métrica | Resultado |",
+        "|---|---|"
+    ]
+    for metric in STANDARD_METRICS:
+        result = calc_result.get(metric, {})
+        value = result.get("error") or f"{result['value']:.4f}"
+        lines.append(f"| {metric_label(metric)} | {value} |")
+
+    rho = calc_result.get("rho", {}).get("value")
+    if rho is not None:
+        lines += ["", f"{'✅ Sistema estável' if rho < 1 else '⚠️ Sistema instável'} (ρ = {rho:.2%})."]
+    return "\n".join(lines)
+
+
 def generate_response(state: BosquinhoState) -> BosquinhoState:
     """Gera resposta usando IA - versão que delega tudo para o Groq"""
     from utils.groq_client import groq_client
@@ -176,16 +267,22 @@ def generate_response(state: BosquinhoState) -> BosquinhoState:
         except Exception:
             user_question = ""
 
-    print(f"🔍 DEBUG RESPONSE - Preparando resposta...")
+    logger.debug("🔍 Preparando resposta...")
 
     try:
         # Se há erro, trata o erro
         if state.get("error_message"):
             response = groq_client.handle_error_with_context(user_question, state['error_message'])
 
+        # Exercício conhecido: resposta montada da solução verificada, sem IA
+        elif state.get("calculation_result") and state["calculation_result"].get("type") == "catalog":
+            logger.debug("✅ Resposta do catálogo")
+            exercise_id = state["calculation_result"]["exercise_id"]
+            response = format_solution(get_catalog().get(exercise_id), get_catalog().solve(exercise_id))
+
         # Se calculamos métricas, passa resultados para IA explicar
         elif state.get("calculation_result") and state["calculation_result"].get("type") == "calculate_and_explain":
-            print("✅ DEBUG RESPONSE - IA explicará cálculos realizados")
+            logger.debug("✅ IA explicará cálculos realizados")
 
             # Cria contexto detalhado para a IA
             calc_result = state["calculation_result"]
@@ -206,12 +303,17 @@ Resultados:
 
 Status do sistema: {'Estável' if calc_result.get('rho', {}).get('value', 1) < 1 else 'Instável'}
 """
+            if state.get("ocr_result"):
+                context += describe_ocr_confidence(state["ocr_result"])
 
             response = groq_client.solve_with_calculations(user_question, context)
+            # A tabela já foi mostrada como resposta parcial; a explicação entra logo abaixo
+            if state.get("partial_response"):
+                response = f"{state['partial_response']}\n\n---\n\n{response}"
 
         # Para TODOS os outros casos, IA resolve do zero
         else:
-            print("✅ DEBUG RESPONSE - IA resolverá problema do zero")
+            logger.debug("✅ IA resolverá problema do zero")
 
             # Prepara contexto com informações coletadas
             context = {}
@@ -223,17 +325,18 @@ Status do sistema: {'Estável' if calc_result.get('rho', {}).get('value', 1) < 1
                 context["numbers_found"] = state["found_numbers"]
             if state.get("is_complete_problem"):
                 context["is_complete_problem"] = True
+            if state.get("ocr_result"):
+                context["ocr_confidence"] = describe_ocr_confidence(state["ocr_result"])
 
             response = groq_client.solve_any_mm1_problem(user_question, context)
 
     except Exception as e:
-        print(f"❌ DEBUG RESPONSE - Erro: {e}")
+        logger.error("❌ Erro ao gerar resposta: %s", e)
         response = f"🌳 **Bosquinho aqui!** Tive um problema técnico: {str(e)}"
 
-    # Adiciona resposta às mensagens
-    if "messages" not in state:
-        state["messages"] = []
-    state["messages"].append({"role": "assistant", "content": response})
+    # Adiciona resposta às mensagens (lista nova: a do estado é a mesma do canal do grafo
+    # e, alterada no lugar, a resposta entraria duas vezes pelo add_messages)
+    state["messages"] = list(state.get("messages") or []) + [{"role": "assistant", "content": response}]
 
-    print(f"✅ DEBUG RESPONSE - Resposta gerada: {len(response)} chars")
+    logger.debug("✅ Resposta gerada: %d chars", len(response))
     return state
\ No newline at end of file
@@ -0,0 +1 @@
+# API HTTP do sistema Bosquinho
@@ -0,0 +1,25 @@
+"""
+Sobe a API com vários workers do uvicorn
+
+    python -m api --workers 4 --port 8000
+"""
+
+import os
+import argparse
+import uvicorn
+
+
+def main():
+    parser = argparse.ArgumentParser(description="API HTTP do Bosquinho (ASGI)")
+    parser.add_argument("--host", default=os.getenv("API_HOST", "127.0.0.1"))
+    parser.add_argument("--port", type=int, default=int(os.getenv("API_PORT", "8000")))
+    parser.add_argument("--workers", type=int, default=int(os.getenv("API_WORKERS", str(os.cpu_count() or 1))))
+    args = parser.parse_args()
+
+    # Com mais de um worker o uvicorn precisa do app como "módulo:atributo"
+    uvicorn.run("api.app:app", host=args.host, port=args.port, workers=args.workers,
+                log_level=os.getenv("LOG_LEVEL", "warning").lower())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,372 @@
+"""
+API HTTP (ASGI/Starlette) do sistema Bosquinho - sem Streamlit
+
+Rotas:
+- GET  /health
+- POST /v1/calculate        métricas de um cenário {"lambda", "mu", "n"?, "k"?, "metrics"?}
+- POST /v1/calculate/batch  {"scenarios": [...]} (até API_MAX_BATCH cenários)
+- POST /v1/chat             {"messages": [...]} -> resposta do agente; com "stream": true ou
+                            Accept: text/event-stream devolve SSE (partial, answer, done);
+                            com "thread_id" a conversa fica salva e basta enviar a nova pergunta
+- POST /v1/ocr              upload multipart (campo "file", imagem ou PDF) -> texto lido
+- POST /v1/sweep            arquivo CSV/Parquet de cenários (multipart "file" ou corpo bruto)
+                            -> métricas em CSV ou Parquet (?output=parquet), em streaming
+
+Cada worker do uvicorn tem seu próprio agente e seu pool de OCR; o agente roda em
+threads limitadas por API_AGENT_CONCURRENCY para não bloquear o loop de eventos.
+
+Uso:
+    python -m api --workers 4 --port 8000
+"""
+
+import io
+import os
+import json
+import math
+import asyncio
+import itertools
+import tempfile
+from contextlib import asynccontextmanager
+from typing import Any, Dict, List, Optional
+
+import anyio
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse, StreamingResponse
+from starlette.routing import Route
+
+from utils import tracing
+from utils.exercise_catalog import calculate_metric, STANDARD_METRICS
+from utils.sweep import file_format, iter_sweep
+
+
+API_MAX_BATCH = int(os.getenv("API_MAX_BATCH", "10000"))
+API_AGENT_CONCURRENCY = int(os.getenv("API_AGENT_CONCURRENCY", "32"))
+# Corpo bruto da varredura fica em memória até este tamanho; acima disso vai para disco
+SWEEP_SPOOL_BYTES = 8 * 1024 * 1024
+
+SWEEP_MEDIA_TYPES = {"csv": "text/csv", "parquet": "application/vnd.apache.parquet"}
+
+logger = tracing.get_logger("api")
+
+
+class APIError(Exception):
+    """Erro de entrada devolvido ao cliente como {"error": ...}"""
+
+    def __init__(self, message: str, status_code: int = 400):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+# Maior n/k aceito (índices inteiros de 64 bits)
+MAX_INDEX = 2 ** 63 - 1
+
+
+def _number(scenario: Dict[str, Any], *keys: str, required: bool = True) -> Optional[float]:
+    for key in keys:
+        if scenario.get(key) is not None:
+            value = scenario[key]
+            try:
+                if isinstance(value, bool):
+                    raise TypeError
+                number = float(value)
+            except (TypeError, ValueError):
+                raise APIError(f"Valor inválido para {key}: {value!r}")
+            except OverflowError:
+                # Inteiro do JSON grande demais para float
+                raise APIError(f"Valor de {key} deve ser um número finito (grande demais)")
+            # NaN/Infinity chegam pelo JSON ("inf" também passa pelo float) e não voltam na resposta
+            if not math.isfinite(number):
+                raise APIError(f"Valor de {key} deve ser um número finito: {value!r}")
+            return number
+    if required:
+        raise APIError(f"Campo obrigatório ausente: {keys[0]}")
+    return None
+
+
+def _index(scenario: Dict[str, Any], key: str) -> Optional[int]:
+    """n ou k opcionais: inteiros não-negativos"""
+    value = scenario.get(key)
+    # Inteiros do JSON são conferidos como int: como float, 2^63 - 1 arredonda para 2^63
+    if isinstance(value, int) and not isinstance(value, bool):
+        if not 0 <= value <= MAX_INDEX:
+            raise APIError(f"Valor de {key} deve ser inteiro entre 0 e {MAX_INDEX}")
+        return value
+
+    value = _number(scenario, key, required=False)
+    if value is None:
+        return None
+    if value < 0 or value != math.floor(value) or value > MAX_INDEX:
+        raise APIError(f"Valor de {key} deve ser inteiro entre 0 e {MAX_INDEX}: {scenario[key]!r}")
+    return int(value)
+
+
+def calculate_scenario(scenario: Dict[str, Any]) -> Dict[str, Any]:
+    """Métricas de um cenário; erros de cálculo ficam por métrica, como no MM1Calculator"""
+    if not isinstance(scenario, dict):
+        raise APIError("Cada cenário deve ser um objeto JSON")
+
+    lambda_rate = _number(scenario, "lambda", "lambda_rate")
+    mu_rate = _number(scenario, "mu", "mu_rate")
+    if mu_rate and not math.isfinite(lambda_rate / mu_rate):
+        raise APIError("λ/μ grande demais para ser representado")
+    n = _index(scenario, "n")
+    k = _index(scenario, "k")
+
+    metrics = scenario.get("metrics")
+    if metrics is None:
+        metrics = list(STANDARD_METRICS)
+    if not isinstance(metrics, list) or not all(isinstance(metric, str) for metric in metrics):
+        raise APIError("metrics deve ser uma lista de nomes (rho, L, Lq, W, Wq, P0, P3, P_greater_2...)")
+    if n is not None:
+        metrics = metrics + [f"P{n}"]
+    if k is not None:
+        metrics = metrics + [f"P_greater_{k}"]
+    if not metrics:
+        raise APIError("Nenhuma métrica pedida: metrics vazia e sem n ou k")
+
+    return {
+        "lambda": lambda_rate,
+        "mu": mu_rate,
+        "results": {
+            metric: calculate_metric(metric, lambda_rate, mu_rate)
+            for metric in dict.fromkeys(metrics)
+        }
+    }
+
+
+def _message_content(message: Any) -> str:
+    if isinstance(message, dict):
+        return message.get("content", "")
+    return str(getattr(message, "content", message))
+
+
+def _parse_messages(payload: Dict[str, Any]) -> List[Dict[str, str]]:
+    messages = payload.get("messages")
+    if isinstance(payload.get("question"), str):
+        messages = [{"role": "user", "content": payload["question"]}]
+    if not messages or not isinstance(messages, list):
+        raise APIError("Envie messages: [{role, content}, ...] ou question")
+    for message in messages:
+        if not isinstance(message, dict) or message.get("role") not in ("user", "assistant") \
+                or not isinstance(message.get("content"), str):
+            raise APIError("Cada mensagem precisa de role (user/assistant) e content (texto)")
+    if messages[-1]["role"] != "user":
+        raise APIError("A última mensagem deve ser do usuário")
+    return [{"role": message["role"], "content": message["content"]} for message in messages]
+
+
+def _agent_reply(result: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "answer": _message_content(result["messages"][-1]) if result.get("messages") else "",
+        "route": (result.get("calculation_result") or {}).get("type", "fallback"),
+        "node_timings_ms": {
+            node: round(seconds * 1000, 2) for node, seconds in (result.get("node_timings") or {}).items()
+        }
+    }
+
+
+async def _json_body(request: Request) -> Dict[str, Any]:
+    try:
+        payload = await request.json()
+    except (json.JSONDecodeError, UnicodeDecodeError):
+        raise APIError("Corpo da requisição não é JSON válido")
+    if not isinstance(payload, dict):
+        raise APIError("O corpo deve ser um objeto JSON")
+    return payload
+
+
+async def health(request: Request) -> JSONResponse:
+    return JSONResponse({"status": "ok", "pid": os.getpid()})
+
+
+async def calculate(request: Request) -> JSONResponse:
+    return JSONResponse(calculate_scenario(await _json_body(request)))
+
+
+async def calculate_batch(request: Request) -> JSONResponse:
+    scenarios = (await _json_body(request)).get("scenarios")
+    if not isinstance(scenarios, list):
+        raise APIError("Envie scenarios: [{lambda, mu, ...}, ...]")
+    if len(scenarios) > API_MAX_BATCH:
+        raise APIError(f"Máximo de {API_MAX_BATCH} cenários por requisição", status_code=413)
+
+    results = []
+    for index, scenario in enumerate(scenarios):
+        try:
+            results.append(calculate_scenario(scenario))
+        except APIError as e:
+            results.append({"index": index, "error": str(e)})
+    return JSONResponse({"results": results})
+
+
+def _sse(event: str, data: Dict[str, Any]) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+async def chat(request: Request):
+    payload = await _json_body(request)
+    messages = _parse_messages(payload)
+    thread_id = payload.get("thread_id")
+    if thread_id is not None and (not isinstance(thread_id, str) or not thread_id):
+        raise APIError("thread_id deve ser um texto não vazio")
+    agent = request.app.state.agent
+    limiter = request.app.state.agent_limiter
+
+    stream = payload.get("stream") or "text/event-stream" in request.headers.get("accept", "")
+    if not stream:
+        result = await anyio.to_thread.run_sync(
+            lambda: agent.process_message(messages, thread_id=thread_id), limiter=limiter
+        )
+        return JSONResponse(_agent_reply(result))
+
+    loop = asyncio.get_running_loop()
+    queue: asyncio.Queue = asyncio.Queue()
+
+    def on_partial(text: str):
+        loop.call_soon_threadsafe(queue.put_nowait, ("partial", {"content": text}))
+
+    async def run_agent():
+        try:
+            result = await anyio.to_thread.run_sync(
+                lambda: agent.process_message(messages, on_partial=on_partial, thread_id=thread_id),
+                limiter=limiter
+            )
+            await queue.put(("answer", _agent_reply(result)))
+        except Exception as e:
+            logger.exception("Erro no agente: %s", e)
+            await queue.put(("error", {"error": str(e)}))
+        await queue.put(None)
+
+    async def events():
+        task = asyncio.create_task(run_agent())
+        try:
+            while (item := await queue.get()) is not None:
+                yield _sse(*item)
+            yield _sse("done", {})
+        finally:
+            # Cliente desconectou: a thread do agente termina sozinha, só não esperamos por ela
+            if not task.done():
+                task.cancel()
+
+    return StreamingResponse(events(), media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+
+async def ocr(request: Request) -> JSONResponse:
+    from PIL import Image
+    from utils.ocr_processor import OCRProcessor
+
+    service = request.app.state.ocr_service
+    if service is None or not service.is_available():
+        raise APIError("OCR não disponível neste servidor (pip install easyocr)", status_code=503)
+
+    form = await request.form()
+    upload = form.get("file")
+    if upload is None or not hasattr(upload, "read"):
+        raise APIError("Envie o arquivo no campo multipart 'file'")
+    data = await upload.read()
+    name = upload.filename or "upload"
+
+    if OCRProcessor.is_pdf(data, name):
+        pages = []
+        for future in service.submit_document(data, name):
+            pages.extend(await asyncio.wrap_future(future))
+        return JSONResponse({
+            "source": name,
+            "pages": [{"page": page["page"], "clean_text": page["clean_text"]} for page in pages]
+        })
+
+    try:
+        image = Image.open(io.BytesIO(data))
+        image.load()
+    except Exception:
+        raise APIError("Arquivo não é uma imagem ou PDF válido")
+
+    result = await asyncio.wrap_future(service.submit(image))
+    layout = result.get("layout") or {}
+    return JSONResponse({
+        "source": name,
+        "raw_text": result["raw_text"],
+        "clean_text": result["clean_text"],
+        "confidence": layout.get("confidence"),
+        "low_confidence_numbers": layout.get("low_confidence_numbers", []),
+        "timings_ms": {stage: round(seconds * 1000, 1) for stage, seconds in result.get("timings", {}).items()}
+    })
+
+
+async def sweep(request: Request) -> StreamingResponse:
+    output_format = request.query_params.get("output", "csv")
+    if output_format not in SWEEP_MEDIA_TYPES:
+        raise APIError("output deve ser csv ou parquet")
+
+    if request.headers.get("content-type", "").startswith("multipart/form-data"):
+        form = await request.form()
+        upload = form.get("file")
+        if upload is None or not hasattr(upload, "read"):
+            raise APIError("Envie o arquivo no campo multipart 'file'")
+        source, name = upload.file, upload.filename or ""
+    else:
+        source = tempfile.SpooledTemporaryFile(max_size=SWEEP_SPOOL_BYTES)
+        async for data in request.stream():
+            source.write(data)
+        source.seek(0)
+        name = request.query_params.get("input", "")
+        if "parquet" in request.headers.get("content-type", ""):
+            name = name or "upload.parquet"
+
+    input_format = request.query_params.get("input") or file_format(name)
+    chunks = iter_sweep(source, input_format, output_format)
+    # Primeiro bloco antes da resposta: coluna ausente ou arquivo ilegível ainda vira erro 400
+    try:
+        first = await anyio.to_thread.run_sync(next, chunks, None)
+    except Exception as e:
+        raise APIError(f"Não consegui ler os cenários: {e}")
+
+    return StreamingResponse(
+        itertools.chain([first] if first is not None else [], chunks),
+        media_type=SWEEP_MEDIA_TYPES[output_format],
+        headers={"Content-Disposition": f'attachment; filename="resultados.{output_format}"'}
+    )
+
+
+async def api_error(request: Request, exc: APIError) -> JSONResponse:
+    return JSONResponse({"error": str(exc)}, status_code=exc.status_code)
+
+
+@asynccontextmanager
+async def lifespan(app: Starlette):
+    """Agente e pool de OCR por worker (criados depois do fork do uvicorn)"""
+    from agents.bosquinho_agent import BosquinhoAgent
+    from utils.conversation_store import get_conversation_store
+
+    app.state.agent = BosquinhoAgent(checkpointer=get_conversation_store())
+    app.state.agent_limiter = anyio.CapacityLimiter(API_AGENT_CONCURRENCY)
+    app.state.ocr_service = None
+    if os.getenv("API_OCR", "1").lower() in ("1", "true", "yes"):
+        from utils.ocr_processor import OCRWorkerService
+        app.state.ocr_service = OCRWorkerService()
+    logger.info("Worker %s pronto", os.getpid())
+    try:
+        yield
+    finally:
+        if app.state.ocr_service is not None:
+            app.state.ocr_service.shutdown()
+
+
+def create_app() -> Starlette:
+    return Starlette(
+        routes=[
+            Route("/health", health, methods=["GET"]),
+            Route("/v1/calculate", calculate, methods=["POST"]),
+            Route("/v1/calculate/batch", calculate_batch, methods=["POST"]),
+            Route("/v1/chat", chat, methods=["POST"]),
+            Route("/v1/ocr", ocr, methods=["POST"]),
+            Route("/v1/sweep", sweep, methods=["POST"])
+        ],
+        exception_handlers={APIError: api_error},
+        lifespan=lifespan
+    )
+
+
+app = create_app()
@@ -0,0 +1,165 @@
+"""
+Microbenchmarks dos caminhos quentes em Python puro (pytest-benchmark)
+
+- MM1Calculator: todas as métricas de um sistema e varredura grande de (λ, μ)
+- extract_parameters: pergunta curta, OCR longo e prompt adversarial cheio de números
+- OCRProcessor.clean_and_format_text: páginas de OCR longas e texto só de números
+- clean_qwen_response: respostas longas com e sem bloco <think>
+- ExerciseCatalog.match: pergunta conhecida (por parâmetros) e pergunta nova
+- sweep.compute_metrics: a mesma varredura de (λ, μ) da calculadora, vetorizada
+
+Não é coletado pelo `pytest` da raiz (o nome não começa com test_); rode explicitamente.
+
+Gate de regressão (baseline local, gravado na primeira execução; veja benchmarks/gate.py):
+    python benchmarks/gate.py
+"""
+
+import os
+import sys
+import random
+import pytest
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+pytest.importorskip("pytest_benchmark")
+
+from agents.nodes import extract_parameters
+from utils.mm1_calculator import MM1Calculator
+from utils.ocr_processor import OCRProcessor
+from utils.streamlit_helpers import clean_qwen_response
+from utils.exercise_catalog import get_catalog
+from utils.sweep import compute_metrics
+from bench_text_normalizer import OCR_CORPUS
+
+
+SWEEP_SIZE = 2000
+
+RNG = random.Random(42)
+
+# Pares (λ, μ) estáveis e instáveis, como numa varredura de cenários
+SWEEP = [
+    (round(RNG.uniform(0.1, 50.0), 3), round(RNG.uniform(0.1, 60.0), 3))
+    for _ in range(SWEEP_SIZE)
+]
+
+# Várias páginas de OCR: exercícios reais misturados com ruído de layout
+LONG_OCR_TEXT = "\n".join(
+    f"Exercício {index + 1}) {text} | Resp.: ______ pág. {index // 4 + 1}"
+    for index, (text, _, _) in enumerate(OCR_CORPUS * 20)
+)
+
+# Prompt adversarial: centenas de números, frações e razões antes das palavras-chave
+NUMBER_HEAVY_PROMPT = (
+    " ".join(f"{RNG.randint(0, 999)}.{RNG.randint(0, 99)} {RNG.randint(1, 9)}/{RNG.randint(1, 9)} "
+             f"{RNG.randint(1, 9)}:{RNG.randint(1, 9)}" for _ in range(300))
+    + " taxa de chegada 12 por hora e taxa de atendimento 18 por hora"
+)
+
+NUMBER_HEAVY_OCR = "\n".join(
+    " ".join(f"{RNG.randint(0, 99)},{RNG.randint(0, 99)} À = 1O u = 1/{RNG.randint(2, 9)}" for _ in range(10))
+    for _ in range(100)
+)
+
+LONG_ANSWER = "\n".join(
+    f"**Passo {step}:** L = ρ/(1-ρ) = 0,6667/(1-0,6667) = 2,0000 clientes" for step in range(200)
+)
+
+THINK_ANSWER = "<think>" + "Vamos calcular ρ, L e W passo a passo. " * 500 + "</think>\n" + LONG_ANSWER
+
+
+@pytest.fixture(scope="module")
+def processor():
+    # Reader fictício: clean_and_format_text não usa o EasyOCR
+    return OCRProcessor(reader=object())
+
+
+def _state(content: str) -> dict:
+    return {"messages": [{"role": "user", "content": content}], "lambda_rate": None, "mu_rate": None}
+
+
+def _all_metrics(lambda_rate: float, mu_rate: float) -> list:
+    return [
+        MM1Calculator.calculate_rho(lambda_rate, mu_rate),
+        MM1Calculator.calculate_L(lambda_rate, mu_rate),
+        MM1Calculator.calculate_Lq(lambda_rate, mu_rate),
+        MM1Calculator.calculate_W(lambda_rate, mu_rate),
+        MM1Calculator.calculate_Wq(lambda_rate, mu_rate),
+        MM1Calculator.calculate_P0(lambda_rate, mu_rate),
+        MM1Calculator.calculate_Pn(lambda_rate, mu_rate, 3),
+        MM1Calculator.calculate_P_greater_than_k(lambda_rate, mu_rate, 3)
+    ]
+
+
+@pytest.mark.benchmark(group="calculator")
+def test_calculator_all_metrics(benchmark):
+    results = benchmark(_all_metrics, 2.0, 3.0)
+    assert all("error" not in result for result in results)
+
+
+@pytest.mark.benchmark(group="calculator")
+def test_calculator_sweep(benchmark):
+    results = benchmark(lambda: [_all_metrics(lambda_rate, mu_rate) for lambda_rate, mu_rate in SWEEP])
+    assert len(results) == SWEEP_SIZE
+
+
+@pytest.mark.benchmark(group="extract_parameters")
+def test_extract_short_prompt(benchmark):
+    state = benchmark(lambda: extract_parameters(_state("Um banco tem λ = 2 clientes/min e μ = 3 clientes/min")))
+    assert (state["lambda_rate"], state["mu_rate"]) == (2.0, 3.0)
+
+
+@pytest.mark.benchmark(group="extract_parameters")
+def test_extract_long_ocr(benchmark):
+    state = benchmark(lambda: extract_parameters(_state(LONG_OCR_TEXT)))
+    assert state["lambda_rate"] is not None
+
+
+@pytest.mark.benchmark(group="extract_parameters")
+def test_extract_number_heavy(benchmark):
+    state = benchmark(lambda: extract_parameters(_state(NUMBER_HEAVY_PROMPT)))
+    assert (state["lambda_rate"], state["mu_rate"]) == (12.0, 18.0)
+
+
+@pytest.mark.benchmark(group="clean_and_format_text")
+def test_clean_long_ocr(benchmark, processor):
+    text = benchmark(processor.clean_and_format_text, LONG_OCR_TEXT)
+    assert text.count("\n") == LONG_OCR_TEXT.count("\n")
+
+
+@pytest.mark.benchmark(group="clean_and_format_text")
+def test_clean_number_heavy(benchmark, processor):
+    text = benchmark(processor.clean_and_format_text, NUMBER_HEAVY_OCR)
+    assert "λ" in text
+
+
+@pytest.mark.benchmark(group="clean_qwen_response")
+def test_clean_response_plain(benchmark):
+    assert benchmark(clean_qwen_response, LONG_ANSWER) == LONG_ANSWER
+
+
+@pytest.mark.benchmark(group="clean_qwen_response")
+def test_clean_response_think(benchmark):
+    assert benchmark(clean_qwen_response, THINK_ANSWER) == LONG_ANSWER
+
+
+@pytest.mark.benchmark(group="catalog")
+def test_catalog_match_known(benchmark):
+    catalog = get_catalog()
+    exercise = benchmark(catalog.match, "Um banco recebe λ=2 e μ=3 clientes por minuto", 2.0, 3.0)
+    assert exercise["id"] == "bank"
+
+
+@pytest.mark.benchmark(group="catalog")
+def test_catalog_match_unseen(benchmark):
+    # Sem (λ, μ): varre o texto inteiro atrás de apelidos
+    assert benchmark(get_catalog().match, LONG_OCR_TEXT) is None
+
+
+@pytest.mark.benchmark(group="calculator")
+def test_calculator_sweep_vectorized(benchmark):
+    import numpy as np
+
+    lambdas = np.array([lambda_rate for lambda_rate, _ in SWEEP])
+    mus = np.array([mu_rate for _, mu_rate in SWEEP])
+    n = np.full(SWEEP_SIZE, 3.0)
+    metrics = benchmark(compute_metrics, lambdas, mus, n, n)
+    assert len(metrics["rho"]) == SWEEP_SIZE
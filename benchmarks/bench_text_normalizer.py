@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Benchmark do normalizador de texto do OCR
+Compara a limpeza antiga (str.replace cego + regex) com normalize_ocr_text em:
+- tempo por chamada
+- taxa de extração local de λ/μ por agents.nodes.extract_parameters
+
+Uso: python benchmarks/bench_text_normalizer.py [--repeat 2000]
+"""
+
+import os
+import re
+import sys
+import timeit
+import argparse
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from agents.nodes import extract_parameters
+from utils.text_normalizer import normalize_ocr_text
+
+
+# Textos no formato em que o EasyOCR os devolve, com (λ, μ) esperados
+OCR_CORPUS = [
+    ("Em um aeroporto chega 1 avião a cada 3 minutos. À = 1 / 3 e u = 1 por minuto", 1 / 3, 1.0),
+    ("Um banco recebe clientes com taxa de chegada λ = 2 por minuto e taxa de atendimento µ = 3", 2.0, 3.0),
+    ("Drive-thru: chegada = 1,5 carros/min e atendimento = 2 carros/min", 1.5, 2.0),
+    ("Uma empresa recebe 1O pedidos por hora. λ = 1O e μ = 15. Calcule Lq", 10.0, 15.0),
+    ("Sistema de pouso com pista única. À  =  0,5 aviões por minuto, µ = 1,25", 0.5, 1.25),
+    ("Taxa de chegada de 20 requisições por segundo e taxa de atendimento de 25 por segundo", 20.0, 25.0),
+    ("Restaurante: chegada 12 clientes/hora; atendimento 18 clientes/hora. p = ?", 12.0, 18.0),
+    ("Call center com λ= 30 chamadas por hora e μ = 40 chamadas por hora", 30.0, 40.0),
+    ("À medida que os clientes chegam (chegada = 4 por hora) o caixa atende u = 6 por hora", 4.0, 6.0),
+    ("Posto de pedágio: λ = 1.2 carros/min, μ = 2,4 carros/min. Qual a probabilidade P0?", 1.2, 2.4),
+    ("Oficina com taxa de chegada de 3 carros por dia e capacidade de atendimento de 5 por dia", 3.0, 5.0),
+    ("Farmácia: À = 100 clientes/dia; u = 120 clientes/dia; calcule W e Wq", 100.0, 120.0),
+]
+
+
+def legacy_clean_and_format_text(raw_text: str) -> str:
+    """Implementação anterior de OCRProcessor.clean_and_format_text (referência)"""
+    if not raw_text:
+        return ""
+
+    text = re.sub(r'\s+', ' ', raw_text)
+    text = text.strip()
+
+    corrections = {
+        'À': 'λ',
+        'µ': 'μ',
+        'p': 'ρ',
+        '|': 'l',
+        '0': 'O',
+        '1/': '1/',
+    }
+
+    for wrong, correct in corrections.items():
+        text = text.replace(wrong, correct)
+
+    text = re.sub(r'(\d)\s*[/]\s*(\d)', r'\1/\2', text)
+    text = re.sub(r'λ\s*=\s*', 'λ=', text)
+    text = re.sub(r'μ\s*=\s*', 'μ=', text)
+
+    return text
+
+
+def extraction_hits(cleaner) -> dict:
+    """Conta em quantos textos λ e μ são extraídos localmente (e corretamente)"""
+    found = correct = 0
+
+    for text, expected_lambda, expected_mu in OCR_CORPUS:
+        state = extract_parameters({
+            "messages": [{"role": "user", "content": cleaner(text)}],
+            "lambda_rate": None,
+            "mu_rate": None
+        })
+        lambda_rate, mu_rate = state.get("lambda_rate"), state.get("mu_rate")
+
+        if lambda_rate is not None and mu_rate is not None:
+            found += 1
+            if abs(lambda_rate - expected_lambda) < 1e-9 and abs(mu_rate - expected_mu) < 1e-9:
+                correct += 1
+
+    return {"found": found, "correct": correct, "total": len(OCR_CORPUS)}
+
+
+def time_per_call(cleaner, repeat: int) -> float:
+    """Tempo (µs) para limpar um texto do corpus - melhor de 5 rodadas"""
+    texts = [text for text, _, _ in OCR_CORPUS]
+    best = min(timeit.repeat(lambda: [cleaner(text) for text in texts], number=repeat, repeat=5))
+    return best / (repeat * len(texts)) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark do normalizador de texto do OCR")
+    parser.add_argument("--repeat", type=int, default=2000, help="repetições do corpus na medição de tempo")
+    args = parser.parse_args()
+
+    print(f"🧪 Corpus: {len(OCR_CORPUS)} textos de OCR, {args.repeat} repetições")
+    print(f"{'limpeza':<12} {'µs/texto':>10} {'λ/μ achados':>12} {'corretos':>10}")
+
+    for name, cleaner in [("anterior", legacy_clean_and_format_text), ("normalizador", normalize_ocr_text)]:
+        hits = extraction_hits(cleaner)
+        print(f"{name:<12} {time_per_call(cleaner, args.repeat):>10.2f} "
+              f"{hits['found']:>8}/{hits['total']:<3} {hits['correct']:>6}/{hits['total']}")
+
+
+if __name__ == "__main__":
+    main()
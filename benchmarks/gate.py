@@ -0,0 +1,116 @@
+"""
+Gate de regressão dos microbenchmarks (bench_hot_paths.py) contra um baseline local
+
+O baseline é desta máquina: fica em benchmarks/baselines/<sistema>-<python>-<cpu>.json,
+fora do git, e só é gravado com --save. Tempos de outra máquina (ou do mesmo computador
+com outra carga) não servem de referência. Sem baseline o gate reprova (código 2) em vez
+de passar sem comparar nada - num checkout novo ou no CI, grave o baseline antes.
+
+Uma regressão precisa aparecer no mínimo e na mediana: o mínimo (menos sensível a ruído,
+que só soma tempo) e a mediana pioram mais que --threshold, e a mediana sobe além da
+faixa de ruído do baseline (seu IQR). Oscilações de uma máquina ociosa não reprovam o gate.
+
+Uso:
+    python benchmarks/gate.py --save           # grava o baseline (primeira vez ou após otimização intencional)
+    python benchmarks/gate.py                  # compara; sem baseline, falha com código 2
+    python benchmarks/gate.py --threshold 0.3 --min-rounds 30
+"""
+
+import os
+import sys
+import json
+import argparse
+import platform
+import tempfile
+import subprocess
+from typing import Dict, List
+
+BENCHMARKS_DIR = os.path.dirname(os.path.abspath(__file__))
+BASELINE_DIR = os.path.join(BENCHMARKS_DIR, "baselines")
+
+GATE_THRESHOLD = 0.25
+GATE_MIN_ROUNDS = 20
+# Largura da faixa de ruído, em IQRs do baseline
+NOISE_IQRS = 1.0
+
+
+def baseline_path() -> str:
+    name = f"{platform.system()}-{platform.python_implementation()}-{platform.python_version()}-{platform.machine()}"
+    return os.path.join(BASELINE_DIR, f"{name}.json")
+
+
+def run_benchmarks(min_rounds: int) -> Dict[str, Dict[str, float]]:
+    """Roda bench_hot_paths.py e devolve min, mediana e IQR (segundos) por benchmark"""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        output = os.path.join(temp_dir, "run.json")
+        subprocess.run(
+            [sys.executable, "-m", "pytest", os.path.join(BENCHMARKS_DIR, "bench_hot_paths.py"),
+             "--benchmark-only", "--benchmark-warmup=on", f"--benchmark-min-rounds={min_rounds}",
+             f"--benchmark-json={output}", "-q", "-p", "no:cacheprovider"],
+            check=True
+        )
+        with open(output, encoding="utf-8") as f:
+            report = json.load(f)
+    return {
+        bench["name"]: {key: bench["stats"][key] for key in ("min", "median", "iqr")}
+        for bench in report["benchmarks"]
+    }
+
+
+def regressions(baseline: Dict[str, Dict[str, float]], current: Dict[str, Dict[str, float]],
+                threshold: float = GATE_THRESHOLD) -> List[str]:
+    """Benchmarks que pioraram no mínimo e na mediana além do ruído"""
+    failed = []
+    for name, now in current.items():
+        before = baseline.get(name)
+        if before is None:
+            continue
+        slower = now["min"] > before["min"] * (1 + threshold) and now["median"] > before["median"] * (1 + threshold)
+        if slower and now["median"] > before["median"] + NOISE_IQRS * before["iqr"]:
+            failed.append(name)
+    return failed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Gate de regressão dos microbenchmarks")
+    parser.add_argument("--save", action="store_true", help="regrava o baseline desta máquina")
+    parser.add_argument("--threshold", type=float, default=GATE_THRESHOLD,
+                        help="piora relativa do mínimo e da mediana para reprovar (padrão 0.25)")
+    parser.add_argument("--min-rounds", type=int, default=GATE_MIN_ROUNDS)
+    args = parser.parse_args()
+
+    path = baseline_path()
+    if not args.save and not os.path.exists(path):
+        print(f"❌ Sem baseline em {path}; grave um com --save antes de comparar", file=sys.stderr)
+        sys.exit(2)
+
+    current = run_benchmarks(args.min_rounds)
+
+    if args.save:
+        os.makedirs(BASELINE_DIR, exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(current, f, indent=2)
+        print(f"💾 Baseline gravado em {path}")
+        return
+
+    with open(path, encoding="utf-8") as f:
+        baseline = json.load(f)
+
+    print(f"{'benchmark':<36} {'min antes':>11} {'min agora':>11} {'mediana Δ':>10}")
+    for name, now in sorted(current.items()):
+        before = baseline.get(name)
+        if before is None:
+            print(f"{name:<36} {'-':>11} {now['min'] * 1e6:>9.1f}µs {'novo':>10}")
+            continue
+        change = now["median"] / before["median"] - 1
+        print(f"{name:<36} {before['min'] * 1e6:>9.1f}µs {now['min'] * 1e6:>9.1f}µs {change:>+9.0%}")
+
+    failed = regressions(baseline, current, args.threshold)
+    if failed:
+        print(f"❌ Regressão em: {', '.join(failed)}")
+        sys.exit(1)
+    print("✅ Sem regressões")
+
+
+if __name__ == "__main__":
+    main()
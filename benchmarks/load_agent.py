@@ -0,0 +1,285 @@
+#!/usr/bin/env python3
+"""
+Gerador de carga e benchmark de latência de BosquinhoAgent.process_message
+
+Reproduz um corpus de perguntas reais (texto e OCR) com concorrência
+configurável e reporta p50/p95/p99 por nó do grafo e por rota
+(calculate_and_explain, ai_solve_complete, ...), vazão e crescimento de
+memória. O resultado sai em JSON para comparar entre commits.
+
+Uso:
+    python benchmarks/load_agent.py --mock --concurrency 8 --repeat 5 --output bench.json
+    python benchmarks/load_agent.py --mock --compare bench.json --threshold 0.10
+"""
+
+import os
+import io
+import gc
+import sys
+import json
+import time
+import argparse
+import platform
+import threading
+import subprocess
+import tracemalloc
+import contextlib
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+DEFAULT_CORPUS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "corpus", "prompts.jsonl")
+
+PERCENTILES = (50, 95, 99)
+
+
+def load_corpus(path: str) -> List[Dict[str, Any]]:
+    """Lê o corpus JSONL: {id, kind: text|ocr, prompt, ocr?}"""
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def build_messages(entry: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Monta a conversa como a interface monta (OCR vira o prompt de imagem)"""
+    if entry.get("kind") == "ocr":
+        message = {"role": "user", "content": f"📸 **Exercício da imagem:**\n\n{entry['prompt']}"}
+        if entry.get("ocr"):
+            message["ocr"] = entry["ocr"]
+        return [message]
+    return [{"role": "user", "content": entry["prompt"]}]
+
+
+def percentile(values: List[float], q: float) -> float:
+    """Percentil com interpolação linear"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    position = (len(ordered) - 1) * q / 100
+    lower = int(position)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+
+
+def summarize(values: List[float]) -> Dict[str, float]:
+    """Resumo de latências em milissegundos"""
+    summary = {"count": len(values), "mean_ms": 1000 * sum(values) / len(values) if values else 0.0}
+    for q in PERCENTILES:
+        summary[f"p{q}_ms"] = 1000 * percentile(values, q)
+    return summary
+
+
+def run_one(agent, entry: Dict[str, Any]) -> Dict[str, Any]:
+    """Executa uma pergunta e registra latência, rota e tempo de cada nó"""
+    start = time.perf_counter()
+    try:
+        result = agent.process_message(build_messages(entry))
+        error = None
+    except Exception as e:
+        result, error = {}, str(e)
+    latency = time.perf_counter() - start
+
+    calculation = result.get("calculation_result") or {}
+    return {
+        "id": entry.get("id"),
+        "kind": entry.get("kind", "text"),
+        "route": calculation.get("type", "fallback" if not result.get("node_timings") else "unknown"),
+        "latency": latency,
+        "node_timings": result.get("node_timings", {}),
+        "error": error
+    }
+
+
+def run_load(corpus: List[Dict[str, Any]], concurrency: int, repeat: int, warmup: int) -> Dict[str, Any]:
+    """Dispara o corpus `repeat` vezes com `concurrency` requisições simultâneas"""
+    from agents.bosquinho_agent import BosquinhoAgent
+
+    agent = BosquinhoAgent()
+
+    # Aquecimento: importa o cliente Groq, compila regex, abre conexões
+    for entry in corpus[:warmup]:
+        run_one(agent, entry)
+
+    gc.collect()
+    tracemalloc.start()
+    memory_before = tracemalloc.get_traced_memory()[0]
+
+    workload = corpus * repeat
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        records = list(executor.map(lambda entry: run_one(agent, entry), workload))
+    wall_time = time.perf_counter() - start
+
+    gc.collect()
+    memory_after, memory_peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "records": records,
+        "wall_time": wall_time,
+        "memory": {
+            "growth_kb": (memory_after - memory_before) / 1024,
+            "growth_per_request_bytes": (memory_after - memory_before) / max(1, len(records)),
+            "peak_kb": memory_peak / 1024
+        }
+    }
+
+
+def build_report(run: Dict[str, Any], args: argparse.Namespace) -> Dict[str, Any]:
+    """Agrega os registros em um relatório legível por máquina"""
+    records = run["records"]
+    by_node: Dict[str, List[float]] = defaultdict(list)
+    by_route: Dict[str, List[float]] = defaultdict(list)
+    by_kind: Dict[str, List[float]] = defaultdict(list)
+
+    for record in records:
+        by_route[record["route"]].append(record["latency"])
+        by_kind[record["kind"]].append(record["latency"])
+        for node, seconds in record["node_timings"].items():
+            by_node[node].append(seconds)
+
+    return {
+        "meta": {
+            "commit": _git_commit(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "corpus": os.path.relpath(args.corpus),
+            "concurrency": args.concurrency,
+            "repeat": args.repeat,
+            "requests": len(records),
+            "groq_model": os.getenv("GROQ_MODEL", "llama-3.1-8b-instant"),
+            "groq_base_url": os.getenv("GROQ_BASE_URL") or ("mock" if os.getenv("GROQ_MOCK") else "groq")
+        },
+        "throughput_rps": len(records) / run["wall_time"] if run["wall_time"] else 0.0,
+        "wall_time_s": run["wall_time"],
+        "errors": sum(1 for record in records if record["error"]),
+        "overall": summarize([record["latency"] for record in records]),
+        "nodes": {node: summarize(values) for node, values in sorted(by_node.items())},
+        "routes": {route: summarize(values) for route, values in sorted(by_route.items())},
+        "kinds": {kind: summarize(values) for kind, values in sorted(by_kind.items())},
+        "memory": run["memory"]
+    }
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], stderr=subprocess.DEVNULL,
+                                       cwd=os.path.dirname(os.path.abspath(__file__))).decode().strip()
+    except Exception:
+        return None
+
+
+def print_report(report: Dict[str, Any]):
+    """Tabela resumida no terminal"""
+    meta = report["meta"]
+    print(f"🧪 {meta['requests']} requisições, concorrência {meta['concurrency']}, commit {meta['commit']}")
+    print(f"⚡ Vazão: {report['throughput_rps']:.2f} req/s · erros: {report['errors']}")
+    print(f"🧠 Memória: +{report['memory']['growth_kb']:.1f} KB "
+          f"({report['memory']['growth_per_request_bytes']:.0f} B/req), pico {report['memory']['peak_kb']:.1f} KB")
+
+    print(f"\n{'grupo':<32} {'n':>5} {'p50 ms':>10} {'p95 ms':>10} {'p99 ms':>10}")
+    rows = [("geral", report["overall"])]
+    rows += [(f"nó {name}", summary) for name, summary in report["nodes"].items()]
+    rows += [(f"rota {name}", summary) for name, summary in report["routes"].items()]
+    rows += [(f"tipo {name}", summary) for name, summary in report["kinds"].items()]
+    for name, summary in rows:
+        print(f"{name:<32} {summary['count']:>5} {summary['p50_ms']:>10.1f} "
+              f"{summary['p95_ms']:>10.1f} {summary['p99_ms']:>10.1f}")
+
+
+def compare_reports(current: Dict[str, Any], baseline: Dict[str, Any], threshold: float,
+                    min_delta_ms: float = 5.0) -> bool:
+    """
+    Compara p95 por grupo com o baseline; retorna False se algum piorou além do limite
+    Variações abaixo de min_delta_ms (nós de poucos milissegundos) não contam como regressão
+    """
+    print(f"\n📊 Comparação com {baseline['meta'].get('commit')} (limite +{threshold:.0%} no p95)")
+    ok = True
+
+    groups = [("geral", current["overall"], baseline["overall"])]
+    for section in ("nodes", "routes"):
+        for name, summary in current[section].items():
+            if name in baseline.get(section, {}):
+                groups.append((f"{section[:-1]} {name}", summary, baseline[section][name]))
+
+    for name, now, before in groups:
+        if not before["p95_ms"]:
+            continue
+        change = now["p95_ms"] / before["p95_ms"] - 1
+        regressed = change > threshold and now["p95_ms"] - before["p95_ms"] > min_delta_ms
+        ok = ok and not regressed
+        print(f"{'❌' if regressed else '✅'} {name:<32} p95 {before['p95_ms']:>9.1f} → {now['p95_ms']:>9.1f} ms ({change:+.1%})")
+
+    throughput_change = current["throughput_rps"] / baseline["throughput_rps"] - 1 if baseline["throughput_rps"] else 0.0
+    print(f"   vazão {baseline['throughput_rps']:.2f} → {current['throughput_rps']:.2f} req/s ({throughput_change:+.1%})")
+    return ok
+
+
+def start_mock_server(args: argparse.Namespace):
+    """Sobe o Groq simulado em uma thread e aponta o cliente para ele"""
+    from utils.mock_groq_server import MockGroqConfig, create_server
+
+    config = MockGroqConfig(
+        latency_dist=args.mock_latency_dist,
+        latency_ms=args.mock_latency_ms,
+        tokens_per_second=args.mock_tokens_per_second,
+        rate_limit_prob=args.mock_rate_limit_prob,
+        seed=args.seed
+    )
+    server = create_server(config, port=args.mock_port)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    os.environ["GROQ_MOCK"] = "1"
+    os.environ["GROQ_MOCK_PORT"] = str(server.server_address[1])
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de carga do BosquinhoAgent.process_message")
+    parser.add_argument("--corpus", default=DEFAULT_CORPUS, help="arquivo JSONL com as perguntas")
+    parser.add_argument("--concurrency", type=int, default=4, help="requisições simultâneas")
+    parser.add_argument("--repeat", type=int, default=3, help="quantas vezes o corpus é repetido")
+    parser.add_argument("--warmup", type=int, default=2, help="perguntas de aquecimento (não medidas)")
+    parser.add_argument("--output", help="salva o relatório JSON neste arquivo")
+    parser.add_argument("--compare", help="relatório JSON de referência para comparar")
+    parser.add_argument("--threshold", type=float, default=0.10, help="piora máxima aceita no p95 (fração)")
+    parser.add_argument("--min-delta-ms", type=float, default=5.0,
+                        help="piora absoluta mínima no p95 para contar como regressão")
+    parser.add_argument("--verbose", action="store_true", help="mostra os logs do agente")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--mock", action="store_true", help="usa o Groq simulado local (sem rede)")
+    parser.add_argument("--mock-port", type=int, default=0, help="porta do Groq simulado (0 = livre)")
+    parser.add_argument("--mock-latency-dist", default="lognormal")
+    parser.add_argument("--mock-latency-ms", type=float, default=300.0)
+    parser.add_argument("--mock-tokens-per-second", type=float, default=750.0)
+    parser.add_argument("--mock-rate-limit-prob", type=float, default=0.0)
+    args = parser.parse_args()
+
+    server = start_mock_server(args) if args.mock else None
+
+    corpus = load_corpus(args.corpus)
+    output = contextlib.nullcontext() if args.verbose else contextlib.redirect_stdout(io.StringIO())
+    with output:
+        run = run_load(corpus, args.concurrency, args.repeat, args.warmup)
+
+    report = build_report(run, args)
+    print_report(report)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"\n💾 Relatório salvo em {args.output}")
+
+    ok = True
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            ok = compare_reports(report, json.load(f), args.threshold, args.min_delta_ms)
+
+    if server:
+        server.shutdown()
+
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,338 @@
+#!/usr/bin/env python3
+"""
+Relatório de tokens economizados pelos prompts compartilhados (utils/prompts.py)
+
+Para cada rota do GroqClient monta a mesma pergunta de exemplo com os prompts
+anteriores (cópia abaixo, referência) e com os atuais - capturados do próprio
+GroqClient, sem rede - e compara tokens de entrada estimados e max_tokens.
+
+Uso: python benchmarks/prompt_tokens.py [--json relatorio.json]
+"""
+
+import os
+import sys
+import json
+import argparse
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("GROQ_MOCK", "1")
+
+from utils.prompts import estimate_tokens
+
+
+# Prompts anteriores: rota -> (sistema, modelo da mensagem do usuário, max_tokens com GROQ_MAX_TOKENS=2000)
+LEGACY_PROMPTS = {
+    "explain_calculation": (
+        """IMPORTANTE: RESPONDA SEMPRE EM PORTUGUÊS BRASILEIRO!
+
+Você é o Bosquinho, um assistente especializado em Teoria das Filas M/M/1.
+Você deve explicar cálculos matemáticos de forma clara e didática, sempre mostrando:
+1. O contexto do problema
+2. As fórmulas utilizadas
+3. A substituição dos valores
+4. O resultado final
+5. A interpretação prática do resultado
+
+Use emojis e formatação markdown para tornar a explicação mais amigável.
+LEMBRE-SE: SEMPRE EM PORTUGUÊS BRASILEIRO!""",
+        """
+            Pergunta do usuário: {user_question}
+
+            Resultado do cálculo: {calculation_result}
+
+            Por favor, explique este resultado de forma didática e completa, incluindo:
+            - O que significa o resultado
+            - Como foi calculado
+            - Qual a interpretação prática
+            - Se o sistema é estável ou não (quando aplicável)
+            """,
+        2000
+    ),
+    "example": (
+        """IMPORTANTE: RESPONDA SEMPRE EM PORTUGUÊS BRASILEIRO!
+
+Você é o Bosquinho, especialista em Teoria das Filas M/M/1.
+Explique exemplos práticos de forma didática, mostrando cada passo do cálculo
+e a interpretação real do resultado.
+LEMBRE-SE: SEMPRE EM PORTUGUÊS BRASILEIRO!""",
+        """
+            {context}
+
+            Resultados calculados: {results}
+
+            Por favor, explique este exemplo completo de forma didática, incluindo:
+            1. Descrição do cenário real
+            2. Cada métrica calculada com sua fórmula
+            3. Interpretação prática de cada resultado
+            4. Conclusões sobre o desempenho do sistema
+            """,
+        2000
+    ),
+    "problem_with_context": (
+        """IMPORTANTE: RESPONDA SEMPRE EM PORTUGUÊS BRASILEIRO!
+
+Você é o Bosquinho, um assistente especializado em Teoria das Filas M/M/1.
+
+TAREFA ESPECÍFICA:
+- Você recebeu um problema completo com TODOS os cálculos já realizados
+- Precisa explicar a solução de forma didática e completa
+- Foque na interpretação prática dos resultados
+- Explique cada métrica de forma clara
+- Relacione com o contexto real do problema (aeroporto, aviões, etc.)
+
+ESTRUTURA DA RESPOSTA:
+1. 🎯 Resumo do problema
+2. 📊 Parâmetros identificados
+3. 🔢 Resultados principais
+4. 💡 Interpretação prática
+5. ✅ Respostas específicas às perguntas
+
+LEMBRE-SE: SEMPRE EM PORTUGUÊS BRASILEIRO!""",
+        """
+PROBLEMA APRESENTADO PELO USUÁRIO:
+{user_question}
+
+CONTEXTO COMPLETO COM CÁLCULOS REALIZADOS:
+{context}
+
+Por favor, explique este problema de forma didática e completa, respondendo especificamente às perguntas do usuário. Use os resultados calculados para dar respostas precisas e educativas.
+
+IMPORTANTE:
+- Explique a diferença entre "aviões no sistema" (L) vs "aviões aguardando na fila" (Lq)
+- Mostre as fórmulas quando relevante
+- Interpretar os resultados no contexto prático
+- Responda especificamente às letras a), b), c) se houver
+""",
+        2000
+    ),
+    "calculate_and_explain": (
+        """IMPORTANTE: RESPONDA SEMPRE EM PORTUGUÊS BRASILEIRO!
+
+Você é o Bosquinho, especialista em Teoria das Filas M/M/1.
+
+TAREFA: Você recebeu uma pergunta do usuário e já foram feitos os cálculos principais.
+Sua missão é:
+1. Interpretar o problema apresentado pelo usuário
+2. Explicar os resultados calculados de forma didática
+3. Responder especificamente às perguntas feitas
+4. Mostrar as fórmulas relevantes
+5. Dar interpretação prática dos resultados
+
+ESTRUTURA IDEAL:
+🎯 Resumo do problema
+📊 Parâmetros identificados
+🔢 Cálculos e resultados
+💡 Interpretação prática
+✅ Respostas específicas
+
+Use emojis, seja didático e sempre em PORTUGUÊS BRASILEIRO!""",
+        """
+PERGUNTA DO USUÁRIO:
+{user_question}
+
+CÁLCULOS JÁ REALIZADOS:
+{context}
+
+Por favor, analise o problema do usuário e explique de forma completa e didática, usando os cálculos já realizados. Responda especificamente ao que foi perguntado, seja sobre número médio de clientes, tempos, probabilidades, etc.
+
+IMPORTANTE: Relacione os resultados com o contexto real do problema (aeroporto, banco, empresa, etc.) se aplicável.
+""",
+        2000
+    ),
+    "ai_solve": (
+        """IMPORTANTE: RESPONDA SEMPRE EM PORTUGUÊS BRASILEIRO!
+
+Você é o Bosquinho, um assistente especializado em Teoria das Filas M/M/1.
+
+CAPACIDADES:
+- Interpretar QUALQUER problema de teoria das filas M/M/1
+- Identificar parâmetros λ (taxa de chegada) e μ (taxa de atendimento) no texto
+- Calcular todas as métricas: ρ, L, Lq, W, Wq, P0, Pn, P(N>k)
+- Explicar resultados de forma prática e didática
+- Resolver problemas completos com múltiplas perguntas
+
+FÓRMULAS M/M/1:
+- ρ = λ/μ (utilização do sistema)
+- L = ρ/(1-ρ) = λ/(μ-λ) (número médio no sistema)
+- Lq = ρ²/(1-ρ) = λ²/[μ(μ-λ)] (número médio na fila)
+- W = 1/(μ-λ) (tempo médio no sistema)
+- Wq = ρ/(μ-λ) = λ/[μ(μ-λ)] (tempo médio na fila)
+- P0 = 1-ρ (probabilidade sistema vazio)
+- Pn = (1-ρ)ρⁿ (probabilidade de n clientes)
+- P(N>k) = ρᵏ⁺¹ (probabilidade de mais de k clientes)
+
+PROCESSO:
+1. Leia e compreenda o problema
+2. Identifique λ e μ (taxas, intervalos, frequências)
+3. Calcule as métricas necessárias
+4. Responda às perguntas específicas
+5. Dê interpretação prática
+
+TIPOS DE PROBLEMAS:
+- Aeroportos (aviões, pistas)
+- Bancos (clientes, caixas)
+- Empresas (pedidos, atendimento)
+- Restaurantes (clientes, garçons)
+- Sistemas de TI (requisições, servidores)
+- Qualquer fila de espera!
+
+SEMPRE em PORTUGUÊS BRASILEIRO! Seja didático, use emojis e explique o contexto real.""",
+        """
+PROBLEMA A RESOLVER:
+{user_question}
+
+INFORMAÇÕES COLETADAS:
+{context_info}
+
+INSTRUÇÕES:
+1. Analise cuidadosamente o problema apresentado
+2. Identifique os parâmetros λ e μ (mesmo que implícitos)
+3. Calcule as métricas necessárias usando as fórmulas M/M/1
+4. Responda especificamente às perguntas feitas
+5. Explique de forma didática e prática
+
+IMPORTANTE: Se o problema mencionar tempos (ex: "a cada 3 minutos"), converta para taxas (ex: λ = 1/3 por minuto). Se mencionar capacidades (ex: "pode atender 5 por hora"), isso é μ.
+
+Resolva o problema completamente!""",
+        2500
+    ),
+    "general_help": (
+        """IMPORTANTE: RESPONDA SEMPRE EM PORTUGUÊS BRASILEIRO!
+
+Você é o Bosquinho, um assistente especializado em Teoria das Filas M/M/1.
+
+REGRAS OBRIGATÓRIAS:
+1. SEMPRE responda em português brasileiro
+2. Se for SAUDAÇÃO (olá, oi, bom dia), seja caloroso e se apresente
+3. Se for pergunta sobre M/M/1, explique didaticamente com exemplos
+4. Se mencionarem "exemplo do aeroporto" SEM parâmetros, explique os exemplos disponíveis
+5. Se pedirem cálculos COM λ e μ, faça os cálculos passo a passo
+6. Se pedirem cálculos SEM λ e μ, peça os parâmetros
+7. Sempre seja educativo, use emojis e explique o contexto prático
+
+LEMBRE-SE: PORTUGUÊS BRASILEIRO SEMPRE!
+
+EXEMPLOS DISPONÍVEIS:
+- Aeroporto 1: λ=1/3, μ=1 (pista única)
+- Aeroporto 2: λ=1, μ=3 (alta capacidade)
+- Banco: λ=2, μ=3 (caixa eletrônico)
+- Drive-thru: λ=1.5, μ=2 (restaurante)
+
+FÓRMULAS M/M/1:
+- ρ = λ/μ (utilização)
+- L = ρ/(1-ρ) (clientes no sistema)
+- Lq = ρ²/(1-ρ) (clientes na fila)
+- W = 1/(μ-λ) (tempo no sistema)
+- Wq = ρ/(μ-λ) (tempo na fila)
+- P0 = 1-ρ (sistema vazio)
+- Pn = (1-ρ)ρⁿ (n clientes)
+- P(N>k) = ρᵏ⁺¹ (mais de k clientes)""",
+        """{user_question}""",
+        1000
+    ),
+    "error": (
+        """IMPORTANTE: RESPONDA SEMPRE EM PORTUGUÊS BRASILEIRO!
+
+Você é o Bosquinho, especialista em Teoria das Filas M/M/1.
+Explique erros de forma didática e ajude o usuário a corrigir o problema.
+LEMBRE-SE: SEMPRE EM PORTUGUÊS BRASILEIRO!""",
+        """
+            Pergunta do usuário: {user_question}
+            Erro encontrado: {error_context}
+
+            Por favor, explique o erro de forma didática e sugira como corrigir.
+            """,
+        1000
+    ),
+}
+
+SAMPLE_QUESTION = "Em um banco chegam 2 clientes por minuto e o caixa atende 3 por minuto. Qual o tempo médio na fila?"
+
+SAMPLE_CONTEXT = """
+CÁLCULOS REALIZADOS:
+- λ = 2.0, μ = 3.0
+- ρ = 0.6667, L = 2.0, Lq = 1.3333, W = 1.0, Wq = 0.6667, P0 = 0.3333
+Status do sistema: Estável
+"""
+
+SAMPLE_RESULTS = {"rho": {"value": 0.6667}, "Lq": {"value": 1.3333}, "Wq": {"value": 0.6667}}
+
+
+def legacy_messages(route: str) -> tuple:
+    """Mensagens e max_tokens como eram enviados antes"""
+    system, template, max_tokens = LEGACY_PROMPTS[route]
+    user = template.format(
+        user_question=SAMPLE_QUESTION,
+        context=SAMPLE_CONTEXT if route != "example" else "EXEMPLO DO BANCO:",
+        calculation_result=SAMPLE_RESULTS,
+        results=SAMPLE_RESULTS,
+        context_info="- Lambda (λ) identificado: 2.0\n",
+        error_context="Sistema instável (ρ ≥ 1)"
+    )
+    return system, user, max_tokens
+
+
+def current_messages() -> dict:
+    """Mensagens enviadas hoje, capturadas substituindo a chamada ao modelo"""
+    from utils.groq_client import GroqClient
+
+    client = GroqClient()
+    client.semantic_cache = None
+    client._load_example_explanation = lambda cache_path: None
+    client._store_example_explanation = lambda cache_path, explanation: None
+    captured = {}
+
+    def capture(route, messages):
+        captured[route] = (messages[0]["content"], messages[1]["content"], client.router.plan(route).max_tokens)
+        return "ok"
+
+    client._complete = capture
+    client.enhance_calculation_explanation(SAMPLE_RESULTS, SAMPLE_QUESTION)
+    client.solve_example_with_explanation("bank", SAMPLE_RESULTS)
+    client.solve_problem_with_context(SAMPLE_QUESTION, SAMPLE_CONTEXT)
+    client.solve_with_calculations(SAMPLE_QUESTION, SAMPLE_CONTEXT)
+    client.solve_any_mm1_problem(SAMPLE_QUESTION, {"lambda": 2.0})
+    client.general_help_response(SAMPLE_QUESTION)
+    client.handle_error_with_context(SAMPLE_QUESTION, "Sistema instável (ρ ≥ 1)")
+    return captured
+
+
+def shared_prefix(texts: list) -> str:
+    """Início idêntico em todos os prompts de sistema (candidato a cache de prefixo)"""
+    return os.path.commonprefix(texts)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Tokens economizados pelos prompts compartilhados")
+    parser.add_argument("--json", help="salva o relatório neste arquivo")
+    args = parser.parse_args()
+
+    current = current_messages()
+    report = {}
+
+    print(f"{'rota':<24} {'entrada antes':>13} {'agora':>7} {'economia':>9} {'max antes':>10} {'agora':>7}")
+    for route in LEGACY_PROMPTS:
+        old_system, old_user, old_max = legacy_messages(route)
+        new_system, new_user, new_max = current[route]
+        before = estimate_tokens(old_system) + estimate_tokens(old_user)
+        after = estimate_tokens(new_system) + estimate_tokens(new_user)
+        report[route] = {
+            "input_tokens_before": before,
+            "input_tokens_after": after,
+            "input_tokens_saved": before - after,
+            "max_tokens_before": old_max,
+            "max_tokens_after": new_max
+        }
+        print(f"{route:<24} {before:>13} {after:>7} {before - after:>+9} {old_max:>10} {new_max:>7}")
+
+    old_prefix = shared_prefix([LEGACY_PROMPTS[route][0] for route in LEGACY_PROMPTS])
+    new_prefix = shared_prefix([current[route][0] for route in LEGACY_PROMPTS])
+    print(f"\n🔁 Prefixo comum dos prompts de sistema: {estimate_tokens(old_prefix)} → {estimate_tokens(new_prefix)} tokens")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"💾 Relatório salvo em {args.json}")
+
+
+if __name__ == "__main__":
+    main()
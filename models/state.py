@@ -16,6 +16,9 @@ class BosquinhoState(TypedDict):
     k_value: Optional[int]
     calculation_result: Optional[Dict]
     error_message: Optional[str]
+    ocr_result: Optional[Dict]  # Confiança e números incertos quando a pergunta veio de imagem
+    catalog_exercise_id: Optional[str]  # Exercício conhecido do catálogo (resposta sem IA)
+    partial_response: Optional[str]  # Tabela calculada localmente, mostrada antes da explicação da IA
 
 
 class CalculationResult:
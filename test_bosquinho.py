@@ -98,6 +98,24 @@ def test_examples():
 
     print("\n✅ Teste de exemplos concluído!")
 
+def test_example_catalog():
+    """Testa o catálogo de exemplos e a memorização das soluções"""
+    print("\n📚 Testando catálogo de exemplos...")
+
+    from utils.examples import get_example_keys, get_example_solutions, solve_example
+
+    solutions = get_example_solutions()
+    assert list(solutions) == get_example_keys() == ["airport_1", "airport_2", "bank", "drive_thru"]
+    assert abs(solutions["airport_1"]["rho"]["value"] - 1 / 3) < 1e-9
+    assert abs(solutions["bank"]["Lq"]["value"] - 4 / 3) < 1e-9
+    assert solutions["drive_thru"]["P0"]["value"] == 0.25
+
+    # Segunda chamada não recalcula nada
+    assert solve_example("bank") is solutions["bank"]
+    assert get_example_solutions() is solutions
+
+    print("\n✅ Teste do catálogo de exemplos concluído!")
+
 def test_parameter_extraction():
     """Testa a extração de parâmetros"""
     print("\n🔍 Testando extração de parâmetros...")
@@ -130,6 +148,755 @@ def test_parameter_extraction():
 
     print("\n✅ Testes de extração concluídos!")
 
+def test_exercise_batch():
+    """Testa a separação e resolução em lote de listas de exercícios"""
+    print("\n📄 Testando resolução em lote...")
+
+    from utils.exercise_batch import split_exercises, solve_exercises_locally
+
+    text = (
+        "Lista 3 - Teoria das Filas "
+        "1) Em um banco a taxa de chegada é λ=2 e a taxa de atendimento μ=3 por minuto. "
+        "2) Um drive-thru recebe chegada=1.5 carros por minuto e atendimento=2. "
+        "3) Explique o que é uma fila M/M/1 e dê um exemplo."
+    )
+
+    exercises = split_exercises(text)
+    print(f"Exercícios encontrados: {len(exercises)}")
+    assert len(exercises) == 3  # o cabeçalho ("Lista 3 - ") fica com o primeiro exercício
+
+    solutions = solve_exercises_locally(exercises)
+    for solution in solutions:
+        print(f"#{solution['index']}: λ={solution['lambda']} μ={solution['mu']}")
+
+    assert solutions[0]["lambda"] == 2 and solutions[0]["mu"] == 3
+    assert abs(solutions[0]["results"]["L"]["value"] - 2.0) < 1e-9
+    assert solutions[1]["results"]["rho"]["value"] == 0.75
+    assert solutions[2]["results"] is None
+
+    # "μ = 3. Calcule" não é marcador, e um trecho curto nunca é descartado
+    assert split_exercises("λ = 2 e μ = 3. Calcule L.") == ["λ = 2 e μ = 3. Calcule L."]
+    two = split_exercises("1) Em um banco λ = 3 e μ = 4, calcule Wq.\n2) λ = 1 e μ = 2. Calcule L.")
+    assert len(two) == 2 and two[1].startswith("2) λ = 1")
+    assert split_exercises("1. Um banco tem λ=2 e μ=3.\n2. Uma oficina tem λ=1 e μ=4.")[1].startswith("2. Uma")
+
+    print("\n✅ Testes de resolução em lote concluídos!")
+
+def test_text_normalizer():
+    """Testa a normalização do texto extraído por OCR"""
+    print("\n🔤 Testando normalizador de OCR...")
+
+    from utils.text_normalizer import normalize_ocr_text
+
+    test_cases = [
+        ("À  =  1 / 3 aviões por minuto e u = 1", "λ=1/3 aviões por minuto e μ=1"),
+        ("À medida que chegam 1O clientes", "À medida que chegam 10 clientes"),
+        ("capacidade da pista p = 0,75", "capacidade da pista ρ=0.75"),
+        ("taxa de 100 pedidos e µ = 120", "taxa de 100 pedidos e μ=120"),
+    ]
+
+    for raw_text, expected in test_cases:
+        normalized = normalize_ocr_text(raw_text)
+        print(f"'{raw_text}' → '{normalized}'")
+        assert normalized == expected
+
+    print("\n✅ Testes do normalizador concluídos!")
+
+def test_ocr_layout():
+    """Testa a reconstrução da ordem de leitura a partir das caixas do OCR"""
+    print("\n🧭 Testando ordem de leitura do OCR...")
+
+    from utils.ocr_layout import OCRBox, build_reading_order
+
+    def box(text, confidence, x0, y0, x1, y1):
+        return OCRBox.from_easyocr([[x0, y0], [x1, y0], [x1, y1], [x0, y1]], text, confidence)
+
+    # Detecção fora de ordem: título, duas colunas e uma fórmula em duas caixas
+    boxes = [
+        box("μ = 3", 0.95, 560, 110, 640, 130),
+        box("Lista de Exercícios M/M/1", 0.99, 0, 0, 1000, 30),
+        box("λ =", 0.90, 0, 112, 40, 128),
+        box("1O", 0.40, 45, 110, 80, 130),
+        box("Exercício 2", 0.97, 560, 60, 720, 85),
+        box("Exercício 1", 0.98, 0, 60, 160, 85),
+        box("ruído", 0.10, 300, 300, 320, 310),
+    ]
+
+    layout = build_reading_order(boxes)
+    print(layout["text"])
+
+    assert layout["text"].split("\n") == [
+        "Lista de Exercícios M/M/1", "Exercício 1", "λ = 1O", "Exercício 2", "μ = 3"
+    ]
+    assert [item["text"] for item in layout["low_confidence_numbers"]] == ["1O"]
+
+    print("\n✅ Testes de ordem de leitura concluídos!")
+
+def test_exercise_catalog():
+    """Testa o catálogo de exercícios e a busca por parâmetros, cenário e apelido"""
+    print("\n🗂️ Testando catálogo de exercícios...")
+
+    from utils.exercise_catalog import get_catalog
+
+    catalog = get_catalog()
+    print(f"Exercícios no catálogo: {len(catalog)}")
+    assert len(catalog) >= 300
+    assert catalog.verify() == []
+
+    assert catalog.match("Resolva o exemplo do aeroporto 1")["id"] == "airport_1"
+    assert catalog.match("Mostre o exemplo do banco, por favor.")["id"] == "bank"
+    assert catalog.match("Um banco recebe λ=2 e μ=3 clientes por minuto", 2.0, 3.0)["id"] == "bank"
+
+    # Sem cenário, com outro k ou com outros parâmetros a pergunta é nova
+    assert catalog.match("Calcule L com λ=2 e μ=3", 2.0, 3.0) is None
+    assert catalog.match("Banco com λ=2 e μ=3: probabilidade de mais de 7 clientes", 2.0, 3.0) is None
+    assert catalog.match("Exemplo do banco com λ=4 e μ=5", 4.0, 5.0) is None
+
+    # Apelido dentro de outra pergunta (e se..., comparação) também vai para a IA
+    assert catalog.match("O exemplo do banco continua estável se o caixa ficar duas vezes mais lento?") is None
+    assert catalog.match("Compare o exemplo do banco com o exemplo do aeroporto 1") is None
+
+    solution = catalog.solve("bank")
+    assert abs(solution["L"]["value"] - 2.0) < 1e-9
+
+    # Cenário e parâmetros do catálogo, mas outra métrica (P(N=3)): a rota do catálogo não vale
+    from agents.nodes import extract_parameters, match_catalog, identify_calculation_type
+    def route(question):
+        state = extract_parameters({"messages": [{"role": "user", "content": question}]})
+        return identify_calculation_type(match_catalog(state))["calculation_result"]["type"]
+    bank = "Um banco recebe λ=2 e μ=3 clientes por minuto."
+    assert route(bank + " Qual a probabilidade de mais de 2 clientes?") == "catalog"
+    assert route(bank + " Qual o tempo médio de espera?") == "catalog"
+    assert route(bank + " Qual a probabilidade de exatamente 3 clientes?") == "ai_solve_complete"
+
+    print("\n✅ Testes do catálogo concluídos!")
+
+def test_semantic_cache():
+    """Testa o reaproveitamento de respostas para perguntas parafraseadas"""
+    print("\n♻️ Testando cache semântico...")
+
+    from utils.semantic_cache import SemanticCache
+
+    cache = SemanticCache(max_entries=2)
+    airport = ("Em um aeroporto chega 1 avião a cada 3 minutos e a pista atende 1 avião por minuto. "
+               "Qual o tempo médio de espera?")
+    # Sem taxas no texto nem λ/μ extraídos nada é guardado
+    cache.add("Qual o tempo médio de espera de um avião?", None, None, "sem taxas")
+    assert len(cache) == 0 and cache._vectors is None
+    # As taxas vêm do próprio texto: não depende do λ/μ extraído pelo agente
+    cache.add(airport, None, None, "resposta aeroporto")
+
+    # Paráfrase com o intervalo em outra forma e o atendimento como duração
+    paraphrase = "Aviões chegam a cada 3 min num aeroporto, e o pouso leva 1 minuto. Qual o tempo médio de espera?"
+    hit = cache.lookup(paraphrase)
+    print(f"Paráfrase: {hit}")
+    assert hit and hit[0] == "resposta aeroporto"
+    assert cache.lookup(airport.replace("1 avião a cada 3 minutos", "20 aviões por hora"))
+
+    # Mesma paráfrase com outro parâmetro: outro problema
+    assert cache.lookup(paraphrase.replace("a cada 3 min", "a cada 4 min")) is None
+
+    # Quase iguais, mas outro problema: λ = 3, λ e μ trocados, horas em vez de minutos
+    near_misses = [
+        "Em um aeroporto chegam 3 aviões por minuto e a pista atende 1 avião por minuto. Qual o tempo médio de espera?",
+        "Em um aeroporto chega 1 avião por minuto e a pista atende 1 avião a cada 3 minutos. Qual o tempo médio de espera?",
+        "Em um aeroporto chega 1 avião a cada 3 horas e a pista atende 1 avião por hora. Qual o tempo médio de espera?"
+    ]
+    for question in near_misses:
+        assert cache.lookup(question) is None
+        # Mesmo que a extração do agente errasse e devolvesse os λ/μ da pergunta guardada
+        assert cache.lookup(question, 1 / 3, 1.0) is None, question
+
+    # Outra métrica ou outro k: pergunta nova
+    assert cache.lookup(airport.replace("o tempo médio de espera", "a probabilidade do sistema vazio")) is None
+    more_than = airport.replace("o tempo médio de espera", "P(N>5)")
+    cache.add(more_than, None, None, "P(N>5)")
+    assert cache.lookup(more_than.replace("5", "7")) is None
+
+    # Sem unidade no texto valem λ/μ do agente
+    cache.add("Um banco recebe clientes com taxas 2 e 3. Calcule Lq", 2.0, 3.0, "banco")
+    assert cache.lookup("Um banco recebe clientes com taxas 2 e 3. Calcule o Lq", 2.0, 3.0)[0] == "banco"
+    assert cache.lookup("Um banco recebe clientes com taxas 2 e 3. Calcule o Lq") is None
+
+    # Cache cheio: a entrada mais antiga sai
+    assert len(cache) == 2
+    assert cache.lookup(paraphrase) is None
+
+    print("\n✅ Testes do cache semântico concluídos!")
+
+def test_partial_response():
+    """Testa a tabela local mostrada antes da explicação da IA"""
+    print("\n⚡ Testando resposta parcial...")
+
+    from agents.nodes import perform_calculation
+
+    state = perform_calculation({
+        "messages": [{"role": "user", "content": "Calcule Wq com λ=4 e μ=7"}],
+        "lambda_rate": 4.0,
+        "mu_rate": 7.0,
+        "calculation_result": {"type": "calculate_and_explain"}
+    })
+    print(state["partial_response"])
+    assert "| Wq (tempo na fila) | 0.1905 |" in state["partial_response"]
+    assert "Sistema estável" in state["partial_response"]
+
+    print("\n✅ Teste da resposta parcial concluído!")
+
+def test_api():
+    """Testa as rotas de cálculo da API HTTP"""
+    print("\n🌐 Testando API HTTP...")
+
+    from starlette.testclient import TestClient
+    from api.app import create_app
+
+    client = TestClient(create_app())
+    response = client.post("/v1/calculate", json={"lambda": 2, "mu": 3, "k": 3})
+    print(response.json())
+    assert response.status_code == 200
+    assert abs(response.json()["results"]["P_greater_3"]["value"] - (2 / 3) ** 4) < 1e-9
+
+    response = client.post("/v1/calculate/batch", json={"scenarios": [
+        {"lambda": 1, "mu": 2}, {"lambda": 3, "mu": 2, "metrics": ["L"]}, {"mu": 2}
+    ]})
+    results = response.json()["results"]
+    assert results[0]["results"]["L"]["value"] == 1.0
+    assert "error" in results[1]["results"]["L"]
+    assert results[2] == {"index": 2, "error": "Campo obrigatório ausente: lambda"}
+
+    assert client.post("/v1/chat", json={"messages": []}).status_code == 400
+
+    # Entradas inválidas: 400 com o motivo, nunca 500
+    invalid = [
+        '{"lambda": 2, "mu": 3, "n": NaN}',
+        '{"lambda": "inf", "mu": 3}',
+        '{"lambda": 1e300, "mu": 1e-10}',
+        '{"lambda": 1' + "0" * 400 + ', "mu": 3}',
+        '{"lambda": 2, "mu": 3, "k": 9223372036854775808}',
+        '{"lambda": true, "mu": 3}',
+        '{"lambda": 2, "mu": 3, "k": 1.5}',
+        '{"lambda": 2, "mu": 3, "k": 1e30}',
+        '{"lambda": 2, "mu": 3, "metrics": ["L", 5]}',
+        '{"lambda": 2, "mu": 3, "metrics": []}'
+    ]
+    for body in invalid:
+        response = client.post("/v1/calculate", content=body, headers={"Content-Type": "application/json"})
+        print(f"{body} → {response.status_code} {response.json()}")
+        assert response.status_code == 400 and "error" in response.json()
+    response = client.post("/v1/calculate", json={"lambda": 2, "mu": 3, "metrics": [], "n": 2})
+    assert list(response.json()["results"]) == ["P2"]
+    response = client.post("/v1/calculate", json={"lambda": 2, "mu": 3, "metrics": [], "k": 2 ** 63 - 1})
+    assert response.status_code == 200 and response.json()["results"][f"P_greater_{2 ** 63 - 1}"]["value"] == 0.0
+
+    print("\n✅ Testes da API concluídos!")
+
+def test_sweep():
+    """Testa a varredura vetorizada de cenários contra o MM1Calculator"""
+    print("\n📊 Testando varredura de cenários...")
+
+    import io
+    import numpy as np
+    import pandas as pd
+    from utils.sweep import compute_metrics, iter_sweep
+
+    calc = MM1Calculator()
+    metrics = compute_metrics(np.array([2.0, 1.0, 3.0]), np.array([3.0, 4.0, 2.0]),
+                              n=np.array([2.0, 0.0, 1.0]), k=np.array([3.0, 1.0, 1.0]))
+    for row, (lambda_rate, mu_rate, n, k) in enumerate([(2.0, 3.0, 2, 3), (1.0, 4.0, 0, 1)]):
+        assert abs(metrics["Lq"][row] - calc.calculate_Lq(lambda_rate, mu_rate)["value"]) < 1e-12
+        assert abs(metrics["Pn"][row] - calc.calculate_Pn(lambda_rate, mu_rate, n)["value"]) < 1e-12
+        assert abs(metrics["P_greater_k"][row] - calc.calculate_P_greater_than_k(lambda_rate, mu_rate, k)["value"]) < 1e-12
+    assert "instável" in metrics["error"][2] and np.isnan(metrics["L"][2])
+
+    # M/M/2 com λ=3, μ=2: P0 = 1/7, Lq = 27/14
+    mmc = compute_metrics(np.array([3.0]), np.array([2.0]), c=np.array([2.0]))
+    print(f"M/M/2: P0={mmc['P0'][0]:.4f}, Lq={mmc['Lq'][0]:.4f}")
+    assert abs(mmc["P0"][0] - 1 / 7) < 1e-12 and abs(mmc["Lq"][0] - 27 / 14) < 1e-12
+
+    csv = b"lambda,mu,k\n2,3,3\n3,2,1\n1,4,\n"
+    output = b"".join(iter_sweep(io.BytesIO(csv), "csv", "csv", chunk_rows=2))
+    result = pd.read_csv(io.BytesIO(output))
+    print(result[["lambda", "mu", "L", "P_greater_k"]])
+    assert len(result) == 3 and result["L"].isna().tolist() == [False, True, False]
+
+    # Valores infinitos, fora do int64 ou c acima do limite vão para "error"
+    invalid = compute_metrics(np.array([1.0, np.inf, 1.0, 1.0]), np.array([2.0, np.inf, 2.0, 2.0]),
+                              k=np.array([1e30, 1.0, np.inf, 1.0]), c=np.array([1.0, 1.0, 1.0, 2e5]))
+    print(list(invalid["error"]))
+    assert all(invalid["error"]) and np.isnan(invalid["P_greater_k"]).all()
+
+    # Coluna extra vazia no primeiro bloco e com texto depois: esquema do Parquet estável
+    labeled = b"lambda,mu,label\n1,2,\n1,3,\n1,4,b\n"
+    output = b"".join(iter_sweep(io.BytesIO(labeled), "csv", "parquet", chunk_rows=2))
+    assert pd.read_parquet(io.BytesIO(output))["label"].tolist()[2] == "b"
+
+    print("\n✅ Testes da varredura concluídos!")
+
+def test_model_router():
+    """Testa a escolha de modelo por rota e o desvio para o modelo rápido fora do SLO"""
+    print("\n🔀 Testando roteador de modelos...")
+
+    from utils.model_router import ModelRouter, PROBE_EVERY, MIN_SAMPLES
+
+    router = ModelRouter(0.1, 2000, fast_model="rapido", smart_model="grande", enabled=True)
+    assert router.select("calculate_and_explain").model == "rapido"
+    decision = router.select("ai_solve")
+    print(f"ai_solve: {decision}")
+    assert (decision.model, decision.fallback_model, decision.temperature) == ("grande", "rapido", 0.2)
+
+    # p90 acima do SLO: desvia para o modelo rápido, com uma sonda a cada PROBE_EVERY chamadas
+    for _ in range(MIN_SAMPLES):
+        router.record(decision, "grande", 60.0)
+    models = [router.select("ai_solve").model for _ in range(PROBE_EVERY)]
+    assert models.count("grande") == 1 and models[-1] == "grande"
+
+    # Sonda dentro do SLO: o modelo principal volta
+    router.record(decision, "grande", 1.0, 1000, 500)
+    assert router.select("ai_solve").model == "grande"
+    print(f"Resumo: {router.summary()}")
+
+    # GROQ_MODEL vale como modelo rápido quando GROQ_FAST_MODEL não está definido (lido na criação)
+    old_env = {name: os.environ.get(name) for name in ("GROQ_MODEL", "GROQ_FAST_MODEL", "GROQ_ROUTING")}
+    try:
+        os.environ.pop("GROQ_FAST_MODEL", None)
+        os.environ.update({"GROQ_MODEL": "modelo-do-env", "GROQ_ROUTING": "0"})
+        router = ModelRouter.from_env(0.1, 2000)
+        assert router.select("ai_solve").model == "modelo-do-env"
+    finally:
+        for name, value in old_env.items():
+            if value is None:
+                os.environ.pop(name, None)
+            else:
+                os.environ[name] = value
+
+    print("\n✅ Testes do roteador concluídos!")
+
+def test_mock_groq_server():
+    """Testa o servidor Groq simulado: streaming, max_tokens, 429 com Retry-After e o GroqClient"""
+    print("\n🧪 Testando servidor Groq simulado...")
+
+    import json
+    import threading
+    import urllib.request
+    import urllib.error
+    from utils.mock_groq_server import MockGroqConfig, create_server
+    from utils.groq_client import GroqClient
+
+    server = create_server(MockGroqConfig(latency_ms=0, tokens_per_second=0, seed=1), port=0)
+    port = server.server_address[1]
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    def post(payload):
+        request = urllib.request.Request(
+            f"http://127.0.0.1:{port}/openai/v1/chat/completions",
+            data=json.dumps(payload).encode("utf-8"), headers={"Content-Type": "application/json"}
+        )
+        return urllib.request.urlopen(request, timeout=10)
+
+    messages = [{"role": "user", "content": "Calcule as métricas com λ=2 e μ=3"}]
+    old_env = {name: os.environ.get(name) for name in ("GROQ_MOCK", "GROQ_MOCK_PORT", "GROQ_BASE_URL")}
+    try:
+        # Streaming: chunks SSE com o texto, o uso no último chunk e [DONE]
+        with post({"messages": messages, "stream": True}) as response:
+            events = [line[6:] for line in response.read().decode("utf-8").splitlines() if line.startswith("data: ")]
+        assert events[-1] == "[DONE]"
+        chunks = [json.loads(event) for event in events[:-1]]
+        text = "".join(chunk["choices"][0]["delta"].get("content", "") for chunk in chunks)
+        print(f"{len(chunks)} chunks, {len(text)} caracteres")
+        assert len(chunks) > 3 and "ρ = 0.6667" in text
+        assert chunks[-1]["choices"][0]["finish_reason"] == "stop" and chunks[-1]["x_groq"]["usage"]["completion_tokens"] > 0
+
+        # max_tokens corta a resposta
+        with post({"messages": messages, "max_tokens": 5}) as response:
+            body = json.loads(response.read())
+        assert body["choices"][0]["finish_reason"] == "length" and body["usage"]["completion_tokens"] == 5
+        assert len(body["choices"][0]["message"]["content"]) < len(text)
+
+        # 429 simulado com Retry-After
+        server.config.rate_limit_prob = 1.0
+        try:
+            post({"messages": messages})
+            assert False, "deveria responder 429"
+        except urllib.error.HTTPError as e:
+            assert e.code == 429 and e.headers["Retry-After"] == "1"
+        server.config.rate_limit_prob = 0.0
+
+        # GroqClient de ponta a ponta com GROQ_MOCK=1 e GROQ_MOCK_PORT
+        os.environ.update({"GROQ_MOCK": "1", "GROQ_MOCK_PORT": str(port)})
+        os.environ.pop("GROQ_BASE_URL", None)
+        client = GroqClient()
+        answer = client.enhance_calculation_explanation({"lambda": 2, "mu": 3}, "λ=2 e μ=3, calcule L")
+        print(answer.splitlines()[0])
+        assert "resposta simulada" in answer and "L = 2.0000" in answer
+    finally:
+        for name, value in old_env.items():
+            if value is None:
+                os.environ.pop(name, None)
+            else:
+                os.environ[name] = value
+        server.shutdown()
+        server.server_close()
+
+    print("\n✅ Testes do servidor simulado concluídos!")
+
+def test_tracing():
+    """Testa a exportação JSONL, o texto do Prometheus e o caminho desligado do rastreamento"""
+    print("\n📈 Testando rastreamento...")
+
+    import json
+    import tempfile
+    from utils import tracing
+    from utils.tracing import Tracer, DURATION_BUCKETS
+
+    original = tracing.tracer
+    try:
+        # Desligado: contexto vazio, nada registrado
+        tracing.tracer = Tracer(metrics_port=None)
+        assert not tracing.tracer.enabled
+        with tracing.trace("turno") as attrs, tracing.span("no", etapa=1) as inner:
+            inner["extra"] = True
+        tracing.count("chamadas_total")
+        tracing.observe("latencia_seconds", 0.2)
+        tracing.record_span("ocr", 0.1)
+        assert attrs == {} and inner == {"etapa": 1, "extra": True}
+        assert tracing.tracer.metrics.render() == "\n" and tracing.tracer._jsonl_file is None
+
+        # JSONL: um registro por span, com o trace_id do turno e o erro
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = os.path.join(temp_dir, "trace.jsonl")
+            tracing.tracer = Tracer(jsonl_path=path)
+            with tracing.trace("turno", usuario="ana"):
+                with tracing.span("groq.chat", route="ai_solve") as attrs:
+                    attrs["tokens"] = 12
+                try:
+                    with tracing.span("ocr"):
+                        raise RuntimeError("falhou")
+                except RuntimeError:
+                    pass
+            tracing.tracer._jsonl_file.close()
+            with open(path, encoding="utf-8") as f:
+                records = [json.loads(line) for line in f]
+        print(f"JSONL: {[record['span'] for record in records]}")
+        assert [record["span"] for record in records] == ["groq.chat", "ocr", "turno"]
+        assert len({record["trace_id"] for record in records}) == 1 and records[0]["trace_id"]
+        assert records[0]["tokens"] == 12 and records[0]["route"] == "ai_solve" and records[2]["usuario"] == "ana"
+        assert records[1]["error"] == "RuntimeError: falhou" and "error" not in records[0]
+
+        # Prometheus: buckets acumulados, +Inf, _sum/_count e rótulos escapados
+        registry = Tracer(metrics_port=None).metrics
+        for value in (0.003, 0.2, 50.0):
+            registry.observe("latencia_seconds", value, rota='a"b\\c\nd')
+        registry.count("tokens_total", 5, kind="prompt")
+        registry.count("tokens_total", 2.5, kind="prompt")
+        lines = registry.render().splitlines()
+        print("\n".join(lines[:3]))
+        labels = 'rota="a\\"b\\\\c\\nd"'
+        buckets = {bound: sum(value <= bound for value in (0.003, 0.2, 50.0)) for bound in DURATION_BUCKETS}
+        assert lines[0] == "# TYPE bosquinho_latencia_seconds histogram"
+        for bound, expected in buckets.items():
+            assert f'bosquinho_latencia_seconds_bucket{{{labels},le="{bound:g}"}} {expected}' in lines
+        assert f'bosquinho_latencia_seconds_bucket{{{labels},le="+Inf"}} 3' in lines
+        assert f"bosquinho_latencia_seconds_sum{{{labels}}} 50.203000" in lines
+        assert f"bosquinho_latencia_seconds_count{{{labels}}} 3" in lines
+        assert lines[-2:] == ["# TYPE bosquinho_tokens_total counter", 'bosquinho_tokens_total{kind="prompt"} 7.5']
+    finally:
+        tracing.tracer = original
+
+    print("\n✅ Testes do rastreamento concluídos!")
+
+def test_solve_folder():
+    """Testa a resolução offline de uma pasta e a retomada pelo checkpoint"""
+    print("\n📂 Testando resolução de pasta...")
+
+    import json
+    import tempfile
+    from utils.solve_folder import FolderSolver
+
+    with tempfile.TemporaryDirectory() as root:
+        input_dir, output_dir = os.path.join(root, "exercicios"), os.path.join(root, "resolvidos")
+        os.makedirs(os.path.join(input_dir, "lista1"))
+        with open(os.path.join(input_dir, "lista1", "ex.txt"), "w", encoding="utf-8") as f:
+            f.write("1) Chegam 2 clientes por hora e o servidor atende 3 por hora. Calcule L.\n"
+                    "2) Um caixa recebe λ = 4 clientes por hora com μ = 5 por hora; calcule Wq.")
+        # Mesmo nome com outra extensão: resultados em outra pasta
+        with open(os.path.join(input_dir, "lista1", "ex.md"), "w", encoding="utf-8") as f:
+            f.write("Uma oficina recebe λ = 1 carro por dia e atende μ = 2 por dia. Calcule W.")
+
+        stats = FolderSolver(input_dir, output_dir, workers=1).run()
+        print(f"Primeira execução: {stats}")
+        assert stats["exercises"] == 3 and stats["failed"] == 0
+
+        txt_dir = os.path.join(output_dir, "lista1", "ex.txt")
+        with open(os.path.join(txt_dir, "exercicio_02.json"), encoding="utf-8") as f:
+            record = json.load(f)
+        assert (record["lambda"], record["mu"]) == (4.0, 5.0)
+        assert abs(record["results"]["Wq"]["value"] - 0.8) < 1e-12
+        with open(os.path.join(output_dir, "lista1", "ex.md", "exercicio_01.json"), encoding="utf-8") as f:
+            assert json.load(f)["lambda"] == 1.0
+
+        # Arquivo já concluído e inalterado: a segunda execução não refaz nada
+        stats = FolderSolver(input_dir, output_dir, workers=1).run()
+        assert stats["skipped"] == 2 and stats["files"] == 0
+
+        # Arquivo alterado com menos exercícios: o JSON antigo do exercício 2 some
+        with open(os.path.join(input_dir, "lista1", "ex.txt"), "w", encoding="utf-8") as f:
+            f.write("Chegam λ = 3 clientes por hora e o servidor atende μ = 4 por hora. Calcule L.")
+        stats = FolderSolver(input_dir, output_dir, workers=1).run()
+        assert stats["files"] == 1 and sorted(os.listdir(txt_dir)) == ["exercicio_01.json"]
+
+    print("\n✅ Testes da resolução de pasta concluídos!")
+
+def test_conversation_store():
+    """Testa o checkpointer SQLite: estado por thread_id, histórico paginado e despejo da RAM"""
+    print("\n💾 Testando conversas persistentes...")
+
+    import tempfile
+    from typing import Annotated, List, TypedDict
+    from langgraph.graph import StateGraph, END
+    from langgraph.graph.message import add_messages
+    from utils.conversation_store import ConversationStore
+
+    class EchoState(TypedDict):
+        messages: Annotated[List, add_messages]
+
+    def build(store):
+        workflow = StateGraph(EchoState)
+        workflow.add_node("echo", lambda state: {"messages": [
+            {"role": "assistant", "content": f"eco: {state['messages'][-1].content}"}
+        ]})
+        workflow.set_entry_point("echo")
+        workflow.add_edge("echo", END)
+        return workflow.compile(checkpointer=store)
+
+    with tempfile.TemporaryDirectory() as root:
+        path = os.path.join(root, "conversas.sqlite3")
+        store = ConversationStore(path)
+        graph = build(store)
+        config = {"configurable": {"thread_id": "aluno-1"}}
+        for question in ("λ=2 e μ=3", "e se μ=4?"):
+            graph.invoke({"messages": [{"role": "user", "content": question}]}, config)
+            store.append_messages("aluno-1", [{"role": "user", "content": question, "image": object()}])
+        assert store._conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+
+        # Outro processo (novo store no mesmo arquivo) retoma a conversa do disco
+        reopened = ConversationStore(path)
+        state = build(reopened).get_state(config).values
+        print(f"Mensagens retomadas: {[m.content for m in state['messages']]}")
+        assert [m.content for m in state["messages"]][-1] == "eco: e se μ=4?" and len(state["messages"]) == 4
+        assert reopened._conn.execute("SELECT COUNT(*) FROM checkpoints").fetchone()[0] == 1
+
+        recent = reopened.load_messages("aluno-1", limit=1)
+        assert [m["content"] for m in recent] == ["e se μ=4?"] and "image" not in recent[0]
+        assert [m["content"] for m in reopened.load_messages("aluno-1", before=recent[0]["seq"])] == ["λ=2 e μ=3"]
+
+        reopened.idle_seconds = 0
+        assert reopened.evict_idle() == 1 and reopened.active_threads == 0
+        reopened.delete_thread("aluno-1")
+        assert store.get_tuple(config) is None and store.load_messages("aluno-1") == []
+
+    print("\n✅ Testes das conversas persistentes concluídos!")
+
+def test_image_store():
+    """Testa a miniatura e o armazenamento da imagem original por hash"""
+    print("\n🖼️ Testando armazenamento de imagens...")
+
+    import io
+    import tempfile
+    from PIL import Image
+    from utils import image_store
+
+    image = Image.new("RGB", (3000, 2000), "white")
+    output = io.BytesIO()
+    image.save(output, format="PNG")
+    data = output.getvalue()
+
+    original_dir = image_store.IMAGE_STORE_DIR
+    with tempfile.TemporaryDirectory() as root:
+        image_store.IMAGE_STORE_DIR = root
+        try:
+            stored = image_store.store_image(data, image)
+            thumbnail = Image.open(io.BytesIO(stored["image_thumbnail"]))
+            print(f"Miniatura: {thumbnail.size}, {len(stored['image_thumbnail'])} bytes")
+            assert max(thumbnail.size) == image_store.THUMBNAIL_MAX_SIDE and thumbnail.format == "JPEG"
+            assert stored["image_hash"] == image_store.content_hash(data)
+
+            # Mesmo conteúdo: mesmo hash, sem gravar de novo; mensagens do histórico só têm o hash
+            assert image_store.store_image(data) == stored
+            assert image_store.load_thumbnail(stored["image_hash"]) == stored["image_thumbnail"]
+            assert image_store.load_image(stored["image_hash"]) == data
+            assert image_store.load_image("0" * 64) is None
+        finally:
+            image_store.IMAGE_STORE_DIR = original_dir
+
+    print("\n✅ Testes do armazenamento de imagens concluídos!")
+
+def test_what_if():
+    """Testa a grade do explorador "e se...?" contra o MM1Calculator"""
+    print("\n🔀 Testando explorador e se...?")
+
+    from utils.what_if import build_grid, window, point_metrics, WHAT_IF_MAX_RHO
+
+    calc = MM1Calculator()
+    grid = build_grid(3.0, 1, points=300)
+    assert abs(grid["lambda"].iloc[-1] - WHAT_IF_MAX_RHO * 3.0) < 1e-12 and grid["rho"].max() < 1
+    row = grid.iloc[199]  # λ = 200/300 · 0.98 · 3
+    assert abs(row["L"] - calc.calculate_L(row["lambda"], 3.0)["value"]) < 1e-9
+    assert abs(row["Wq"] - calc.calculate_Wq(row["lambda"], 3.0)["value"]) < 1e-9
+
+    # Mover o λ só recorta a grade; λ instável mostra o fim da faixa estável
+    part = window(grid, 2.0)
+    print(f"Janela em λ=2: {part['lambda'].min():.3f} a {part['lambda'].max():.3f} ({len(part)} pontos)")
+    assert part["lambda"].min() >= 1.0 and part["lambda"].max() <= 3.0
+    assert len(window(grid, 50.0)) == 2
+
+    assert abs(point_metrics(2.2, 2.0, 2)["rho"] - 0.55) < 1e-12
+    assert "instável" in point_metrics(4.0, 3.0)["error"]
+
+    print("\n✅ Testes do explorador concluídos!")
+
+def test_jackson_network():
+    """Testa a rede de Jackson aberta (tandem, retorno e lote de cenários)"""
+    print("\n🔗 Testando rede de Jackson...")
+
+    import numpy as np
+    from utils.jackson_network import JacksonNetwork
+
+    calc = MM1Calculator()
+    # Triagem → atendimento → caixa: cada nó recebe as mesmas 3 chegadas por unidade de tempo
+    network = JacksonNetwork([[0, 1, 0], [0, 0, 1], [0, 0, 0]], [5, 4, 6],
+                             names=["triagem", "atendimento", "caixa"])
+    result = network.solve([3, 0, 0])
+    print(network.summary([3, 0, 0]))
+    expected_L = sum(calc.calculate_L(3, mu)["value"] for mu in (5, 4, 6))
+    assert np.allclose(result["lambda"], 3) and abs(result["L"] - expected_L) < 1e-12
+    assert abs(result["W"] - expected_L / 3) < 1e-12 and result["error"] == ""
+
+    # 20% de retrabalho volta ao atendimento (2 servidores): λ_atendimento = 3 / 0.8
+    rework = JacksonNetwork([[0, 1, 0], [0, 0.2, 0.8], [0, 0, 0]], [5, 4, 6], servers=[1, 2, 1])
+    assert np.allclose(rework.traffic([3, 0, 0]), [3, 3.75, 3])
+
+    # Vários vetores γ de uma vez, iguais à resolução um a um
+    gammas = np.array([[1, 0, 0], [3, 0.5, 0], [10, 0, 0]])
+    batch = rework.solve(gammas)
+    assert np.isclose(batch["L"][1], rework.solve(gammas[1])["L"])
+    assert batch["error"][0] == "" and "nó 1" in batch["error"][2]
+
+    try:
+        JacksonNetwork([[0, 1], [1, 0]], [1, 1])
+        assert False, "rede fechada deveria ser rejeitada"
+    except ValueError as e:
+        print(f"Rede fechada: {e}")
+
+    print("\n✅ Testes da rede de Jackson concluídos!")
+
+def test_transient():
+    """Testa a análise transitória da M/M/1 por uniformização"""
+    print("\n⏱️ Testando M/M/1 transitória...")
+
+    import numpy as np
+    from utils.transient import transient_mm1, prob_greater_than, uniformize
+
+    calc = MM1Calculator()
+    result = transient_mm1(2, 3, [0, 1, 10, 200], initial_state=3)
+    assert np.allclose(result["Pn"].sum(axis=1), 1)
+    assert result["L"][0] == 3 and result["Pn"][0, 3] == 1
+    # Com o tempo, converge para o regime permanente do MM1Calculator
+    assert abs(result["L"][-1] - calc.calculate_L(2, 3)["value"]) < 1e-6
+    assert abs(prob_greater_than(result, 2)[-1] - calc.calculate_P_greater_than_k(2, 3, 2)["value"]) < 1e-6
+
+    # Cadeia de dois estados: p1(t) = λ/(λ+μ) (1 - e^{-(λ+μ)t})
+    two_states = uniformize([1.0, 0.0], [0.0, 4.0], [1.0, 0.0], [0.3, 2.0])
+    assert np.allclose(two_states["probabilities"][:, 1], 0.2 * (1 - np.exp(-5 * np.array([0.3, 2.0]))))
+
+    # Pico com ρ > 1: a fila cresce aproximadamente (λ - μ)·t
+    rush = transient_mm1(12, 10, np.linspace(0, 10, 50))
+    print(f"E[N(10)] = {rush['L'][-1]:.2f}, P(N(10) > 20) = {prob_greater_than(rush, 20)[-1]:.3f} "
+          f"({rush['terms']} termos, {rush['capacity'] + 1} estados)")
+    assert np.all(np.diff(rush["L"]) > 0) and 20 < rush["L"][-1] < 30
+
+    # λ·t grande com ρ < 1: a cota geométrica limita a truncagem e a série para no regime permanente
+    long_run = transient_mm1(100, 200, [10000.0])
+    assert long_run["capacity"] < 100 and abs(long_run["L"][0] - calc.calculate_L(100, 200)["value"]) < 1e-6
+
+    try:
+        transient_mm1(100, 90, [10000.0])
+        assert False, "horizonte longo com ρ > 1 deveria ser rejeitado"
+    except ValueError as e:
+        print(f"Horizonte longo: {e}")
+
+    try:
+        transient_mm1(2, 0, [1])
+        assert False, "μ = 0 deveria ser rejeitado"
+    except ValueError as e:
+        print(f"Parâmetro inválido: {e}")
+
+    print("\n✅ Testes da M/M/1 transitória concluídos!")
+
+def test_birth_death():
+    """Testa o motor genérico de nascimento e morte contra as fórmulas fechadas"""
+    print("\n🧬 Testando motor de nascimento e morte...")
+
+    import time
+    import numpy as np
+    from utils.birth_death import (queue_rates, queue_metrics, stationary_distribution,
+                                   BIRTH_DEATH_INITIAL_STATES, TRUNCATION_EXCEEDED, UNSTABLE)
+    from utils.sweep import compute_metrics
+
+    calc = MM1Calculator()
+    # M/M/1: mesmas métricas do MM1Calculator
+    for lambda_rate, mu_rate in [(2, 3), (0.5, 4), (9, 10)]:
+        metrics = queue_metrics(*queue_rates(lambda_rate, mu_rate))
+        for name, method in (("L", calc.calculate_L), ("Lq", calc.calculate_Lq),
+                             ("W", calc.calculate_W), ("Wq", calc.calculate_Wq), ("P0", calc.calculate_P0)):
+            assert abs(metrics[name] - method(lambda_rate, mu_rate)["value"]) < 1e-8, name
+
+    # M/M/c: mesmas métricas da varredura (Erlang C)
+    metrics = queue_metrics(*queue_rates(9.5, 1, servers=12), servers=12)
+    erlang = compute_metrics(np.array([9.5]), np.array([1.0]), c=np.array([12.0]))
+    assert all(abs(metrics[name] - erlang[name][0]) < 1e-8 for name in ("rho", "L", "Lq", "W", "Wq", "P0"))
+
+    # M/M/1/K: L = ρ/(1-ρ) - (K+1)ρ^{K+1}/(1-ρ^{K+1})
+    rho, capacity = 2 / 3, 5
+    metrics = queue_metrics(*queue_rates(2, 3, capacity=capacity))
+    assert len(metrics["states"]) == capacity + 1
+    assert abs(metrics["L"] - (rho / (1 - rho) - (capacity + 1) * rho ** (capacity + 1) / (1 - rho ** (capacity + 1)))) < 1e-12
+
+    # Desistência 1/(n+1) na chegada: N ~ Poisson(λ/μ); abandono estabiliza ρ > 1
+    metrics = queue_metrics(*queue_rates(5, 3, balking=lambda n: 1 / (n + 1)))
+    assert abs(metrics["P0"] - np.exp(-5 / 3)) < 1e-10 and abs(metrics["L"] - 5 / 3) < 1e-8
+    metrics = queue_metrics(*queue_rates(5, 1, servers=2, reneging=0.5), servers=2)
+    print(f"Com abandono (λ=5, c=2, μ=1, θ=0.5): L = {metrics['L']:.3f}, ρ = {metrics['rho']:.3f}")
+    assert metrics["rho"] < 1
+
+    # Um milhão de estados em arrays
+    start = time.perf_counter()
+    distribution = stationary_distribution(np.full(10 ** 6, 0.999), np.ones(10 ** 6))
+    elapsed = time.perf_counter() - start
+    print(f"10^6 estados em {elapsed * 1000:.1f} ms")
+    assert len(distribution["pi"]) == 10 ** 6 + 1 and abs(distribution["pi"].sum() - 1) < 1e-9
+
+    try:
+        queue_rates(4, 3)
+        assert False, "sistema instável deveria ser rejeitado"
+    except ValueError as e:
+        print(f"Instável: {e}")
+
+    # Estável, mas ρ perto demais de 1 para o limite de estados: erro de truncagem, não de instabilidade
+    try:
+        stationary_distribution(*queue_rates(0.999999, 1), max_states=BIRTH_DEATH_INITIAL_STATES * 8)
+        assert False, "truncagem deveria exceder o limite"
+    except ValueError as e:
+        print(f"Truncagem: {e}")
+        assert str(e).startswith(TRUNCATION_EXCEEDED) and UNSTABLE not in str(e)
+    # Taxas que não decrescem na cauda continuam instáveis
+    try:
+        stationary_distribution(lambda n: np.full(np.shape(n), 2.0), lambda n: np.ones(np.shape(n)),
+                                max_states=BIRTH_DEATH_INITIAL_STATES * 8)
+        assert False, "cadeia sem regime permanente deveria ser rejeitada"
+    except ValueError as e:
+        assert str(e).startswith(UNSTABLE)
+
+    print("\n✅ Testes do motor de nascimento e morte concluídos!")
+
 def main():
     """Executa todos os testes"""
     print("🌳 Iniciando testes do Bosquinho - Assistente M/M/1")
@@ -138,8 +905,27 @@ def main():
     try:
         test_mm1_calculator()
         test_parameter_extraction()
+        test_exercise_batch()
+        test_text_normalizer()
+        test_ocr_layout()
         test_bosquinho_agent()
         test_examples()
+        test_example_catalog()
+        test_exercise_catalog()
+        test_semantic_cache()
+        test_partial_response()
+        test_api()
+        test_sweep()
+        test_model_router()
+        test_mock_groq_server()
+        test_tracing()
+        test_solve_folder()
+        test_conversation_store()
+        test_image_store()
+        test_what_if()
+        test_jackson_network()
+        test_transient()
+        test_birth_death()
 
         print("\n" + "=" * 50)
         print("🎉 Todos os testes concluídos com sucesso!")
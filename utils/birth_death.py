@@ -0,0 +1,177 @@
+"""
+Motor genérico de nascimento e morte em regime permanente
+
+Em vez de uma fórmula fechada por variante de fila, o sistema é descrito pelas taxas que
+dependem do estado: λ_n (chegada com n clientes no sistema) e μ_n (saída com n clientes).
+A distribuição estacionária sai do produto acumulado
+
+    π_n = π_0 · Π_{i<n} λ_i / μ_{i+1}
+
+calculado como soma acumulada de logaritmos (sem overflow para milhões de estados) e
+normalizado a partir do maior termo. Sem capacidade finita, a cadeia é truncada quando a massa
+restante estimada fica abaixo de ε, dobrando o número de estados até convergir.
+
+As taxas podem ser arrays ou funções de n (de preferência aceitando um array de n).
+queue_rates monta as taxas das variantes usuais: M/M/1, M/M/c, M/M/1/K, desistência na
+chegada (balking) e abandono da fila (reneging).
+"""
+
+from typing import Any, Callable, Dict, Optional, Tuple, Union
+
+import numpy as np
+
+# Tolerância da massa de probabilidade desprezada na truncagem
+BIRTH_DEATH_EPSILON = 1e-12
+# Estados iniciais e máximo da truncagem adaptativa
+BIRTH_DEATH_INITIAL_STATES = 1024
+BIRTH_DEATH_MAX_STATES = 10_000_000
+
+Rates = Union[np.ndarray, Callable[[np.ndarray], Any]]
+
+UNSTABLE = "Sistema instável (ρ ≥ 1). O sistema não pode processar a demanda."
+TRUNCATION_EXCEEDED = "Limite de truncagem excedido (ρ muito perto de 1; aumente max_states)"
+
+
+def _evaluate(rates: Rates, first: int, last: int) -> Optional[np.ndarray]:
+    """Taxas para n = first..last-1 (None quando um array não cobre a faixa toda)"""
+    if callable(rates):
+        n = np.arange(first, last)
+        try:
+            values = np.broadcast_to(np.asarray(rates(n), dtype=float), n.shape)
+        except (TypeError, ValueError):
+            # Função escalar: avalia estado por estado
+            values = np.array([rates(int(i)) for i in n], dtype=float)
+        return values
+
+    values = np.asarray(rates, dtype=float)
+    if values.shape[0] < last - first:
+        return None
+    return values[:last - first]
+
+
+def stationary_distribution(birth: Rates, death: Rates, epsilon: float = BIRTH_DEATH_EPSILON,
+                            max_states: int = BIRTH_DEATH_MAX_STATES) -> Dict[str, Any]:
+    """
+    Distribuição estacionária π de uma cadeia de nascimento e morte
+    birth[n] = λ_n para n = 0, 1, ... e death[n] = μ_{n+1} (taxa de n+1 para n).
+    Com arrays, a cadeia tem len(birth) + 1 estados; com funções, death(n) é μ_n e a
+    truncagem é adaptativa. Um λ_n = 0 encerra a cadeia no estado n (capacidade finita).
+    Devolve states, pi e tail_mass (massa estimada além do último estado)
+    """
+    # Um array de taxas fixa o tamanho da cadeia; só com funções a truncagem é adaptativa
+    finite = not (callable(birth) and callable(death))
+    if finite:
+        states = len(death if callable(birth) else birth) + 1
+    else:
+        states = BIRTH_DEATH_INITIAL_STATES
+
+    while True:
+        arrivals = _evaluate(birth, 0, states - 1)
+        departures = _evaluate(death, 1, states) if callable(death) else _evaluate(death, 0, states - 1)
+        if arrivals is None or departures is None:
+            raise ValueError("Arrays de taxas precisam ter o mesmo tamanho (λ_0..λ_{K-1} e μ_1..μ_K)")
+        if (arrivals < 0).any() or np.isnan(arrivals).any():
+            raise ValueError("Taxas de chegada (λ_n) devem ser não-negativas")
+
+        # Capacidade finita: nenhum estado depois do primeiro λ_n = 0 é alcançável
+        blocked = np.flatnonzero(arrivals == 0)
+        if blocked.size:
+            arrivals = arrivals[:blocked[0]]
+            departures = departures[:blocked[0]]
+            finite = True
+        if (departures <= 0).any() or np.isnan(departures).any():
+            raise ValueError("Taxas de atendimento (μ_n) devem ser positivas")
+
+        log_pi = np.concatenate(([0.0], np.cumsum(np.log(arrivals / departures))))
+        weights = np.exp(log_pi - log_pi.max())
+        total = weights.sum()
+
+        if finite:
+            tail_mass = 0.0
+            break
+
+        # Massa além do último estado, supondo que a razão λ_n/μ_{n+1} não cresce mais
+        ratio = float((arrivals[-(states // 4):] / departures[-(states // 4):]).max())
+        if ratio < 1:
+            tail_mass = float(weights[-1] / total * ratio / (1 - ratio))
+            if tail_mass < epsilon:
+                break
+        if states * 2 > max_states:
+            # Cauda que não decresce é instabilidade; cauda lenta demais só esgotou os estados
+            if ratio >= 1:
+                raise ValueError(f"{UNSTABLE} (a distribuição não convergiu em {states} estados)")
+            raise ValueError(f"{TRUNCATION_EXCEEDED}: a cauda ainda pesa após {states} estados")
+        states *= 2
+
+    pi = weights / total
+    if not finite:
+        # Descarta a cauda desprezível (massa acumulada do fim < ε)
+        keep = np.searchsorted(-np.cumsum(pi[::-1])[::-1], -epsilon, side="right")
+        pi = pi[:max(keep, 1)]
+        tail_mass += float(1 - pi.sum())
+        pi = pi / pi.sum()
+
+    return {"states": np.arange(pi.shape[0]), "pi": pi, "tail_mass": tail_mass}
+
+
+def queue_rates(lambda_rate: float, mu_rate: float, servers: int = 1, capacity: Optional[int] = None,
+                balking: Optional[Callable[[np.ndarray], Any]] = None,
+                reneging: float = 0.0) -> Tuple[Callable, Callable]:
+    """
+    Taxas (λ_n, μ_n) de uma fila markoviana com c servidores
+    capacity: no máximo K clientes no sistema (M/M/c/K)
+    balking: probabilidade de o cliente entrar quando encontra n no sistema
+    reneging: taxa de abandono θ de cada cliente na fila (μ_n = min(n, c)μ + (n - c)⁺θ)
+    """
+    if lambda_rate < 0:
+        raise ValueError("Taxa de chegada (λ) deve ser não-negativa")
+    if mu_rate <= 0:
+        raise ValueError("Taxa de atendimento (μ) deve ser positiva")
+    # Sem capacidade, desistência ou abandono, a estabilidade é a da M/M/c (sem truncar à toa)
+    if capacity is None and balking is None and reneging <= 0 and lambda_rate >= servers * mu_rate:
+        raise ValueError(UNSTABLE)
+
+    def birth(n):
+        rates = np.full(np.shape(n), float(lambda_rate))
+        if balking is not None:
+            rates = rates * np.asarray(balking(n), dtype=float)
+        if capacity is not None:
+            rates = np.where(n < capacity, rates, 0.0)
+        return rates
+
+    def death(n):
+        return np.minimum(n, servers) * mu_rate + np.maximum(n - servers, 0) * reneging
+
+    return birth, death
+
+
+def queue_metrics(birth: Rates, death: Rates, servers: int = 1,
+                  epsilon: float = BIRTH_DEATH_EPSILON) -> Dict[str, Any]:
+    """
+    Métricas no formato da calculadora (rho, L, Lq, W, Wq, P0) a partir das taxas
+    ρ é a ocupação média dos servidores; W e Wq usam a vazão efetiva Σ λ_n π_n (Little),
+    que já desconta clientes bloqueados ou que desistiram na chegada
+    """
+    distribution = stationary_distribution(birth, death, epsilon)
+    states, pi = distribution["states"], distribution["pi"]
+
+    arrivals = _evaluate(birth, 0, len(states))
+    if arrivals is None:
+        # Array com K valores: no último estado não há chegadas
+        arrivals = np.append(np.asarray(birth, dtype=float), 0.0)[:len(states)]
+    throughput = float(arrivals @ pi)
+
+    L = float(states @ pi)
+    Lq = float(np.maximum(states - servers, 0) @ pi)
+    return {
+        "rho": float(np.minimum(states, servers) @ pi) / servers,
+        "L": L,
+        "Lq": Lq,
+        "W": L / throughput if throughput > 0 else 0.0,
+        "Wq": Lq / throughput if throughput > 0 else 0.0,
+        "P0": float(pi[0]),
+        "throughput": throughput,
+        "states": states,
+        "pi": pi,
+        "tail_mass": distribution["tail_mass"]
+    }
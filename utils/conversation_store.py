@@ -0,0 +1,343 @@
+"""
+Conversas persistentes em SQLite (modo WAL), por thread_id
+
+ConversationStore é ao mesmo tempo o checkpointer do grafo LangGraph e o histórico
+completo exibido na interface:
+- do estado do grafo fica só o checkpoint mais recente de cada conversa, com as últimas
+  CONVERSATION_WINDOW mensagens (o agente descarta as mais antigas a cada turno)
+- o histórico completo vai para a tabela messages; ao reconectar, só as mensagens
+  recentes são carregadas
+- em RAM ficam apenas as conversas ativas: quem passa CONVERSATION_IDLE_SECONDS sem
+  mensagens sai do cache e volta do disco na próxima pergunta
+
+O arquivo pode ser compartilhado por vários processos (workers da API, Streamlit);
+antes de usar o cache, o id do checkpoint mais recente é conferido no banco.
+"""
+
+import os
+import json
+import time
+import sqlite3
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from langgraph.checkpoint.base import (
+    WRITES_IDX_MAP,
+    BaseCheckpointSaver,
+    ChannelVersions,
+    Checkpoint,
+    CheckpointMetadata,
+    CheckpointTuple,
+    get_checkpoint_id,
+    get_checkpoint_metadata,
+)
+
+from utils import tracing
+
+CONVERSATION_DB = os.getenv("CONVERSATION_DB", os.path.join(".cache", "conversations.sqlite3"))
+# Mensagens mantidas no estado do grafo e recarregadas na interface
+CONVERSATION_WINDOW = int(os.getenv("CONVERSATION_WINDOW", "20"))
+CONVERSATION_IDLE_SECONDS = float(os.getenv("CONVERSATION_IDLE_SECONDS", "1800"))
+CONVERSATION_CACHE_SIZE = int(os.getenv("CONVERSATION_CACHE_SIZE", "256"))
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS checkpoints (
+    thread_id TEXT NOT NULL,
+    checkpoint_ns TEXT NOT NULL DEFAULT '',
+    checkpoint_id TEXT NOT NULL,
+    parent_checkpoint_id TEXT,
+    type TEXT,
+    checkpoint BLOB,
+    metadata_type TEXT,
+    metadata BLOB,
+    PRIMARY KEY (thread_id, checkpoint_ns, checkpoint_id)
+);
+CREATE TABLE IF NOT EXISTS writes (
+    thread_id TEXT NOT NULL,
+    checkpoint_ns TEXT NOT NULL DEFAULT '',
+    checkpoint_id TEXT NOT NULL,
+    task_id TEXT NOT NULL,
+    idx INTEGER NOT NULL,
+    channel TEXT NOT NULL,
+    type TEXT,
+    value BLOB,
+    task_path TEXT NOT NULL DEFAULT '',
+    PRIMARY KEY (thread_id, checkpoint_ns, checkpoint_id, task_id, idx)
+);
+CREATE TABLE IF NOT EXISTS messages (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    thread_id TEXT NOT NULL,
+    role TEXT NOT NULL,
+    content TEXT NOT NULL,
+    extra TEXT,
+    created_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS messages_thread ON messages (thread_id, seq);
+"""
+
+logger = tracing.get_logger("conversations")
+
+
+def _config(thread_id: str, checkpoint_ns: str, checkpoint_id: str) -> Dict[str, Any]:
+    return {"configurable": {"thread_id": thread_id, "checkpoint_ns": checkpoint_ns, "checkpoint_id": checkpoint_id}}
+
+
+def _extra_fields(message: Dict[str, Any]) -> Optional[str]:
+    """Campos extras da mensagem que cabem em JSON (tempos e confiança do OCR)"""
+    extra = {}
+    for key, value in message.items():
+        if key in ("role", "content", "seq"):
+            continue
+        try:
+            json.dumps(value)
+        except (TypeError, ValueError):
+            continue  # Imagens e outros objetos não vão para o histórico
+        extra[key] = value
+    return json.dumps(extra, ensure_ascii=False) if extra else None
+
+
+class ConversationStore(BaseCheckpointSaver):
+    """Checkpointer do LangGraph e histórico de mensagens no mesmo arquivo SQLite"""
+
+    def __init__(self, path: str = CONVERSATION_DB, idle_seconds: float = CONVERSATION_IDLE_SECONDS,
+                 cache_size: int = CONVERSATION_CACHE_SIZE):
+        super().__init__()
+        self.path = path
+        self.idle_seconds = idle_seconds
+        self.cache_size = cache_size
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+        # (thread_id, checkpoint_ns) -> (último checkpoint, instante do último uso)
+        self._cache: "OrderedDict[Tuple[str, str], Tuple[CheckpointTuple, float]]" = OrderedDict()
+
+    # ----- cache das conversas ativas -----
+
+    def _remember(self, key: Tuple[str, str], checkpoint_tuple: CheckpointTuple):
+        self._cache[key] = (checkpoint_tuple, time.monotonic())
+        self._cache.move_to_end(key)
+        self.evict_idle()
+
+    def evict_idle(self) -> int:
+        """Tira da RAM as conversas paradas há mais de idle_seconds (e o excesso do LRU)"""
+        now = time.monotonic()
+        idle = [key for key, (_, last_used) in self._cache.items() if now - last_used > self.idle_seconds]
+        for key in idle:
+            del self._cache[key]
+        evicted = len(idle)
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+            evicted += 1
+        if evicted:
+            logger.debug("♻️ %d conversa(s) ociosa(s) removida(s) da memória", evicted)
+        return evicted
+
+    @property
+    def active_threads(self) -> int:
+        return len(self._cache)
+
+    # ----- checkpointer -----
+
+    def _load_tuple(self, thread_id: str, checkpoint_ns: str, row: Sequence[Any]) -> CheckpointTuple:
+        checkpoint_id, parent_id, type_, checkpoint, metadata_type, metadata = row
+        writes = self._conn.execute(
+            "SELECT task_id, channel, type, value, idx, task_path FROM writes "
+            "WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id = ? ORDER BY task_path, task_id, idx",
+            (thread_id, checkpoint_ns, checkpoint_id)
+        ).fetchall()
+        return CheckpointTuple(
+            config=_config(thread_id, checkpoint_ns, checkpoint_id),
+            checkpoint=self.serde.loads_typed((type_, checkpoint)),
+            metadata=self.serde.loads_typed((metadata_type, metadata)),
+            parent_config=_config(thread_id, checkpoint_ns, parent_id) if parent_id else None,
+            pending_writes=[(task_id, channel, self.serde.loads_typed((value_type, value)))
+                            for task_id, channel, value_type, value, _, _ in writes]
+        )
+
+    def get_tuple(self, config: Dict[str, Any]) -> Optional[CheckpointTuple]:
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        columns = "checkpoint_id, parent_checkpoint_id, type, checkpoint, metadata_type, metadata"
+
+        with self._lock:
+            if checkpoint_id := get_checkpoint_id(config):
+                row = self._conn.execute(
+                    f"SELECT {columns} FROM checkpoints WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id = ?",
+                    (thread_id, checkpoint_ns, checkpoint_id)
+                ).fetchone()
+                return self._load_tuple(thread_id, checkpoint_ns, row) if row else None
+
+            key = (thread_id, checkpoint_ns)
+            latest = self._conn.execute(
+                "SELECT checkpoint_id FROM checkpoints WHERE thread_id = ? AND checkpoint_ns = ? "
+                "ORDER BY checkpoint_id DESC LIMIT 1",
+                key
+            ).fetchone()
+            if latest is None:
+                self._cache.pop(key, None)
+                return None
+
+            cached = self._cache.get(key)
+            if cached and cached[0].config["configurable"]["checkpoint_id"] == latest[0]:
+                self._remember(key, cached[0])
+                return cached[0]
+
+            row = self._conn.execute(
+                f"SELECT {columns} FROM checkpoints WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id = ?",
+                (thread_id, checkpoint_ns, latest[0])
+            ).fetchone()
+            checkpoint_tuple = self._load_tuple(thread_id, checkpoint_ns, row)
+            self._remember(key, checkpoint_tuple)
+            return checkpoint_tuple
+
+    def list(self, config: Optional[Dict[str, Any]], *, filter: Optional[Dict[str, Any]] = None,
+             before: Optional[Dict[str, Any]] = None, limit: Optional[int] = None) -> Iterator[CheckpointTuple]:
+        query = "SELECT thread_id, checkpoint_ns, checkpoint_id, parent_checkpoint_id, type, checkpoint, " \
+                "metadata_type, metadata FROM checkpoints"
+        clauses, params = [], []
+        if config:
+            clauses.append("thread_id = ?")
+            params.append(config["configurable"]["thread_id"])
+            if "checkpoint_ns" in config["configurable"]:
+                clauses.append("checkpoint_ns = ?")
+                params.append(config["configurable"]["checkpoint_ns"])
+            if checkpoint_id := get_checkpoint_id(config):
+                clauses.append("checkpoint_id = ?")
+                params.append(checkpoint_id)
+        if before and (before_id := get_checkpoint_id(before)):
+            clauses.append("checkpoint_id < ?")
+            params.append(before_id)
+        if clauses:
+            query += " WHERE " + " AND ".join(clauses)
+        query += " ORDER BY checkpoint_id DESC"
+
+        with self._lock:
+            rows = self._conn.execute(query, params).fetchall()
+            tuples = []
+            for thread_id, checkpoint_ns, *row in rows:
+                checkpoint_tuple = self._load_tuple(thread_id, checkpoint_ns, row)
+                if filter and any(checkpoint_tuple.metadata.get(k) != v for k, v in filter.items()):
+                    continue
+                tuples.append(checkpoint_tuple)
+                if limit is not None and len(tuples) >= limit:
+                    break
+        yield from tuples
+
+    def put(self, config: Dict[str, Any], checkpoint: Checkpoint, metadata: CheckpointMetadata,
+            new_versions: ChannelVersions) -> Dict[str, Any]:
+        """Grava o checkpoint e apaga os anteriores da conversa (não há volta no tempo aqui)"""
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        parent_id = config["configurable"].get("checkpoint_id")
+        type_, serialized = self.serde.dumps_typed(checkpoint)
+        metadata_type, serialized_metadata = self.serde.dumps_typed(get_checkpoint_metadata(config, metadata))
+
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO checkpoints VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    (thread_id, checkpoint_ns, checkpoint["id"], parent_id, type_, serialized,
+                     metadata_type, serialized_metadata)
+                )
+                for table in ("checkpoints", "writes"):
+                    self._conn.execute(
+                        f"DELETE FROM {table} WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id < ?",
+                        (thread_id, checkpoint_ns, checkpoint["id"])
+                    )
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+
+            new_config = _config(thread_id, checkpoint_ns, checkpoint["id"])
+            self._remember((thread_id, checkpoint_ns), CheckpointTuple(
+                config=new_config,
+                checkpoint=self.serde.loads_typed((type_, serialized)),
+                metadata=self.serde.loads_typed((metadata_type, serialized_metadata)),
+                parent_config=_config(thread_id, checkpoint_ns, parent_id) if parent_id else None,
+                pending_writes=[]
+            ))
+        return new_config
+
+    def put_writes(self, config: Dict[str, Any], writes: Sequence[Tuple[str, Any]], task_id: str,
+                   task_path: str = "") -> None:
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        checkpoint_id = config["configurable"]["checkpoint_id"]
+
+        rows = []
+        for index, (channel, value) in enumerate(writes):
+            type_, serialized = self.serde.dumps_typed(value)
+            rows.append((thread_id, checkpoint_ns, checkpoint_id, task_id, WRITES_IDX_MAP.get(channel, index),
+                         channel, type_, serialized, task_path))
+        # Escritas especiais (erros, interrupções) substituem; as comuns não se repetem
+        replace = all(channel in WRITES_IDX_MAP for channel, _ in writes)
+
+        with self._lock:
+            self._conn.executemany(
+                f"INSERT OR {'REPLACE' if replace else 'IGNORE'} INTO writes VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                rows
+            )
+            self._cache.pop((thread_id, checkpoint_ns), None)
+
+    def delete_thread(self, thread_id: str) -> None:
+        """Apaga o estado do grafo e o histórico da conversa"""
+        with self._lock:
+            for table in ("checkpoints", "writes", "messages"):
+                self._conn.execute(f"DELETE FROM {table} WHERE thread_id = ?", (thread_id,))
+            for key in [key for key in self._cache if key[0] == thread_id]:
+                del self._cache[key]
+
+    # ----- histórico exibido na interface -----
+
+    def append_messages(self, thread_id: str, messages: List[Dict[str, Any]]):
+        """Acrescenta mensagens ({role, content, ...}) ao histórico completo da conversa"""
+        now = time.time()
+        with self._lock:
+            self._conn.executemany(
+                "INSERT INTO messages (thread_id, role, content, extra, created_at) VALUES (?, ?, ?, ?, ?)",
+                [(thread_id, message["role"], message["content"], _extra_fields(message), now)
+                 for message in messages]
+            )
+
+    def load_messages(self, thread_id: str, limit: int = CONVERSATION_WINDOW,
+                      before: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        Últimas mensagens da conversa, da mais antiga para a mais nova
+        Com before (seq de uma mensagem já exibida), busca a página anterior
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT seq, role, content, extra FROM messages WHERE thread_id = ? AND seq < ? "
+                "ORDER BY seq DESC LIMIT ?",
+                (thread_id, before if before is not None else 2 ** 62, limit)
+            ).fetchall()
+        return [
+            {"seq": seq, "role": role, "content": content, **(json.loads(extra) if extra else {})}
+            for seq, role, content, extra in reversed(rows)
+        ]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+            self._cache.clear()
+
+
+_store: Optional[ConversationStore] = None
+_store_lock = threading.Lock()
+
+
+def get_conversation_store() -> ConversationStore:
+    """Instância compartilhada do processo (Streamlit e workers da API)"""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = ConversationStore()
+        return _store
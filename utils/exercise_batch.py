@@ -0,0 +1,140 @@
+"""
+Resolução em lote de listas de exercícios M/M/1
+Separa os exercícios do texto extraído e resolve pela calculadora, sem chamar a IA
+"""
+
+import re
+from typing import Any, Dict, List, Optional, Tuple
+
+
+# Marcadores de início de exercício: "Exercício 3", "Questão 2", "1)", "2 -", "3. Um banco..."
+# Numeração solta só conta no começo da linha ou depois de pontuação de fim de frase
+# ("μ = 3. Calcule" e "Lista 3 - " não são marcadores); a maiúscula depois de "3." é exigida
+# mesmo com IGNORECASE
+EXERCISE_MARKER = re.compile(
+    r'(?:\b(?:exerc[ií]cio|quest[ãa]o|problema)\s*\d+\s*[:.)-]?'
+    r'|(?:^|(?<=[.!?;:]))[ \t]*\d{1,2}(?:\s*[)-]\s+|\.\s+(?=(?-i:[A-ZÁÉÍÓÚÂÊÔÃÕÇ]))))',
+    re.IGNORECASE | re.MULTILINE
+)
+
+# Tamanho mínimo para um trecho ser considerado exercício
+MIN_EXERCISE_LENGTH = 20
+
+
+def split_exercises(text: str) -> List[str]:
+    """Separa o texto de uma lista em exercícios individuais"""
+    if not text:
+        return []
+
+    starts = [match.start() for match in EXERCISE_MARKER.finditer(text)]
+    if not starts or starts[0] != 0:
+        starts.insert(0, 0)
+
+    exercises = []
+    pending = ""
+    for start, end in zip(starts, starts[1:] + [len(text)]):
+        chunk = text[start:end].strip()
+        if pending:
+            chunk = f"{pending} {chunk}".strip()
+            pending = ""
+        if len(chunk) >= MIN_EXERCISE_LENGTH:
+            exercises.append(chunk)
+        elif chunk and exercises:
+            # Marcador falso (ex.: numeração solta) - junta ao exercício anterior
+            exercises[-1] = f"{exercises[-1]} {chunk}"
+        elif chunk:
+            # Trecho curto antes do primeiro exercício - junta ao seguinte, nunca descarta
+            pending = chunk
+
+    if pending:
+        exercises.append(pending)
+    return exercises
+
+
+def solve_exercises_locally(exercises: List[str]) -> List[Dict[str, Any]]:
+    """
+    Resolve os exercícios pela calculadora (caminho rápido, sem IA)
+    Pares (λ, μ) repetidos são calculados uma única vez
+    """
+    from agents.nodes import extract_parameters, perform_calculation
+
+    solved_by_params: Dict[Tuple[float, float], Dict] = {}
+    solutions = []
+
+    for index, exercise in enumerate(exercises, 1):
+        state = extract_parameters({
+            "messages": [{"role": "user", "content": exercise}],
+            "lambda_rate": None,
+            "mu_rate": None,
+            "n_value": None,
+            "k_value": None,
+            "calculation_result": None,
+            "error_message": None
+        })
+
+        lambda_rate = state.get("lambda_rate")
+        mu_rate = state.get("mu_rate")
+        results: Optional[Dict] = None
+        error: Optional[str] = None
+
+        if lambda_rate is not None and mu_rate is not None:
+            key = (lambda_rate, mu_rate)
+            if key not in solved_by_params:
+                state["calculation_result"] = {"type": "calculate_and_explain"}
+                state = perform_calculation(state)
+                solved_by_params[key] = {
+                    "results": state["calculation_result"],
+                    "error": state.get("error_message")
+                }
+            results = solved_by_params[key]["results"]
+            error = solved_by_params[key]["error"]
+
+        solutions.append({
+            "index": index,
+            "text": exercise,
+            "lambda": lambda_rate,
+            "mu": mu_rate,
+            "results": results,
+            "error": error
+        })
+
+    return solutions
+
+
+def _metric_value(results: Dict, key: str) -> str:
+    """Formata uma métrica do resultado da calculadora"""
+    metric = results.get(key, {})
+    if "error" in metric:
+        return "—"
+    value = metric.get("value")
+    return f"{value:.4f}" if isinstance(value, (int, float)) else "—"
+
+
+def format_batch_summary(solutions: List[Dict[str, Any]]) -> str:
+    """Monta a resposta em markdown com a tabela de resultados do lote"""
+    solved = [s for s in solutions if s["results"] is not None]
+    pending = [s for s in solutions if s["results"] is None]
+
+    lines = [f"🍖 **Milanesa resolveu {len(solved)} de {len(solutions)} exercícios da lista!**", ""]
+
+    if solved:
+        lines += [
+            "| # | λ | μ | ρ | L | Lq | W | Wq | P0 |",
+            "|---|---|---|---|---|---|---|---|---|"
+        ]
+        for s in solved:
+            results = s["results"]
+            metrics = " | ".join(_metric_value(results, key) for key in ["rho", "L", "Lq", "W", "Wq", "P0"])
+            lines.append(f"| {s['index']} | {s['lambda']:.4g} | {s['mu']:.4g} | {metrics} |")
+
+        unstable = [s["index"] for s in solved if "error" in s["results"].get("L", {})]
+        if unstable:
+            lines += ["", f"⚠️ **Sistemas instáveis (ρ ≥ 1):** exercícios {', '.join(map(str, unstable))}"]
+
+    if pending:
+        lines += ["", "❓ **Sem λ e μ explícitos** (envie individualmente para a IA interpretar):"]
+        for s in pending:
+            snippet = s["text"][:120] + ("..." if len(s["text"]) > 120 else "")
+            lines.append(f"- **{s['index']}.** {snippet}")
+
+    return "\n".join(lines)
@@ -0,0 +1,448 @@
+"""
+Catálogo de exercícios M/M/1 com soluções verificadas
+Os exercícios ficam em data/exercise_catalog.json e são indexados por (λ, μ),
+por palavra-chave do cenário e por apelido ("exemplo do banco"), de modo que uma
+pergunta conhecida é respondida sem chamar a IA
+
+Regenerar o catálogo (mantém os exemplos em destaque e verifica tudo):
+    python -m utils.exercise_catalog --build
+"""
+
+import os
+import re
+import json
+import random
+import argparse
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+from utils.mm1_calculator import MM1Calculator
+
+
+CATALOG_PATH = os.getenv(
+    "EXERCISE_CATALOG",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "exercise_catalog.json")
+)
+
+# Casas decimais usadas para indexar (λ, μ): 1/3 digitado como "1/3" cai na mesma chave
+PARAM_DECIMALS = 6
+
+# Tolerância ao verificar as soluções gravadas contra a calculadora
+VERIFY_TOLERANCE = 1e-9
+
+# Maior apelido indexado, em palavras ("exemplo do aeroporto 1" = 4)
+MAX_ALIAS_WORDS = 5
+
+STANDARD_METRICS = ["rho", "L", "Lq", "W", "Wq", "P0"]
+
+METRIC_LABELS = {
+    "rho": "ρ (utilização)",
+    "L": "L (clientes no sistema)",
+    "Lq": "Lq (clientes na fila)",
+    "W": "W (tempo no sistema)",
+    "Wq": "Wq (tempo na fila)",
+    "P0": "P0 (sistema vazio)"
+}
+
+# Palavras de um pedido simples de exemplo ("resolva o exemplo do banco, por favor");
+# qualquer outra (comparação, "e se", pergunta extra) manda a pergunta para a IA
+ALIAS_REQUEST_WORDS = {
+    "resolva", "resolver", "resolve", "mostre", "mostrar", "mostra", "explique", "explicar", "explica",
+    "calcule", "calcular", "faça", "fazer", "refaça", "ver", "quero", "gostaria", "pode", "poderia",
+    "me", "o", "a", "os", "as", "do", "da", "de", "por", "favor", "passo", "solução", "resolução",
+    "resultado", "resultados", "completo", "completa"
+}
+
+WORD = re.compile(r'\w+')
+NUMBER = re.compile(r'(?<!\w)\d+(?:[.,]\d+)?(?:/\d+)?')
+METRIC_SPEC = re.compile(r'^(?:P(?P<n>\d+)|P_greater_(?P<k>\d+)|P_leq_(?P<leq>\d+))$')
+
+
+def param_key(lambda_rate: float, mu_rate: float) -> Tuple[float, float]:
+    """Chave do índice por parâmetros"""
+    return round(float(lambda_rate), PARAM_DECIMALS), round(float(mu_rate), PARAM_DECIMALS)
+
+
+def _parse_number(token: str) -> float:
+    token = token.replace(",", ".")
+    if "/" in token:
+        numerator, denominator = token.split("/")
+        return float(numerator) / float(denominator)
+    return float(token)
+
+
+def calculate_metric(metric: str, lambda_rate: float, mu_rate: float) -> Dict[str, Any]:
+    """Calcula uma métrica pelo nome usado no catálogo (rho, L, ..., P1, P_greater_2, P_leq_3)"""
+    calc = MM1Calculator()
+    standard = {
+        "rho": calc.calculate_rho,
+        "L": calc.calculate_L,
+        "Lq": calc.calculate_Lq,
+        "W": calc.calculate_W,
+        "Wq": calc.calculate_Wq,
+        "P0": calc.calculate_P0
+    }
+    if metric in standard:
+        return standard[metric](lambda_rate, mu_rate)
+
+    match = METRIC_SPEC.match(metric)
+    if not match:
+        return {"error": f"Métrica desconhecida no catálogo: {metric}"}
+
+    if match.group("n") is not None:
+        return calc.calculate_Pn(lambda_rate, mu_rate, int(match.group("n")))
+    if match.group("k") is not None:
+        return calc.calculate_P_greater_than_k(lambda_rate, mu_rate, int(match.group("k")))
+
+    k = int(match.group("leq"))
+    p_greater = calc.calculate_P_greater_than_k(lambda_rate, mu_rate, k)
+    if "error" in p_greater:
+        return p_greater
+    return {
+        "value": 1 - p_greater["value"],
+        "description": f"P(N≤{k}) = 1 - P(N>{k}) = 1 - {p_greater['value']:.4f} = {1 - p_greater['value']:.4f}",
+        "type": metric
+    }
+
+
+def metric_label(metric: str) -> str:
+    if metric in METRIC_LABELS:
+        return METRIC_LABELS[metric]
+    match = METRIC_SPEC.match(metric)
+    if match and match.group("n") is not None:
+        return f"P{match.group('n')} (exatamente {match.group('n')} no sistema)"
+    if match and match.group("k") is not None:
+        return f"P(N>{match.group('k')})"
+    if match and match.group("leq") is not None:
+        return f"P(N≤{match.group('leq')})"
+    return metric
+
+
+def metric_numbers(metric: str) -> Set[float]:
+    """Números que aparecem no enunciado por causa da métrica (n de Pn, k de P(N>k))"""
+    return {float(value) for value in re.findall(r'\d+', metric)}
+
+
+class ExerciseCatalog:
+    """Exercícios indexados por (λ, μ), palavra-chave e apelido"""
+
+    def __init__(self, exercises: Iterable[Dict[str, Any]]):
+        self.exercises: Dict[str, Dict[str, Any]] = {}
+        self.by_params: Dict[Tuple[float, float], List[str]] = {}
+        self.by_keyword: Dict[str, Set[str]] = {}
+        self.by_alias: Dict[str, str] = {}
+        self._alias_starts: Set[str] = set()
+
+        for exercise in exercises:
+            exercise_id = exercise["id"]
+            self.exercises[exercise_id] = exercise
+            self.by_params.setdefault(param_key(exercise["lambda_rate"], exercise["mu_rate"]), []).append(exercise_id)
+            for keyword in exercise.get("keywords", []):
+                self.by_keyword.setdefault(keyword.lower(), set()).add(exercise_id)
+            for alias in exercise.get("aliases", []):
+                words = WORD.findall(alias.lower())
+                self.by_alias[" ".join(words)] = exercise_id
+                self._alias_starts.add(words[0])
+
+    def __len__(self) -> int:
+        return len(self.exercises)
+
+    def get(self, exercise_id: str) -> Dict[str, Any]:
+        return self.exercises[exercise_id]
+
+    @property
+    def featured(self) -> List[Dict[str, Any]]:
+        """Exemplos em destaque (barra lateral), na ordem do arquivo"""
+        return [exercise for exercise in self.exercises.values() if exercise.get("featured")]
+
+    def lookup(self, lambda_rate: float, mu_rate: float) -> List[Dict[str, Any]]:
+        """Exercícios com exatamente estes parâmetros - O(1)"""
+        return [self.exercises[exercise_id] for exercise_id in self.by_params.get(param_key(lambda_rate, mu_rate), [])]
+
+    def search(self, text: str) -> Dict[str, int]:
+        """Exercícios cujas palavras-chave aparecem no texto, com o número de acertos"""
+        hits: Dict[str, int] = {}
+        for word in set(WORD.findall(text.lower())):
+            for exercise_id in self.by_keyword.get(word, ()):
+                hits[exercise_id] = hits.get(exercise_id, 0) + 1
+        return hits
+
+    def match_alias(self, text: str) -> Optional[Dict[str, Any]]:
+        """Apelido citado no texto ("exemplo do aeroporto 1"), via n-gramas de palavras - O(palavras)"""
+        words = WORD.findall(text.lower())
+        for start, word in enumerate(words):
+            # Só palavras que iniciam algum apelido abrem n-gramas
+            if word not in self._alias_starts:
+                continue
+            for size in range(min(MAX_ALIAS_WORDS, len(words) - start), 0, -1):
+                exercise_id = self.by_alias.get(" ".join(words[start:start + size]))
+                if exercise_id:
+                    return self.exercises[exercise_id]
+        return None
+
+    def alias_request(self, text: str) -> Optional[Dict[str, Any]]:
+        """
+        Exercício de um pedido que é só o apelido ("Resolva o exemplo do banco"), ou None
+        Dois apelidos ou qualquer palavra fora de ALIAS_REQUEST_WORDS não contam
+        """
+        words = WORD.findall(text.lower())
+        found = []
+        start = 0
+        while start < len(words):
+            size = 0
+            if words[start] in self._alias_starts:
+                size = next((size for size in range(min(MAX_ALIAS_WORDS, len(words) - start), 0, -1)
+                             if " ".join(words[start:start + size]) in self.by_alias), 0)
+            if size:
+                found.append(self.by_alias[" ".join(words[start:start + size])])
+                start += size
+            elif words[start] in ALIAS_REQUEST_WORDS:
+                start += 1
+            else:
+                return None
+        if len(found) != 1:
+            return None
+        return self.exercises[found[0]]
+
+    def match(self, text: str, lambda_rate: Optional[float] = None,
+              mu_rate: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        """
+        Exercício conhecido correspondente à pergunta, ou None
+        Apelido ("exemplo do banco"): só um pedido simples do exemplo, sem outros (λ, μ)
+        Com (λ, μ): parâmetros idênticos, cenário citado e nenhum outro número no texto
+        (um n ou k diferente do gravado é pergunta nova e vai para a IA)
+        """
+        has_params = lambda_rate is not None and mu_rate is not None
+        candidates = self.lookup(lambda_rate, mu_rate) if has_params else []
+        if has_params and not candidates:
+            return None
+
+        alias_match = self.alias_request(text)
+        if alias_match and (not has_params or alias_match in candidates):
+            return alias_match
+
+        if not has_params:
+            return None
+
+        hits = self.search(text)
+        scored = sorted(
+            ((hits.get(exercise["id"], 0), exercise) for exercise in candidates),
+            key=lambda item: -item[0]
+        )
+        score, best = scored[0]
+        if not score:
+            return None
+
+        known = set(param_key(lambda_rate, mu_rate))
+        for metric in best["metrics"]:
+            known |= metric_numbers(metric)
+        for token in NUMBER.findall(text):
+            try:
+                value = round(_parse_number(token), PARAM_DECIMALS)
+            except (ValueError, ZeroDivisionError):
+                continue
+            if value not in known:
+                return None
+
+        return best
+
+    def solve(self, exercise_id: str) -> Dict[str, Any]:
+        """Resultados (com descrições) das métricas do exercício e das principais - memorizados"""
+        return _solve(self, exercise_id)
+
+    def verify(self) -> List[str]:
+        """Compara as soluções gravadas com a calculadora; devolve as divergências"""
+        problems = []
+        for exercise in self.exercises.values():
+            for metric in exercise["metrics"]:
+                expected = exercise.get("solution", {}).get(metric)
+                result = calculate_metric(metric, exercise["lambda_rate"], exercise["mu_rate"])
+                if "error" in result:
+                    problems.append(f"{exercise['id']}: {metric} - {result['error']}")
+                elif expected is None or abs(result["value"] - expected) > VERIFY_TOLERANCE:
+                    problems.append(f"{exercise['id']}: {metric} gravado {expected}, calculado {result['value']}")
+        return problems
+
+
+@lru_cache(maxsize=1024)
+def _solve(catalog: ExerciseCatalog, exercise_id: str) -> Dict[str, Any]:
+    exercise = catalog.get(exercise_id)
+    # Métricas pedidas no enunciado primeiro; as principais sempre presentes (a pergunta pode pedir L)
+    metrics = exercise["metrics"] + [metric for metric in STANDARD_METRICS if metric not in exercise["metrics"]]
+    return {
+        metric: calculate_metric(metric, exercise["lambda_rate"], exercise["mu_rate"])
+        for metric in metrics
+    }
+
+
+def format_solution(exercise: Dict[str, Any], results: Dict[str, Any]) -> str:
+    """Resposta em markdown a partir da solução verificada (sem IA)"""
+    unit = exercise.get("unit", "")
+    lines = [
+        f"🍖 **{exercise['title']}**",
+        "",
+        exercise.get("statement", "").strip(),
+        "",
+        f"**Parâmetros:** λ = {exercise['lambda_rate']:.4g} {unit} · μ = {exercise['mu_rate']:.4g} {unit}".rstrip(),
+        "",
+        "| Métrica | Resultado |",
+        "|---|---|"
+    ]
+    for metric, result in results.items():
+        value = result.get("error") or f"{result['value']:.4f}"
+        lines.append(f"| {metric_label(metric)} | {value} |")
+
+    lines.append("")
+    for result in results.values():
+        if result.get("description"):
+            lines.append(f"- {result['description']}")
+
+    rho = results.get("rho", {}).get("value")
+    if rho is not None:
+        lines += ["", f"{'✅ Sistema estável' if rho < 1 else '⚠️ Sistema instável'} (ρ = {rho:.2%})."]
+
+    lines += ["", "📚 _Exercício do catálogo: solução verificada com a calculadora M/M/1._"]
+    return "\n".join(lines)
+
+
+def load_catalog(path: str = CATALOG_PATH) -> ExerciseCatalog:
+    with open(path, encoding="utf-8") as f:
+        return ExerciseCatalog(json.load(f)["exercises"])
+
+
+@lru_cache(maxsize=None)
+def get_catalog() -> ExerciseCatalog:
+    """Catálogo carregado uma vez por processo"""
+    return load_catalog()
+
+
+# Cenários usados para gerar os exercícios do catálogo (--build)
+SCENARIOS = [
+    {"key": "banco", "title": "🏦 Banco", "keywords": ["banco", "caixa", "agência", "bancário"],
+     "unit": "clientes/min", "scale": (0.5, 6.0),
+     "statement": "Em uma agência bancária com um caixa, os clientes chegam a uma taxa de {lambda_rate} por minuto e o caixa atende {mu_rate} clientes por minuto."},
+    {"key": "aeroporto", "title": "🛩️ Aeroporto", "keywords": ["aeroporto", "avião", "aviões", "pista", "pouso"],
+     "unit": "aviões/min", "scale": (0.1, 3.0),
+     "statement": "Um aeroporto com pista única recebe aviões a uma taxa de {lambda_rate} por minuto e a pista libera {mu_rate} pousos por minuto."},
+    {"key": "drive_thru", "title": "🍔 Drive-thru", "keywords": ["drive", "thru", "lanchonete", "carros"],
+     "unit": "carros/min", "scale": (0.5, 4.0),
+     "statement": "Em um drive-thru com uma janela, chegam {lambda_rate} carros por minuto e o atendimento é de {mu_rate} carros por minuto."},
+    {"key": "call_center", "title": "📞 Call center", "keywords": ["call", "center", "chamadas", "ligações", "operador"],
+     "unit": "chamadas/h", "scale": (5.0, 60.0),
+     "statement": "Um call center com um operador recebe {lambda_rate} chamadas por hora e o operador atende {mu_rate} chamadas por hora."},
+    {"key": "supermercado", "title": "🛒 Supermercado", "keywords": ["supermercado", "mercado", "checkout", "compras"],
+     "unit": "clientes/h", "scale": (10.0, 80.0),
+     "statement": "No caixa rápido de um supermercado chegam {lambda_rate} clientes por hora e o caixa atende {mu_rate} clientes por hora."},
+    {"key": "oficina", "title": "🔧 Oficina", "keywords": ["oficina", "mecânico", "conserto", "reparo"],
+     "unit": "carros/dia", "scale": (1.0, 12.0),
+     "statement": "Uma oficina com um mecânico recebe {lambda_rate} carros por dia e consegue consertar {mu_rate} carros por dia."},
+    {"key": "farmacia", "title": "💊 Farmácia", "keywords": ["farmácia", "farmacêutico", "remédios", "balcão"],
+     "unit": "clientes/h", "scale": (5.0, 40.0),
+     "statement": "Em uma farmácia com um balcão chegam {lambda_rate} clientes por hora e o farmacêutico atende {mu_rate} clientes por hora."},
+    {"key": "pedagio", "title": "🚗 Pedágio", "keywords": ["pedágio", "cabine", "rodovia", "praça"],
+     "unit": "carros/min", "scale": (0.5, 8.0),
+     "statement": "Uma cabine de pedágio recebe {lambda_rate} carros por minuto e processa {mu_rate} carros por minuto."},
+    {"key": "servidor", "title": "🖥️ Servidor web", "keywords": ["servidor", "requisições", "web", "api"],
+     "unit": "requisições/s", "scale": (10.0, 200.0),
+     "statement": "Um servidor web recebe {lambda_rate} requisições por segundo e processa {mu_rate} requisições por segundo."},
+    {"key": "restaurante", "title": "🍕 Restaurante", "keywords": ["restaurante", "pedidos", "cozinha", "pizzaria"],
+     "unit": "pedidos/h", "scale": (5.0, 50.0),
+     "statement": "A cozinha de um restaurante recebe {lambda_rate} pedidos por hora e prepara {mu_rate} pedidos por hora."},
+    {"key": "hospital", "title": "🏥 Triagem hospitalar", "keywords": ["hospital", "triagem", "pacientes", "enfermeiro"],
+     "unit": "pacientes/h", "scale": (2.0, 20.0),
+     "statement": "Na triagem de um hospital chegam {lambda_rate} pacientes por hora e o enfermeiro atende {mu_rate} pacientes por hora."},
+    {"key": "impressora", "title": "🖨️ Impressora", "keywords": ["impressora", "impressão", "documentos", "trabalhos"],
+     "unit": "trabalhos/min", "scale": (0.5, 10.0),
+     "statement": "Uma impressora compartilhada recebe {lambda_rate} trabalhos por minuto e imprime {mu_rate} trabalhos por minuto."},
+    {"key": "posto", "title": "⛽ Posto de gasolina", "keywords": ["posto", "gasolina", "bomba", "combustível"],
+     "unit": "carros/h", "scale": (5.0, 40.0),
+     "statement": "Um posto de gasolina com uma bomba recebe {lambda_rate} carros por hora e abastece {mu_rate} carros por hora."},
+    {"key": "biblioteca", "title": "📚 Biblioteca", "keywords": ["biblioteca", "empréstimo", "livros", "bibliotecário"],
+     "unit": "alunos/h", "scale": (5.0, 30.0),
+     "statement": "No balcão de empréstimo de uma biblioteca chegam {lambda_rate} alunos por hora e o bibliotecário atende {mu_rate} alunos por hora."},
+    {"key": "lavanderia", "title": "🧺 Lavanderia", "keywords": ["lavanderia", "máquina", "roupas", "lavagem"],
+     "unit": "clientes/h", "scale": (1.0, 10.0),
+     "statement": "Uma lavanderia com uma máquina recebe {lambda_rate} clientes por hora e conclui {mu_rate} lavagens por hora."}
+]
+
+EXERCISES_PER_SCENARIO = 20
+
+
+def _nice(value: float) -> float:
+    """Arredonda para valores de enunciado (inteiros, ou uma casa decimal abaixo de 5)"""
+    return float(round(value)) if value >= 5 else round(value, 1) or 0.1
+
+
+def generate_exercises(seed: int = 42) -> List[Dict[str, Any]]:
+    """Gera exercícios estáveis e distintos para cada cenário"""
+    rng = random.Random(seed)
+    exercises = []
+
+    for scenario in SCENARIOS:
+        low, high = scenario["scale"]
+        seen = set()
+        while len(seen) < EXERCISES_PER_SCENARIO:
+            mu_rate = _nice(rng.uniform(low, high))
+            lambda_rate = _nice(mu_rate * rng.uniform(0.2, 0.95))
+            if not 0 < lambda_rate < mu_rate or (lambda_rate, mu_rate) in seen:
+                continue
+            seen.add((lambda_rate, mu_rate))
+
+            metrics = STANDARD_METRICS + [f"P_greater_{rng.choice([2, 3, 5])}"]
+            exercises.append({
+                "id": f"{scenario['key']}_{len(seen):02d}",
+                "title": f"{scenario['title']} - λ={lambda_rate:g}, μ={mu_rate:g}",
+                "scenario": scenario["key"],
+                "keywords": scenario["keywords"],
+                "unit": scenario["unit"],
+                "statement": scenario["statement"].format(lambda_rate=f"{lambda_rate:g}", mu_rate=f"{mu_rate:g}"),
+                "lambda_rate": lambda_rate,
+                "mu_rate": mu_rate,
+                "metrics": metrics
+            })
+
+    return exercises
+
+
+def with_solution(exercise: Dict[str, Any]) -> Dict[str, Any]:
+    """Grava no exercício o valor de cada métrica (verificado na carga dos testes)"""
+    exercise["solution"] = {
+        metric: calculate_metric(metric, exercise["lambda_rate"], exercise["mu_rate"])["value"]
+        for metric in exercise["metrics"]
+    }
+    return exercise
+
+
+def build_catalog(path: str = CATALOG_PATH, seed: int = 42) -> ExerciseCatalog:
+    """Regenera o arquivo: exemplos em destaque preservados + exercícios gerados"""
+    featured = []
+    if os.path.exists(path):
+        with open(path, encoding="utf-8") as f:
+            featured = [exercise for exercise in json.load(f)["exercises"] if exercise.get("featured")]
+
+    exercises = [with_solution(exercise) for exercise in featured + generate_exercises(seed)]
+    catalog = ExerciseCatalog(exercises)
+    problems = catalog.verify()
+    if problems:
+        raise ValueError("Catálogo inconsistente:\n" + "\n".join(problems))
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"version": 1, "exercises": exercises}, f, ensure_ascii=False, indent=1)
+    return catalog
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Catálogo de exercícios M/M/1")
+    parser.add_argument("--build", action="store_true", help="regenera o arquivo do catálogo")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    catalog = build_catalog(seed=args.seed) if args.build else load_catalog()
+    problems = catalog.verify()
+    print(f"📚 {len(catalog)} exercícios, {len(catalog.by_params)} pares (λ, μ), "
+          f"{len(catalog.by_keyword)} palavras-chave, {len(catalog.featured)} em destaque")
+    print("✅ Soluções verificadas" if not problems else "❌ " + "\n".join(problems))
+
+
+if __name__ == "__main__":
+    main()
@@ -5,26 +5,115 @@ VERSÃO UNIVERSAL: IA resolve QUALQUER problema de M/M/1
 """
 
 import os
+import json
+import time
+import hashlib
 from typing import Dict, List, Optional
 from groq import Groq
 from dotenv import load_dotenv
 
+from utils import tracing
+from utils import prompts
+from utils.model_router import ModelRouter, RouteDecision
+from utils.semantic_cache import SemanticCache, SEMANTIC_CACHE_ENABLED
+
 # Carrega variáveis de ambiente
 load_dotenv()
 
+# Explicações dos exemplos fixos ficam em disco: a mesma pergunta não volta ao modelo
+EXAMPLE_CACHE_DIR = os.getenv(
+    "EXAMPLE_CACHE_DIR",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), ".cache", "examples")
+)
+
 
 class GroqClient:
     """Cliente para interação com Groq API usando Llama 3.1 8B Instant"""
 
     def __init__(self):
-        self.api_key = os.getenv("GROQ_API_KEY")
+        # GROQ_BASE_URL aponta para outro endpoint compatível; GROQ_MOCK=1 usa o servidor local
+        # (python -m utils.mock_groq_server), que dispensa a chave
+        self.base_url = os.getenv("GROQ_BASE_URL") or None
+        self.use_mock = os.getenv("GROQ_MOCK", "").lower() in ("1", "true", "yes")
+        if self.use_mock and not self.base_url:
+            self.base_url = f"http://127.0.0.1:{os.getenv('GROQ_MOCK_PORT', '8787')}"
+
+        self.api_key = os.getenv("GROQ_API_KEY") or ("mock" if self.use_mock else None)
         if not self.api_key:
             raise ValueError("GROQ_API_KEY não encontrada no arquivo .env")
 
-        self.client = Groq(api_key=self.api_key)
-        self.model = os.getenv("GROQ_MODEL", "llama-3.1-8b-instant")
+        self.client = Groq(api_key=self.api_key, base_url=self.base_url)
         self.temperature = float(os.getenv("GROQ_TEMPERATURE", "0.1"))
         self.max_tokens = int(os.getenv("GROQ_MAX_TOKENS", "2000"))
+        # Modelo, temperatura e max_tokens por rota (modelo rápido para formatar, maior para interpretar);
+        # GROQ_MODEL (ou GROQ_FAST_MODEL) e GROQ_SMART_MODEL do .env são lidos aqui, depois do load_dotenv
+        self.router = ModelRouter.from_env(self.temperature, self.max_tokens)
+        self._example_explanations: Dict[str, str] = {}
+        # Paráfrases da mesma pergunta (mesmos λ/μ, números e métricas) reaproveitam a resposta
+        self.semantic_cache = SemanticCache() if SEMANTIC_CACHE_ENABLED else None
+
+    def _complete(self, route: str, messages: List[Dict[str, str]]) -> str:
+        """
+        Chamada ao modelo escolhido pelo roteador para a rota; se o modelo principal falhar,
+        tenta uma vez o modelo rápido antes de cair na resposta de fallback do método
+        """
+        decision = self.router.select(route)
+        try:
+            return self._stream_completion(decision, decision.model, messages)
+        except Exception as e:
+            if decision.fallback_model is None:
+                raise
+            tracing.get_logger("groq").warning("Modelo %s falhou na rota %s (%s); usando %s",
+                                               decision.model, route, e, decision.fallback_model)
+            tracing.count("llm_route_fallback_total", route=route, reason="error")
+            return self._stream_completion(decision, decision.fallback_model, messages)
+
+    def _stream_completion(self, decision: RouteDecision, model: str, messages: List[Dict[str, str]]) -> str:
+        """
+        Chamada em streaming, medindo o tempo até o primeiro token, os tokens, a latência e o custo
+        """
+        route = decision.route
+        with tracing.span("groq.chat", route=route, model=model, max_tokens=decision.max_tokens,
+                          degraded=decision.degraded) as attrs:
+            start = time.perf_counter()
+            try:
+                stream = self.client.chat.completions.create(
+                    model=model,
+                    messages=messages,
+                    temperature=decision.temperature,
+                    max_tokens=decision.max_tokens,
+                    stream=True
+                )
+
+                parts = []
+                usage = None
+                for chunk in stream:
+                    if chunk.choices and chunk.choices[0].delta.content:
+                        if not parts:
+                            attrs["ttft_ms"] = round((time.perf_counter() - start) * 1000, 1)
+                            tracing.observe("llm_ttft_seconds", attrs["ttft_ms"] / 1000, route=route)
+                        parts.append(chunk.choices[0].delta.content)
+
+                    # A Groq envia o uso no último chunk (x_groq.usage); outros endpoints em chunk.usage
+                    x_groq = getattr(chunk, "x_groq", None)
+                    usage = getattr(x_groq, "usage", None) or getattr(chunk, "usage", None) or usage
+            except Exception:
+                self.router.record(decision, model, time.perf_counter() - start, error=True)
+                raise
+
+            prompt_tokens = completion_tokens = None
+            if usage is not None:
+                prompt_tokens, completion_tokens = usage.prompt_tokens, usage.completion_tokens
+                attrs["prompt_tokens"] = prompt_tokens
+                attrs["completion_tokens"] = completion_tokens
+                tracing.count("llm_tokens_total", prompt_tokens, route=route, kind="prompt")
+                tracing.count("llm_tokens_total", completion_tokens, route=route, kind="completion")
+
+            cost = self.router.record(decision, model, time.perf_counter() - start, prompt_tokens, completion_tokens)
+            if cost is not None:
+                attrs["cost_usd"] = round(cost, 8)
+
+            return "".join(parts)
 
     def enhance_calculation_explanation(self, calculation_result: Dict, user_question: str) -> str:
         """
@@ -32,98 +121,99 @@ class GroqClient:
         """
         try:
             # Prepara o contexto para o modelo matemático
-            system_prompt = """IMPORTANTE: RESPONDA SEMPRE EM PORTUGUÊS BRASILEIRO!
-
-Você é o Bosquinho, um assistente especializado em Teoria das Filas M/M/1.
-Você deve explicar cálculos matemáticos de forma clara e didática, sempre mostrando:
-1. O contexto do problema
-2. As fórmulas utilizadas
-3. A substituição dos valores
-4. O resultado final
-5. A interpretação prática do resultado
-
-Use emojis e formatação markdown para tornar a explicação mais amigável.
-LEMBRE-SE: SEMPRE EM PORTUGUÊS BRASILEIRO!"""
-
-            user_prompt = f"""
-            Pergunta do usuário: {user_question}
-
-            Resultado do cálculo: {calculation_result}
-
-            Por favor, explique este resultado de forma didática e completa, incluindo:
-            - O que significa o resultado
-            - Como foi calculado
-            - Qual a interpretação prática
-            - Se o sistema é estável ou não (quando aplicável)
-            """
-
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": user_prompt}
-                ],
-                temperature=self.temperature,
-                max_tokens=self.max_tokens
-            )
-
-            return response.choices[0].message.content
+            system_prompt = prompts.system_prompt("explain_calculation")
+
+            user_prompt = f"""Pergunta do usuário: {user_question}
+
+Resultado do cálculo: {calculation_result}"""
+
+            messages = [
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": user_prompt}
+            ]
+
+            return self._complete("explain_calculation", messages)
 
         except Exception as e:
             return self._generate_fallback_response(calculation_result)
 
+    def _example_cache_path(self, example_type: str, results: Dict) -> str:
+        """Arquivo da explicação: muda com o modelo, o prompt, os parâmetros de geração ou os resultados"""
+        decision = self.router.plan("example")
+        payload = json.dumps({
+            "example": example_type,
+            "results": results,
+            "model": decision.model,
+            "temperature": decision.temperature,
+            "max_tokens": decision.max_tokens,
+            "system_prompt": prompts.system_prompt("example")
+        }, sort_keys=True, default=str)
+        digest = hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+        return os.path.join(EXAMPLE_CACHE_DIR, f"{example_type}-{digest}.md")
+
+    def _load_example_explanation(self, cache_path: str) -> Optional[str]:
+        """Explicação memorizada (memória do processo, depois disco)"""
+        explanation = self._example_explanations.get(cache_path)
+        if explanation is None and os.path.exists(cache_path):
+            try:
+                with open(cache_path, encoding="utf-8") as f:
+                    explanation = self._example_explanations[cache_path] = f.read()
+            except OSError:
+                return None
+        return explanation
+
+    def _store_example_explanation(self, cache_path: str, explanation: str):
+        """Grava a explicação de forma atômica (sessões concorrentes não leem arquivo pela metade)"""
+        self._example_explanations[cache_path] = explanation
+        try:
+            os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+            temp_path = f"{cache_path}.{os.getpid()}.tmp"
+            with open(temp_path, "w", encoding="utf-8") as f:
+                f.write(explanation)
+            os.replace(temp_path, cache_path)
+        except OSError as e:
+            tracing.get_logger("groq").warning("Explicação do exemplo não gravada em disco: %s", e)
+
+    @staticmethod
+    def _example_context(example_type: str) -> str:
+        """Enunciado do exemplo a partir do catálogo"""
+        from utils.exercise_catalog import get_catalog
+
+        try:
+            example = get_catalog().get(example_type)
+        except KeyError:
+            return f"Exemplo {example_type} com os seguintes resultados:"
+        return f"Exemplo: {example['title']}\n{example['statement']}"
+
     def solve_example_with_explanation(self, example_type: str, results: Dict) -> str:
         """
         Usa Llama 3.1 8B para explicar exemplos completos
+        Os exemplos são fixos: a explicação é gerada uma vez e memorizada em disco
         """
+        cache_path = self._example_cache_path(example_type, results)
+        cached = self._load_example_explanation(cache_path)
+        tracing.count("example_cache_total", result="hit" if cached is not None else "miss")
+        if cached is not None:
+            return cached
+
         try:
-            system_prompt = """IMPORTANTE: RESPONDA SEMPRE EM PORTUGUÊS BRASILEIRO!
-
-Você é o Bosquinho, especialista em Teoria das Filas M/M/1.
-Explique exemplos práticos de forma didática, mostrando cada passo do cálculo
-e a interpretação real do resultado.
-LEMBRE-SE: SEMPRE EM PORTUGUÊS BRASILEIRO!"""
-
-            if example_type == "airport_1":
-                context = """
-                EXEMPLO DO AEROPORTO 1:
-                - Cenário: Aeroporto com pista única para pouso
-                - Taxa de chegada: λ = 1/3 aviões por minuto (1 avião a cada 3 minutos)
-                - Taxa de atendimento: μ = 1 avião por minuto
-                """
-            elif example_type == "airport_2":
-                context = """
-                EXEMPLO DO AEROPORTO 2:
-                - Cenário: Aeroporto com pista de alta capacidade
-                - Taxa de chegada: λ = 1 avião por minuto
-                - Taxa de atendimento: μ = 3 aviões por minuto
-                """
-            else:
-                context = f"Exemplo {example_type} com os seguintes resultados:"
-
-            user_prompt = f"""
-            {context}
-
-            Resultados calculados: {results}
-
-            Por favor, explique este exemplo completo de forma didática, incluindo:
-            1. Descrição do cenário real
-            2. Cada métrica calculada com sua fórmula
-            3. Interpretação prática de cada resultado
-            4. Conclusões sobre o desempenho do sistema
-            """
-
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": user_prompt}
-                ],
-                temperature=self.temperature,
-                max_tokens=self.max_tokens
-            )
-
-            return response.choices[0].message.content
+            system_prompt = prompts.system_prompt("example")
+
+            context = self._example_context(example_type)
+
+            user_prompt = f"""{context.strip()}
+
+Resultados calculados: {results}"""
+
+            messages = [
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": user_prompt}
+            ]
+
+            explanation = self._complete("example", messages)
+            if explanation:
+                self._store_example_explanation(cache_path, explanation)
+            return explanation
 
         except Exception as e:
             return self._generate_fallback_example_response(example_type, results)
@@ -134,53 +224,20 @@ LEMBRE-SE: SEMPRE EM PORTUGUÊS BRASILEIRO!"""
         Específico para problemas completos como o do aeroporto
         """
         try:
-            system_prompt = """IMPORTANTE: RESPONDA SEMPRE EM PORTUGUÊS BRASILEIRO!
-
-Você é o Bosquinho, um assistente especializado em Teoria das Filas M/M/1.
-
-TAREFA ESPECÍFICA:
-- Você recebeu um problema completo com TODOS os cálculos já realizados
-- Precisa explicar a solução de forma didática e completa
-- Foque na interpretação prática dos resultados
-- Explique cada métrica de forma clara
-- Relacione com o contexto real do problema (aeroporto, aviões, etc.)
+            system_prompt = prompts.system_prompt("problem_with_context")
 
-ESTRUTURA DA RESPOSTA:
-1. 🎯 Resumo do problema
-2. 📊 Parâmetros identificados
-3. 🔢 Resultados principais
-4. 💡 Interpretação prática
-5. ✅ Respostas específicas às perguntas
-
-LEMBRE-SE: SEMPRE EM PORTUGUÊS BRASILEIRO!"""
-
-            user_prompt = f"""
-PROBLEMA APRESENTADO PELO USUÁRIO:
+            user_prompt = f"""Problema do usuário:
 {user_question}
 
-CONTEXTO COMPLETO COM CÁLCULOS REALIZADOS:
-{context}
-
-Por favor, explique este problema de forma didática e completa, respondendo especificamente às perguntas do usuário. Use os resultados calculados para dar respostas precisas e educativas.
-
-IMPORTANTE:
-- Explique a diferença entre "aviões no sistema" (L) vs "aviões aguardando na fila" (Lq)
-- Mostre as fórmulas quando relevante
-- Interpretar os resultados no contexto prático
-- Responda especificamente às letras a), b), c) se houver
-"""
+Cálculos realizados:
+{context.strip()}"""
 
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": user_prompt}
-                ],
-                temperature=self.temperature,
-                max_tokens=self.max_tokens
-            )
+            messages = [
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": user_prompt}
+            ]
 
-            return response.choices[0].message.content
+            return self._complete("problem_with_context", messages)
 
         except Exception as e:
             # Fallback específico para problemas com contexto
@@ -202,50 +259,20 @@ Você pode tentar novamente ou reformular sua pergunta!"""
         IA explica problema quando já temos cálculos realizados
         """
         try:
-            system_prompt = """IMPORTANTE: RESPONDA SEMPRE EM PORTUGUÊS BRASILEIRO!
+            system_prompt = prompts.system_prompt("calculate_and_explain")
 
-Você é o Bosquinho, especialista em Teoria das Filas M/M/1.
-
-TAREFA: Você recebeu uma pergunta do usuário e já foram feitos os cálculos principais.
-Sua missão é:
-1. Interpretar o problema apresentado pelo usuário
-2. Explicar os resultados calculados de forma didática
-3. Responder especificamente às perguntas feitas
-4. Mostrar as fórmulas relevantes
-5. Dar interpretação prática dos resultados
-
-ESTRUTURA IDEAL:
-🎯 Resumo do problema
-📊 Parâmetros identificados
-🔢 Cálculos e resultados
-💡 Interpretação prática
-✅ Respostas específicas
-
-Use emojis, seja didático e sempre em PORTUGUÊS BRASILEIRO!"""
-
-            user_prompt = f"""
-PERGUNTA DO USUÁRIO:
+            user_prompt = f"""Pergunta do usuário:
 {user_question}
 
-CÁLCULOS JÁ REALIZADOS:
-{context}
+Cálculos realizados:
+{context.strip()}"""
 
-Por favor, analise o problema do usuário e explique de forma completa e didática, usando os cálculos já realizados. Responda especificamente ao que foi perguntado, seja sobre número médio de clientes, tempos, probabilidades, etc.
+            messages = [
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": user_prompt}
+            ]
 
-IMPORTANTE: Relacione os resultados com o contexto real do problema (aeroporto, banco, empresa, etc.) se aplicável.
-"""
-
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": user_prompt}
-                ],
-                temperature=self.temperature,
-                max_tokens=self.max_tokens
-            )
-
-            return response.choices[0].message.content
+            return self._complete("calculate_and_explain", messages)
 
         except Exception as e:
             return f"""🌳 **Bosquinho aqui!**
@@ -260,44 +287,15 @@ Tive um problema técnico, mas calculei os resultados:
         """
         IA resolve QUALQUER problema de M/M/1 do zero - MÉTODO PRINCIPAL
         """
+        if self.semantic_cache is not None:
+            cached = self.semantic_cache.lookup(user_question, context.get("lambda"), context.get("mu"))
+            tracing.count("semantic_cache_total", result="hit" if cached else "miss")
+            if cached:
+                tracing.get_logger("groq").debug("♻️ Resposta reaproveitada (similaridade %.2f)", cached[1])
+                return cached[0]
+
         try:
-            system_prompt = """IMPORTANTE: RESPONDA SEMPRE EM PORTUGUÊS BRASILEIRO!
-
-Você é o Bosquinho, um assistente especializado em Teoria das Filas M/M/1.
-
-CAPACIDADES:
-- Interpretar QUALQUER problema de teoria das filas M/M/1
-- Identificar parâmetros λ (taxa de chegada) e μ (taxa de atendimento) no texto
-- Calcular todas as métricas: ρ, L, Lq, W, Wq, P0, Pn, P(N>k)
-- Explicar resultados de forma prática e didática
-- Resolver problemas completos com múltiplas perguntas
-
-FÓRMULAS M/M/1:
-- ρ = λ/μ (utilização do sistema)
-- L = ρ/(1-ρ) = λ/(μ-λ) (número médio no sistema)
-- Lq = ρ²/(1-ρ) = λ²/[μ(μ-λ)] (número médio na fila)
-- W = 1/(μ-λ) (tempo médio no sistema)
-- Wq = ρ/(μ-λ) = λ/[μ(μ-λ)] (tempo médio na fila)
-- P0 = 1-ρ (probabilidade sistema vazio)
-- Pn = (1-ρ)ρⁿ (probabilidade de n clientes)
-- P(N>k) = ρᵏ⁺¹ (probabilidade de mais de k clientes)
-
-PROCESSO:
-1. Leia e compreenda o problema
-2. Identifique λ e μ (taxas, intervalos, frequências)
-3. Calcule as métricas necessárias
-4. Responda às perguntas específicas
-5. Dê interpretação prática
-
-TIPOS DE PROBLEMAS:
-- Aeroportos (aviões, pistas)
-- Bancos (clientes, caixas)
-- Empresas (pedidos, atendimento)
-- Restaurantes (clientes, garçons)
-- Sistemas de TI (requisições, servidores)
-- Qualquer fila de espera!
-
-SEMPRE em PORTUGUÊS BRASILEIRO! Seja didático, use emojis e explique o contexto real."""
+            system_prompt = prompts.system_prompt("ai_solve")
 
             # Prepara informações do contexto
             context_info = ""
@@ -309,36 +307,24 @@ SEMPRE em PORTUGUÊS BRASILEIRO! Seja didático, use emojis e explique o context
                 context_info += f"- Números encontrados no texto: {context['numbers_found']}\n"
             if context.get("is_complete_problem"):
                 context_info += "- Detectado como problema completo\n"
+            if context.get("ocr_confidence"):
+                context_info += f"- {context['ocr_confidence'].strip()}\n"
 
-            user_prompt = f"""
-PROBLEMA A RESOLVER:
+            user_prompt = f"""Problema:
 {user_question}
 
-INFORMAÇÕES COLETADAS:
-{context_info if context_info else "Nenhuma informação específica coletada - analise o texto completo."}
-
-INSTRUÇÕES:
-1. Analise cuidadosamente o problema apresentado
-2. Identifique os parâmetros λ e μ (mesmo que implícitos)
-3. Calcule as métricas necessárias usando as fórmulas M/M/1
-4. Responda especificamente às perguntas feitas
-5. Explique de forma didática e prática
-
-IMPORTANTE: Se o problema mencionar tempos (ex: "a cada 3 minutos"), converta para taxas (ex: λ = 1/3 por minuto). Se mencionar capacidades (ex: "pode atender 5 por hora"), isso é μ.
-
-Resolva o problema completamente!"""
+Informações coletadas localmente:
+{context_info or "nenhuma - analise o texto completo"}"""
 
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": user_prompt}
-                ],
-                temperature=self.temperature + 0.1,  # Pouco mais criativo para resolução
-                max_tokens=self.max_tokens + 500      # Mais tokens para problemas complexos
-            )
+            messages = [
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": user_prompt}
+            ]
 
-            return response.choices[0].message.content
+            response = self._complete("ai_solve", messages)
+            if response and self.semantic_cache is not None:
+                self.semantic_cache.add(user_question, context.get("lambda"), context.get("mu"), response)
+            return response
 
         except Exception as e:
             return f"""🌳 **Bosquinho aqui!**
@@ -357,48 +343,14 @@ Tive um problema técnico ao resolver o problema: {str(e)}
         Usa Llama 3.1 8B para responder QUALQUER pergunta de forma inteligente
         """
         try:
-            system_prompt = """IMPORTANTE: RESPONDA SEMPRE EM PORTUGUÊS BRASILEIRO!
-
-Você é o Bosquinho, um assistente especializado em Teoria das Filas M/M/1.
-
-REGRAS OBRIGATÓRIAS:
-1. SEMPRE responda em português brasileiro
-2. Se for SAUDAÇÃO (olá, oi, bom dia), seja caloroso e se apresente
-3. Se for pergunta sobre M/M/1, explique didaticamente com exemplos
-4. Se mencionarem "exemplo do aeroporto" SEM parâmetros, explique os exemplos disponíveis
-5. Se pedirem cálculos COM λ e μ, faça os cálculos passo a passo
-6. Se pedirem cálculos SEM λ e μ, peça os parâmetros
-7. Sempre seja educativo, use emojis e explique o contexto prático
-
-LEMBRE-SE: PORTUGUÊS BRASILEIRO SEMPRE!
-
-EXEMPLOS DISPONÍVEIS:
-- Aeroporto 1: λ=1/3, μ=1 (pista única)
-- Aeroporto 2: λ=1, μ=3 (alta capacidade)
-- Banco: λ=2, μ=3 (caixa eletrônico)
-- Drive-thru: λ=1.5, μ=2 (restaurante)
-
-FÓRMULAS M/M/1:
-- ρ = λ/μ (utilização)
-- L = ρ/(1-ρ) (clientes no sistema)
-- Lq = ρ²/(1-ρ) (clientes na fila)
-- W = 1/(μ-λ) (tempo no sistema)
-- Wq = ρ/(μ-λ) (tempo na fila)
-- P0 = 1-ρ (sistema vazio)
-- Pn = (1-ρ)ρⁿ (n clientes)
-- P(N>k) = ρᵏ⁺¹ (mais de k clientes)"""
-
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": user_question}
-                ],
-                temperature=self.temperature + 0.1,  # Ligeiramente mais criativo para ajuda geral
-                max_tokens=self.max_tokens // 2  # Menos tokens para respostas gerais
-            )
-
-            return response.choices[0].message.content
+            system_prompt = prompts.system_prompt("general_help")
+
+            messages = [
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": user_question}
+            ]
+
+            return self._complete("general_help", messages)
 
         except Exception as e:
             return self._generate_fallback_help_response()
@@ -408,30 +360,17 @@ FÓRMULAS M/M/1:
         Usa Llama 3.1 8B para explicar erros de forma didática
         """
         try:
-            system_prompt = """IMPORTANTE: RESPONDA SEMPRE EM PORTUGUÊS BRASILEIRO!
-
-Você é o Bosquinho, especialista em Teoria das Filas M/M/1.
-Explique erros de forma didática e ajude o usuário a corrigir o problema.
-LEMBRE-SE: SEMPRE EM PORTUGUÊS BRASILEIRO!"""
-
-            user_prompt = f"""
-            Pergunta do usuário: {user_question}
-            Erro encontrado: {error_context}
-
-            Por favor, explique o erro de forma didática e sugira como corrigir.
-            """
-
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": user_prompt}
-                ],
-                temperature=self.temperature,
-                max_tokens=self.max_tokens // 2
-            )
-
-            return response.choices[0].message.content
+            system_prompt = prompts.system_prompt("error")
+
+            user_prompt = f"""Pergunta do usuário: {user_question}
+Erro encontrado: {error_context}"""
+
+            messages = [
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": user_prompt}
+            ]
+
+            return self._complete("error", messages)
 
         except Exception as e:
             return f"❌ **Erro:** {error_context}\n\n💡 **Dica:** Certifique-se de fornecer os valores corretos de λ e μ."
@@ -0,0 +1,104 @@
+"""
+Armazenamento compacto das imagens enviadas ao chat
+
+A mensagem guarda só uma miniatura JPEG e o hash do conteúdo; a imagem original vai
+para o disco (IMAGE_STORE_DIR), endereçada pelo hash, e é lida sob demanda com um
+cache pequeno em memória. Assim a sessão não cresce a cada foto enviada e o chat
+desenha miniaturas em vez das fotos originais a cada reexecução.
+"""
+
+import io
+import os
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+from PIL import Image, ImageOps
+
+IMAGE_STORE_DIR = os.getenv(
+    "IMAGE_STORE_DIR",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), ".cache", "images")
+)
+# Maior lado da miniatura (px) e qualidade do JPEG
+THUMBNAIL_MAX_SIDE = int(os.getenv("THUMBNAIL_MAX_SIDE", "480"))
+THUMBNAIL_QUALITY = int(os.getenv("THUMBNAIL_QUALITY", "70"))
+# Imagens originais mantidas em memória (as mais recentes)
+IMAGE_CACHE_ITEMS = int(os.getenv("IMAGE_CACHE_ITEMS", "8"))
+
+_cache: "OrderedDict[str, bytes]" = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+def content_hash(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def _path(image_hash: str, suffix: str = "") -> str:
+    return os.path.join(IMAGE_STORE_DIR, image_hash[:2], f"{image_hash}{suffix}")
+
+
+def _write_atomic(path: str, data: bytes):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    temp_path = f"{path}.{os.getpid()}.tmp"
+    with open(temp_path, "wb") as f:
+        f.write(data)
+    os.replace(temp_path, path)
+
+
+def make_thumbnail(image: Image.Image) -> bytes:
+    """Miniatura JPEG, já na orientação da foto (EXIF)"""
+    thumbnail = ImageOps.exif_transpose(image).convert("RGB")
+    thumbnail.thumbnail((THUMBNAIL_MAX_SIDE, THUMBNAIL_MAX_SIDE))
+    output = io.BytesIO()
+    thumbnail.save(output, format="JPEG", quality=THUMBNAIL_QUALITY, optimize=True)
+    return output.getvalue()
+
+
+def store_image(data: bytes, image: Optional[Image.Image] = None) -> Dict[str, Any]:
+    """
+    Grava a imagem original no disco (uma vez por conteúdo) e devolve
+    {"image_hash", "image_thumbnail"} para a mensagem do chat
+    """
+    image_hash = content_hash(data)
+    if not os.path.exists(_path(image_hash)):
+        _write_atomic(_path(image_hash), data)
+
+    thumbnail_path = _path(image_hash, ".thumb.jpg")
+    if os.path.exists(thumbnail_path):
+        with open(thumbnail_path, "rb") as f:
+            thumbnail = f.read()
+    else:
+        thumbnail = make_thumbnail(image if image is not None else Image.open(io.BytesIO(data)))
+        _write_atomic(thumbnail_path, thumbnail)
+
+    return {"image_hash": image_hash, "image_thumbnail": thumbnail}
+
+
+def load_thumbnail(image_hash: str) -> Optional[bytes]:
+    """Miniatura gravada no disco (mensagens recarregadas do histórico só têm o hash)"""
+    try:
+        with open(_path(image_hash, ".thumb.jpg"), "rb") as f:
+            return f.read()
+    except OSError:
+        return None
+
+
+def load_image(image_hash: str) -> Optional[bytes]:
+    """Bytes da imagem original, com cache LRU de IMAGE_CACHE_ITEMS imagens"""
+    with _cache_lock:
+        if image_hash in _cache:
+            _cache.move_to_end(image_hash)
+            return _cache[image_hash]
+
+    try:
+        with open(_path(image_hash), "rb") as f:
+            data = f.read()
+    except OSError:
+        return None
+
+    with _cache_lock:
+        _cache[image_hash] = data
+        while len(_cache) > IMAGE_CACHE_ITEMS:
+            _cache.popitem(last=False)
+    return data
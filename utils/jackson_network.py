@@ -0,0 +1,159 @@
+"""
+Redes de Jackson abertas: filas em sequência (triagem → atendimento → caixa) ou com retorno
+
+Cada nó é uma fila M/M/c com taxa μ por servidor. Clientes chegam de fora em cada nó
+(taxas γ) e, ao sair do nó i, vão para o nó j com probabilidade P[i, j] ou deixam a rede
+com 1 - Σ_j P[i, j]. As taxas efetivas vêm das equações de tráfego
+
+    λ = γ + Pᵀ λ   ⇔   (I - Pᵀ) λ = γ
+
+e, pelo teorema de Jackson, cada nó se comporta como uma M/M/c isolada com chegada λ_i:
+as métricas por nó reaproveitam as fórmulas vetorizadas da varredura (utils/sweep). De
+ponta a ponta, L = Σ L_i e W = L / Σ γ (Little).
+
+Vários vetores γ são resolvidos de uma vez (uma fatoração para todos); redes grandes ou
+com matriz esparsa (scipy.sparse) usam fatoração LU esparsa.
+"""
+
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from utils.sweep import compute_metrics, METRIC_COLUMNS
+
+# A partir deste número de nós, (I - Pᵀ) é fatorada como matriz esparsa
+JACKSON_SPARSE_NODES = 200
+
+
+class JacksonNetwork:
+    """Rede de Jackson aberta com roteamento fixo e μ (e c) por nó"""
+
+    def __init__(self, routing, mu: Sequence[float], servers: Optional[Sequence[int]] = None,
+                 names: Optional[List[str]] = None):
+        self.mu = np.asarray(mu, dtype=float)
+        nodes = self.mu.shape[0]
+        self.servers = np.ones(nodes) if servers is None else np.asarray(servers, dtype=float)
+        self.names = names or [f"nó {i + 1}" for i in range(nodes)]
+        self.sparse = hasattr(routing, "tocsc") or nodes >= JACKSON_SPARSE_NODES
+
+        if self.sparse:
+            try:
+                import scipy.sparse as sp
+                from scipy.sparse.linalg import splu
+            except ImportError:
+                self.sparse = False
+
+        if self.sparse:
+            routing = sp.csr_matrix(routing, dtype=float)
+            row_sums = np.asarray(routing.sum(axis=1)).ravel()
+            negative = routing.nnz and routing.data.min() < 0
+        else:
+            routing = np.asarray(routing.toarray() if hasattr(routing, "toarray") else routing, dtype=float)
+            row_sums = routing.sum(axis=1)
+            negative = (routing < 0).any()
+
+        if routing.shape != (nodes, nodes):
+            raise ValueError(f"A matriz de roteamento deve ser {nodes}x{nodes} (um μ por nó)")
+        if negative or (row_sums > 1 + 1e-12).any():
+            raise ValueError("Probabilidades de roteamento devem ser ≥ 0 e cada linha deve somar no máximo 1")
+        if len(self.names) != nodes or self.servers.shape != (nodes,):
+            raise ValueError("names e servers precisam de um valor por nó")
+
+        self.routing = routing
+        self.exit_probability = 1 - row_sums
+
+        # (I - Pᵀ) é fatorada uma vez; singular = há nós de onde o cliente nunca sai da rede
+        try:
+            if self.sparse:
+                self._lu = splu((sp.identity(nodes, format="csc") - routing.T.tocsc()).tocsc())
+            else:
+                self._system = np.eye(nodes) - routing.T
+                if np.linalg.matrix_rank(self._system) < nodes:
+                    raise np.linalg.LinAlgError
+        except (RuntimeError, np.linalg.LinAlgError):
+            raise ValueError("A rede não é aberta: há nós de onde os clientes nunca saem (I - Pᵀ singular)")
+
+    @property
+    def nodes(self) -> int:
+        return self.mu.shape[0]
+
+    def traffic(self, external_arrivals) -> np.ndarray:
+        """Taxas efetivas λ por nó; aceita γ com forma (nós,) ou (cenários, nós)"""
+        gamma = np.asarray(external_arrivals, dtype=float)
+        single = gamma.ndim == 1
+        gamma = np.atleast_2d(gamma)
+        if gamma.shape[1] != self.nodes:
+            raise ValueError(f"Cada vetor de chegadas externas precisa de {self.nodes} valores")
+        if (gamma < 0).any():
+            raise ValueError("Taxas de chegada externas (γ) devem ser não-negativas")
+
+        # Todos os cenários como colunas do lado direito de uma única resolução
+        if self.sparse:
+            rates = self._lu.solve(np.ascontiguousarray(gamma.T)).T
+        else:
+            rates = np.linalg.solve(self._system, gamma.T).T
+        rates = np.maximum(rates, 0.0)  # Ruído numérico em nós sem tráfego
+        return rates[0] if single else rates
+
+    def solve(self, external_arrivals) -> Dict[str, Any]:
+        """
+        Métricas por nó e de ponta a ponta
+        Com γ de forma (nós,) os valores por nó têm forma (nós,) e os totais são escalares;
+        com (cenários, nós), cada linha é um cenário. error traz "" ou o motivo (nó instável)
+        """
+        gamma = np.asarray(external_arrivals, dtype=float)
+        single = gamma.ndim == 1
+        gamma = np.atleast_2d(gamma)
+        rates = np.atleast_2d(self.traffic(gamma))
+        scenarios = rates.shape[0]
+
+        metrics = compute_metrics(rates.ravel(), np.tile(self.mu, scenarios), c=np.tile(self.servers, scenarios))
+        node_errors = metrics["error"].reshape(scenarios, self.nodes)
+        nodes = {name: metrics[name].reshape(scenarios, self.nodes) for name in METRIC_COLUMNS}
+
+        error = np.full(scenarios, "", dtype=object)
+        for scenario, row in enumerate(node_errors):
+            failing = [f"{self.names[i]}: {message}" for i, message in enumerate(row) if message]
+            if failing:
+                error[scenario] = "; ".join(failing)
+
+        throughput = gamma.sum(axis=1)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            total_L = nodes["L"].sum(axis=1)
+            total_Lq = nodes["Lq"].sum(axis=1)
+            result = {
+                "lambda": rates,
+                "nodes": nodes,
+                "visits": rates / throughput[:, None],  # Visitas médias a cada nó por cliente
+                "throughput": throughput,
+                "L": total_L,
+                "Lq": total_Lq,
+                "W": total_L / throughput,
+                "Wq": total_Lq / throughput,
+                "error": error
+            }
+
+        if single:
+            result = {
+                key: ({name: values[0] for name, values in value.items()} if key == "nodes" else value[0])
+                for key, value in result.items()
+            }
+        return result
+
+    def summary(self, external_arrivals: Sequence[float]) -> str:
+        """Tabela markdown de um cenário, no formato das respostas do chat"""
+        result = self.solve(np.asarray(external_arrivals, dtype=float))
+        lines = [
+            "| Nó | λ efetiva | ρ | L | W |",
+            "|---|---|---|---|---|"
+        ]
+        nodes = result["nodes"]
+        for i, name in enumerate(self.names):
+            lines.append(f"| {name} | {result['lambda'][i]:.4g} | {nodes['rho'][i]:.4g} | "
+                         f"{nodes['L'][i]:.4g} | {nodes['W'][i]:.4g} |")
+        if result["error"]:
+            lines.append(f"\n⚠️ {result['error']}")
+        else:
+            lines.append(f"\n**Rede inteira:** L = {result['L']:.4g} clientes, W = {result['W']:.4g} "
+                         f"por cliente (vazão {result['throughput']:.4g})")
+        return "\n".join(lines)
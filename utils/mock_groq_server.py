@@ -0,0 +1,327 @@
+#!/usr/bin/env python3
+"""
+Servidor local compatível com a API do Groq (formato OpenAI) para testes offline
+
+Simula latência, taxa de geração de tokens, streaming (SSE) e erros 429,
+respondendo com textos fixos ou templates. Permite medir vazão e latência
+do agente sem rede e sem GROQ_API_KEY.
+
+Uso:
+    python -m utils.mock_groq_server --port 8787 --latency-dist lognormal --latency-ms 400
+    GROQ_MOCK=1 streamlit run Chatbot.py
+"""
+
+import re
+import json
+import time
+import uuid
+import random
+import argparse
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional
+
+
+DEFAULT_PORT = 8787
+
+# Resposta padrão: usa os parâmetros encontrados no prompt quando existem
+DEFAULT_TEMPLATE = """🌳 **Bosquinho aqui!** (resposta simulada pelo servidor local)
+
+🎯 **Resumo do problema**
+{question_summary}
+
+📊 **Parâmetros identificados**
+- λ (taxa de chegada) = {lambda}
+- μ (taxa de atendimento) = {mu}
+
+🔢 **Resultados**
+- ρ = {rho}
+- L = {L}
+- Lq = {Lq}
+- W = {W}
+- Wq = {Wq}
+
+💡 **Interpretação prática:** o sistema está {status}."""
+
+# λ e μ no formato usado pelos prompts do GroqClient ("λ (taxa de chegada) = 2", "λ=2", "Lambda (λ) identificado: 2")
+LAMBDA_PATTERN = re.compile(r'(?:λ|lambda)[^=:\d\n]{0,40}[=:]\s*(\d+(?:\.\d+)?)', re.IGNORECASE)
+MU_PATTERN = re.compile(r'(?:μ|\bmu\b)[^=:\d\n]{0,40}[=:]\s*(\d+(?:\.\d+)?)', re.IGNORECASE)
+
+TOKEN_PATTERN = re.compile(r'\S+\s*|\s+')
+
+
+class MockGroqConfig:
+    """Parâmetros de simulação do servidor"""
+
+    def __init__(self, latency_dist: str = "fixed", latency_ms: float = 300.0, latency_sigma: float = 0.5,
+                 tokens_per_second: float = 750.0, rate_limit_prob: float = 0.0, retry_after: float = 1.0,
+                 answers: Optional[List[Dict[str, str]]] = None, seed: Optional[int] = None):
+        self.latency_dist = latency_dist
+        self.latency_ms = latency_ms
+        self.latency_sigma = latency_sigma
+        self.tokens_per_second = tokens_per_second
+        self.rate_limit_prob = rate_limit_prob
+        self.retry_after = retry_after
+        self.answers = [
+            {"pattern": re.compile(answer.get("match", ".*"), re.IGNORECASE | re.DOTALL), "answer": answer["answer"]}
+            for answer in (answers or [])
+        ]
+        self.random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def sample_latency(self) -> float:
+        """Sorteia o tempo até o primeiro token (segundos) conforme a distribuição escolhida"""
+        mean = self.latency_ms / 1000
+        with self._lock:
+            if self.latency_dist == "uniform":
+                return self.random.uniform(mean * (1 - self.latency_sigma), mean * (1 + self.latency_sigma))
+            if self.latency_dist == "exponential":
+                return self.random.expovariate(1 / mean) if mean > 0 else 0.0
+            if self.latency_dist == "lognormal":
+                # Mediana = latency_ms, cauda controlada por sigma
+                return self.random.lognormvariate(0, self.latency_sigma) * mean
+            return mean
+
+    def should_rate_limit(self) -> bool:
+        with self._lock:
+            return self.random.random() < self.rate_limit_prob
+
+
+def estimate_tokens(text: str) -> int:
+    """Estimativa simples de tokens (~4 caracteres por token)"""
+    return max(1, len(text) // 4)
+
+
+def _format_metric(value: Optional[float]) -> str:
+    return f"{value:.4f}" if value is not None else "não calculado"
+
+
+def render_answer(config: MockGroqConfig, messages: List[Dict[str, Any]], model: str) -> str:
+    """Escolhe a resposta fixa/template que casa com o prompt e preenche os campos"""
+    prompt = "\n".join(str(message.get("content", "")) for message in messages)
+    question = str(messages[-1].get("content", "")) if messages else ""
+
+    lambda_match = LAMBDA_PATTERN.search(prompt)
+    mu_match = MU_PATTERN.search(prompt)
+    lambda_rate = float(lambda_match.group(1)) if lambda_match else None
+    mu_rate = float(mu_match.group(1)) if mu_match else None
+
+    fields: Dict[str, Any] = {
+        "model": model,
+        "question": question,
+        "question_summary": " ".join(question.split())[:200],
+        "lambda": lambda_rate if lambda_rate is not None else "não identificado",
+        "mu": mu_rate if mu_rate is not None else "não identificado",
+        "status": "sem parâmetros suficientes para avaliar"
+    }
+
+    metrics = {"rho": None, "L": None, "Lq": None, "W": None, "Wq": None}
+    if lambda_rate is not None and mu_rate:
+        rho = lambda_rate / mu_rate
+        metrics["rho"] = rho
+        fields["status"] = "estável (ρ < 1)" if rho < 1 else "instável (ρ ≥ 1)"
+        if rho < 1:
+            metrics.update({
+                "L": rho / (1 - rho),
+                "Lq": rho ** 2 / (1 - rho),
+                "W": 1 / (mu_rate - lambda_rate),
+                "Wq": rho / (mu_rate - lambda_rate)
+            })
+    fields.update({key: _format_metric(value) for key, value in metrics.items()})
+
+    template = next(
+        (answer["answer"] for answer in config.answers if answer["pattern"].search(prompt)),
+        DEFAULT_TEMPLATE
+    )
+
+    try:
+        return template.format(**fields)
+    except (KeyError, IndexError, ValueError):
+        return template
+
+
+class MockGroqHandler(BaseHTTPRequestHandler):
+    """Trata as rotas /openai/v1/chat/completions e /openai/v1/models"""
+
+    server_version = "MockGroq/1.0"
+    protocol_version = "HTTP/1.1"
+
+    @property
+    def config(self) -> MockGroqConfig:
+        return self.server.config
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+    def _send_json(self, status: int, payload: Dict[str, Any], headers: Optional[Dict[str, str]] = None):
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.path.rstrip("/").endswith("/models"):
+            self._send_json(200, {"object": "list", "data": [{"id": "mock", "object": "model", "owned_by": "mock"}]})
+        else:
+            self._send_json(404, {"error": {"message": f"Rota não encontrada: {self.path}", "type": "invalid_request_error"}})
+
+    def do_POST(self):
+        if not self.path.rstrip("/").endswith("/chat/completions"):
+            self._send_json(404, {"error": {"message": f"Rota não encontrada: {self.path}", "type": "invalid_request_error"}})
+            return
+
+        length = int(self.headers.get("Content-Length", 0))
+        try:
+            request = json.loads(self.rfile.read(length) or b"{}")
+        except json.JSONDecodeError:
+            self._send_json(400, {"error": {"message": "JSON inválido", "type": "invalid_request_error"}})
+            return
+
+        if self.config.should_rate_limit():
+            self._send_json(
+                429,
+                {"error": {"message": "Rate limit reached (simulado)", "type": "tokens", "code": "rate_limit_exceeded"}},
+                headers={"Retry-After": f"{self.config.retry_after:g}"}
+            )
+            return
+
+        model = request.get("model", "mock")
+        messages = request.get("messages", [])
+        answer = render_answer(self.config, messages, model)
+
+        # Respeita max_tokens cortando a resposta
+        tokens = TOKEN_PATTERN.findall(answer)
+        max_tokens = request.get("max_tokens") or len(tokens)
+        finish_reason = "length" if len(tokens) > max_tokens else "stop"
+        tokens = tokens[:max_tokens]
+
+        prompt_tokens = estimate_tokens("".join(str(m.get("content", "")) for m in messages))
+        usage = {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": len(tokens),
+            "total_tokens": prompt_tokens + len(tokens)
+        }
+
+        completion_id = f"chatcmpl-mock-{uuid.uuid4().hex[:12]}"
+        created = int(time.time())
+
+        # Tempo até o primeiro token
+        time.sleep(self.config.sample_latency())
+        token_interval = 1 / self.config.tokens_per_second if self.config.tokens_per_second > 0 else 0.0
+
+        if request.get("stream"):
+            self._stream(completion_id, created, model, tokens, token_interval, finish_reason, usage)
+            return
+
+        time.sleep(token_interval * len(tokens))
+        self._send_json(200, {
+            "id": completion_id,
+            "object": "chat.completion",
+            "created": created,
+            "model": model,
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": "".join(tokens)},
+                "logprobs": None,
+                "finish_reason": finish_reason
+            }],
+            "usage": usage,
+            "system_fingerprint": "mock"
+        })
+
+    def _stream(self, completion_id: str, created: int, model: str, tokens: List[str],
+                token_interval: float, finish_reason: str, usage: Dict[str, int]):
+        """Envia a resposta em chunks SSE, no ritmo de tokens_per_second"""
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        self.close_connection = True
+
+        def send_chunk(delta: Dict[str, Any], finish: Optional[str] = None, extra: Optional[Dict] = None):
+            chunk = {
+                "id": completion_id,
+                "object": "chat.completion.chunk",
+                "created": created,
+                "model": model,
+                "choices": [{"index": 0, "delta": delta, "logprobs": None, "finish_reason": finish}]
+            }
+            if extra:
+                chunk.update(extra)
+            self.wfile.write(f"data: {json.dumps(chunk, ensure_ascii=False)}\n\n".encode("utf-8"))
+            self.wfile.flush()
+
+        try:
+            send_chunk({"role": "assistant", "content": ""})
+            for token in tokens:
+                time.sleep(token_interval)
+                send_chunk({"content": token})
+            # O Groq informa o uso no último chunk (campo x_groq)
+            send_chunk({}, finish_reason, {"x_groq": {"id": completion_id, "usage": usage}})
+            self.wfile.write(b"data: [DONE]\n\n")
+            self.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+
+def create_server(config: MockGroqConfig, host: str = "127.0.0.1", port: int = DEFAULT_PORT,
+                  verbose: bool = False) -> ThreadingHTTPServer:
+    """Cria o servidor (use serve_forever() ou rode em uma thread nos testes)"""
+    server = ThreadingHTTPServer((host, port), MockGroqHandler)
+    server.daemon_threads = True
+    server.config = config
+    server.verbose = verbose
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Servidor local compatível com o Groq para testes offline")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--latency-dist", choices=["fixed", "uniform", "exponential", "lognormal"], default="fixed",
+                        help="distribuição do tempo até o primeiro token")
+    parser.add_argument("--latency-ms", type=float, default=300.0, help="latência média/mediana (ms)")
+    parser.add_argument("--latency-sigma", type=float, default=0.5,
+                        help="dispersão (lognormal: sigma; uniform: fração da média)")
+    parser.add_argument("--tokens-per-second", type=float, default=750.0, help="ritmo de geração")
+    parser.add_argument("--rate-limit-prob", type=float, default=0.0, help="probabilidade de responder 429")
+    parser.add_argument("--retry-after", type=float, default=1.0, help="valor do header Retry-After (s)")
+    parser.add_argument("--answers", help='JSON com [{"match": regex, "answer": template}]')
+    parser.add_argument("--seed", type=int, help="semente para resultados reproduzíveis")
+    parser.add_argument("--verbose", action="store_true", help="registra cada requisição")
+    args = parser.parse_args()
+
+    answers = None
+    if args.answers:
+        with open(args.answers, encoding="utf-8") as f:
+            answers = json.load(f)
+
+    config = MockGroqConfig(
+        latency_dist=args.latency_dist,
+        latency_ms=args.latency_ms,
+        latency_sigma=args.latency_sigma,
+        tokens_per_second=args.tokens_per_second,
+        rate_limit_prob=args.rate_limit_prob,
+        retry_after=args.retry_after,
+        answers=answers,
+        seed=args.seed
+    )
+
+    server = create_server(config, args.host, args.port, args.verbose)
+    print(f"🧪 Groq simulado em http://{args.host}:{args.port} (use GROQ_MOCK=1 ou GROQ_BASE_URL)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
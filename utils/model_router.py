@@ -0,0 +1,203 @@
+"""
+Roteamento de modelo por rota do GroqClient
+
+Cada rota tem uma política (modelo, temperatura, max_tokens e SLO de latência):
+- formatar resultados já calculados (calculate_and_explain, example, ...) usa o modelo rápido
+- resolver do zero um enunciado bagunçado (ai_solve) usa o modelo maior
+
+O roteador guarda as últimas latências por (rota, modelo). Quando o p90 do modelo
+principal passa do SLO da rota, as chamadas seguintes vão para o modelo rápido; uma
+em cada PROBE_EVERY ainda testa o principal, que volta assim que se recupera.
+Latência e custo estimado (tabela MODEL_PRICES) de cada chamada vão para o
+rastreamento (llm_latency_seconds, llm_cost_usd_total) e para summary().
+"""
+
+import os
+import math
+import threading
+from collections import deque
+from dataclasses import dataclass
+from typing import Deque, Dict, Optional, Tuple
+
+from utils import tracing
+from utils import prompts
+
+
+def env_models() -> Tuple[str, str, bool]:
+    """
+    (modelo rápido, modelo maior, roteamento ligado) das variáveis de ambiente
+    GROQ_FAST_MODEL (ou GROQ_MODEL), GROQ_SMART_MODEL e GROQ_ROUTING
+    """
+    fast_model = os.getenv("GROQ_FAST_MODEL") or os.getenv("GROQ_MODEL", "llama-3.1-8b-instant")
+    smart_model = os.getenv("GROQ_SMART_MODEL", "llama-3.3-70b-versatile")
+    enabled = os.getenv("GROQ_ROUTING", "1").lower() in ("1", "true", "yes")
+    return fast_model, smart_model, enabled
+
+
+# Valores na importação; o GroqClient relê depois do load_dotenv (ModelRouter.from_env)
+FAST_MODEL, SMART_MODEL, ROUTING_ENABLED = env_models()
+
+# Latências guardadas por (rota, modelo) e mínimo para julgar o SLO
+LATENCY_WINDOW = 20
+MIN_SAMPLES = 5
+SLO_PERCENTILE = 90.0
+# Com o principal fora do SLO, 1 em cada PROBE_EVERY chamadas ainda o testa
+PROBE_EVERY = 10
+
+# US$ por milhão de tokens (entrada, saída) - tabela pública da Groq
+MODEL_PRICES = {
+    "llama-3.1-8b-instant": (0.05, 0.08),
+    "llama-3.3-70b-versatile": (0.59, 0.79),
+    "openai/gpt-oss-20b": (0.10, 0.50),
+    "openai/gpt-oss-120b": (0.15, 0.75),
+    "qwen/qwen3-32b": (0.29, 0.59),
+}
+
+
+@dataclass(frozen=True)
+class RoutePolicy:
+    """Modelo, variação de temperatura (sobre GROQ_TEMPERATURE) e SLO de latência total (s)"""
+    tier: str
+    temperature_offset: float
+    slo_seconds: float
+
+
+ROUTE_POLICIES = {
+    "explain_calculation": RoutePolicy("fast", 0.0, 4.0),
+    "example": RoutePolicy("fast", 0.0, 6.0),
+    "problem_with_context": RoutePolicy("fast", 0.0, 6.0),
+    "calculate_and_explain": RoutePolicy("fast", 0.0, 6.0),
+    "ai_solve": RoutePolicy("smart", 0.1, 10.0),  # Pouco mais criativo para resolução
+    "general_help": RoutePolicy("fast", 0.1, 4.0),
+    "error": RoutePolicy("fast", 0.0, 3.0)
+}
+
+
+@dataclass(frozen=True)
+class RouteDecision:
+    """Parâmetros da chamada escolhidos para a rota"""
+    route: str
+    model: str
+    temperature: float
+    max_tokens: int
+    fallback_model: Optional[str] = None
+    degraded: bool = False  # Principal fora do SLO: a chamada já saiu pelo modelo rápido
+
+
+def estimate_cost(model: str, prompt_tokens: int, completion_tokens: int) -> Optional[float]:
+    """Custo estimado em US$ (None para modelos fora da tabela)"""
+    prices = MODEL_PRICES.get(model)
+    if prices is None:
+        return None
+    return (prompt_tokens * prices[0] + completion_tokens * prices[1]) / 1_000_000
+
+
+def _percentile(values, percentile: float) -> float:
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, math.ceil(percentile / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+class ModelRouter:
+    """Escolhe modelo, temperatura e max_tokens por rota e acompanha latência e custo"""
+
+    def __init__(self, base_temperature: float, max_tokens_cap: int,
+                 fast_model: str = FAST_MODEL, smart_model: str = SMART_MODEL, enabled: bool = ROUTING_ENABLED):
+        self.base_temperature = base_temperature
+        self.max_tokens_cap = max_tokens_cap
+        self.models = {"fast": fast_model, "smart": smart_model if enabled else fast_model}
+        self._latencies: Dict[Tuple[str, str], Deque[float]] = {}
+        self._calls_while_degraded: Dict[str, int] = {}
+        self._stats: Dict[Tuple[str, str], Dict[str, float]] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls, base_temperature: float, max_tokens_cap: int) -> "ModelRouter":
+        """Roteador com os modelos das variáveis de ambiente no momento da chamada"""
+        fast_model, smart_model, enabled = env_models()
+        return cls(base_temperature, max_tokens_cap, fast_model, smart_model, enabled)
+
+    def policy(self, route: str) -> RoutePolicy:
+        return ROUTE_POLICIES.get(route, ROUTE_POLICIES["general_help"])
+
+    def slo_at_risk(self, route: str, model: str) -> bool:
+        """p90 das últimas chamadas do modelo nesta rota acima do SLO"""
+        with self._lock:
+            window = self._latencies.get((route, model))
+            if not window or len(window) < MIN_SAMPLES:
+                return False
+            latencies = list(window)
+        return _percentile(latencies, SLO_PERCENTILE) > self.policy(route).slo_seconds
+
+    def plan(self, route: str) -> RouteDecision:
+        """Parâmetros da rota com o modelo principal, sem olhar o SLO"""
+        policy = self.policy(route)
+        primary = self.models[policy.tier]
+        fast = self.models["fast"]
+        return RouteDecision(
+            route,
+            primary,
+            round(self.base_temperature + policy.temperature_offset, 3),
+            prompts.route_max_tokens(route, self.max_tokens_cap),
+            fallback_model=fast if primary != fast else None
+        )
+
+    def select(self, route: str) -> RouteDecision:
+        """Parâmetros da próxima chamada da rota (modelo rápido se o principal estiver fora do SLO)"""
+        decision = self.plan(route)
+        if decision.fallback_model is not None and self.slo_at_risk(route, decision.model):
+            with self._lock:
+                calls = self._calls_while_degraded[route] = self._calls_while_degraded.get(route, 0) + 1
+            if calls % PROBE_EVERY:
+                tracing.count("llm_route_fallback_total", route=route, reason="slo")
+                return RouteDecision(route, decision.fallback_model, decision.temperature,
+                                     decision.max_tokens, degraded=True)
+        else:
+            with self._lock:
+                self._calls_while_degraded.pop(route, None)
+        return decision
+
+    def record(self, decision: RouteDecision, model: str, latency: float,
+               prompt_tokens: Optional[int] = None, completion_tokens: Optional[int] = None,
+               error: bool = False) -> Optional[float]:
+        """Registra latência (erros contam como SLO estourado) e custo da chamada; devolve o custo"""
+        route = decision.route
+        if error:
+            latency = max(latency, self.policy(route).slo_seconds * 2)
+        cost = None
+        if prompt_tokens is not None and completion_tokens is not None:
+            cost = estimate_cost(model, prompt_tokens, completion_tokens)
+
+        with self._lock:
+            window = self._latencies.setdefault((route, model), deque(maxlen=LATENCY_WINDOW))
+            # Sonda do principal dentro do SLO: o histórico ruim é descartado e ele volta a ser usado
+            if route in self._calls_while_degraded and model == decision.model and not decision.degraded \
+                    and latency <= self.policy(route).slo_seconds:
+                window.clear()
+            window.append(latency)
+            stats = self._stats.setdefault((route, model), {
+                "calls": 0, "errors": 0, "fallbacks": 0, "latency_total": 0.0, "cost_usd": 0.0
+            })
+            stats["calls"] += 1
+            stats["errors"] += int(error)
+            stats["fallbacks"] += int(model != decision.model or decision.degraded)
+            stats["latency_total"] += latency
+            stats["cost_usd"] += cost or 0.0
+
+        tracing.observe("llm_latency_seconds", latency, route=route, model=model)
+        if cost is not None:
+            tracing.count("llm_cost_usd_total", cost, route=route, model=model)
+        return cost
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        """Chamadas, erros, fallbacks, latência média/p90 e custo por rota e modelo"""
+        with self._lock:
+            rows = {
+                f"{route}:{model}": {
+                    **stats,
+                    "latency_mean": stats["latency_total"] / stats["calls"],
+                    "latency_p90": _percentile(self._latencies[(route, model)], SLO_PERCENTILE)
+                }
+                for (route, model), stats in sorted(self._stats.items())
+            }
+        return rows
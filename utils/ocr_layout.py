@@ -0,0 +1,144 @@
+"""
+Reconstrução da ordem de leitura a partir das caixas do EasyOCR
+Agrupa as caixas em colunas e linhas e mantém a confiança de cada trecho
+"""
+
+import re
+from bisect import bisect_left
+from typing import Any, Dict, List, NamedTuple, Sequence
+
+
+# Confiança mínima para um trecho entrar no texto
+MIN_CONFIDENCE = 0.3
+
+# Números abaixo desta confiança são marcados (e relidos no recorte)
+LOW_CONFIDENCE_NUMBER = 0.6
+
+# Sobreposição vertical mínima (fração da menor altura) para duas caixas serem da mesma linha
+LINE_OVERLAP = 0.5
+
+# Vão horizontal mínimo (fração da largura da página) que separa colunas
+COLUMN_GAP = 0.05
+
+# Caixas mais largas que esta fração da página (títulos) não definem colunas
+SPANNING_WIDTH = 0.6
+
+HAS_DIGIT = re.compile(r'\d')
+
+
+class OCRBox(NamedTuple):
+    """Trecho detectado pelo OCR com sua caixa alinhada aos eixos"""
+    text: str
+    confidence: float
+    x0: float
+    y0: float
+    x1: float
+    y1: float
+
+    @classmethod
+    def from_easyocr(cls, bbox: Sequence, text: str, confidence: float) -> "OCRBox":
+        """Converte o resultado (quadrilátero, texto, confiança) do EasyOCR"""
+        xs = [point[0] for point in bbox]
+        ys = [point[1] for point in bbox]
+        return cls(text, float(confidence), float(min(xs)), float(min(ys)), float(max(xs)), float(max(ys)))
+
+    @property
+    def height(self) -> float:
+        return self.y1 - self.y0
+
+    @property
+    def is_numeric(self) -> bool:
+        return bool(HAS_DIGIT.search(self.text))
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "text": self.text,
+            "confidence": round(self.confidence, 3),
+            "bbox": [round(self.x0), round(self.y0), round(self.x1), round(self.y1)]
+        }
+
+
+def _split_columns(boxes: List[OCRBox], page_width: float) -> List[List[OCRBox]]:
+    """Separa as caixas em colunas pelos vãos da projeção horizontal (varredura ordenada)"""
+    anchors = sorted(
+        (box for box in boxes if box.x1 - box.x0 < SPANNING_WIDTH * page_width),
+        key=lambda box: box.x0
+    )
+    if not anchors:
+        return [boxes]
+
+    # Fronteiras: pontos médios dos vãos largos entre intervalos [x0, x1] já unidos
+    boundaries = []
+    reach = anchors[0].x1
+    for box in anchors[1:]:
+        if box.x0 - reach > COLUMN_GAP * page_width:
+            boundaries.append((reach + box.x0) / 2)
+        reach = max(reach, box.x1)
+
+    if not boundaries:
+        return [boxes]
+
+    columns: List[List[OCRBox]] = [[] for _ in range(len(boundaries) + 1)]
+    spanning = []
+    for box in boxes:
+        if box.x1 - box.x0 >= SPANNING_WIDTH * page_width:
+            spanning.append(box)
+        else:
+            columns[bisect_left(boundaries, (box.x0 + box.x1) / 2)].append(box)
+
+    # Títulos que cruzam a página ficam antes das colunas
+    return ([spanning] if spanning else []) + [column for column in columns if column]
+
+
+def _group_lines(boxes: List[OCRBox]) -> List[List[OCRBox]]:
+    """Agrupa caixas em linhas varrendo-as por y; cada caixa só é comparada com a linha aberta"""
+    lines: List[List[OCRBox]] = []
+    line_top = line_bottom = 0.0
+
+    for box in sorted(boxes, key=lambda b: (b.y0 + b.y1) / 2):
+        if lines:
+            overlap = min(line_bottom, box.y1) - max(line_top, box.y0)
+            if overlap >= LINE_OVERLAP * min(box.height, line_bottom - line_top):
+                lines[-1].append(box)
+                line_top, line_bottom = min(line_top, box.y0), max(line_bottom, box.y1)
+                continue
+
+        lines.append([box])
+        line_top, line_bottom = box.y0, box.y1
+
+    return [sorted(line, key=lambda b: b.x0) for line in lines]
+
+
+def build_reading_order(boxes: Sequence[OCRBox]) -> Dict[str, Any]:
+    """
+    Monta o texto estruturado em ordem de leitura
+    Retorna: {text, lines, confidence, low_confidence_numbers}
+    """
+    kept = [box for box in boxes if box.confidence >= MIN_CONFIDENCE and box.text.strip()]
+    if not kept:
+        return {"text": "", "lines": [], "confidence": 0.0, "low_confidence_numbers": []}
+
+    page_width = max(box.x1 for box in kept) - min(box.x0 for box in kept) or 1.0
+
+    lines = []
+    for column_index, column in enumerate(_split_columns(kept, page_width)):
+        for line in _group_lines(column):
+            lines.append({
+                "text": " ".join(box.text for box in line),
+                "confidence": round(min(box.confidence for box in line), 3),
+                "column": column_index
+            })
+
+    # Confiança média ponderada pelo tamanho de cada trecho
+    total_chars = sum(len(box.text) for box in kept)
+    confidence = sum(box.confidence * len(box.text) for box in kept) / total_chars
+
+    return {
+        "text": "\n".join(line["text"] for line in lines),
+        "lines": lines,
+        "confidence": round(confidence, 3),
+        "low_confidence_numbers": [
+            box.to_dict() for box in kept
+            if box.is_numeric and box.confidence < LOW_CONFIDENCE_NUMBER
+        ]
+    }
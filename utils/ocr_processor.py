@@ -3,19 +3,55 @@ Processador OCR para extrair texto de imagens de exercícios
 Integrado com o sistema Bosquinho M/M/1
 """
 
+import io
+import os
+import time
+import threading
+import importlib.util
+import multiprocessing
+from contextlib import nullcontext
+from concurrent.futures import Future, ProcessPoolExecutor
 import streamlit as st
 import numpy as np
 import re
 from PIL import Image
-from typing import Optional, Tuple
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+from utils.text_normalizer import normalize_ocr_text
+from utils.ocr_layout import OCRBox, LOW_CONFIDENCE_NUMBER, build_reading_order
+
+# Caixas que contêm apenas um número (com leituras erradas comuns de dígitos)
+NUMERIC_ONLY = re.compile(r'^[\d\s.,/:Oo|lI]+$')
+NUMBER_ALLOWLIST = "0123456789.,/"
+
+# Resolução usada para rasterizar páginas de PDF
+PDF_RENDER_DPI = int(os.getenv("OCR_PDF_DPI", "200"))
+
+# Quantidade de páginas enviadas de uma vez ao Reader
+OCR_BATCH_SIZE = int(os.getenv("OCR_BATCH_SIZE", "4"))
+
+# Camada de pré-processamento: off, fast, auto (NLM quando necessário) ou full
+OCR_PREPROCESS = os.getenv("OCR_PREPROCESS", "auto")
+
+# Faixa do maior lado da imagem (pixels) usada no pré-processamento
+OCR_MIN_SIDE = 1000
+OCR_MAX_SIDE = 2000
+
+# Limites das estimativas que decidem se o NLM compensa
+NLM_NOISE_THRESHOLD = 6.0
+NLM_MIN_SHARPNESS = 100.0
 
 
 class OCRProcessor:
     """Processador OCR para exercícios de Teoria das Filas"""
     
-    def __init__(self):
-        self.reader = None
-        self._initialize_ocr()
+    def __init__(self, reader=None):
+        # Com um reader pronto (processo worker) não há interação com o Streamlit
+        self.reader = reader
+        self.interactive = reader is None
+        self.last_timings: Dict[str, float] = {}
+        self.last_layout: Dict[str, Any] = {}
+        if self.reader is None:
+            self._initialize_ocr()
     
     def _initialize_ocr(self):
         """Inicializa o EasyOCR com cache para performance"""
@@ -37,100 +73,252 @@ class OCRProcessor:
         if self.reader is None:
             return "Erro: OCR não inicializado"
         
+        self.last_layout = {}
+
         try:
             # Converte PIL Image para numpy array
             img_array = np.array(image)
             
             # Extrai texto com EasyOCR
-            with st.spinner("🔍 Extraindo texto da imagem..."):
+            status = st.spinner("🔍 Extraindo texto da imagem...") if self.interactive else nullcontext()
+            with status:
                 results = self.reader.readtext(img_array)
             
-            # Combina todos os textos detectados
-            extracted_text = ""
-            for (bbox, text, confidence) in results:
-                if confidence > 0.3:  # Filtra textos com baixa confiança
-                    extracted_text += text + " "
-            
-            return extracted_text.strip()
+            # Reconstrói a ordem de leitura mantendo caixas e confiança
+            self.last_layout = self.layout_results(img_array, results)
+            return self.last_layout["text"]
             
         except Exception as e:
+            if not self.interactive:
+                raise
             st.error(f"❌ Erro na extração de texto: {e}")
             return ""
     
     def clean_and_format_text(self, raw_text: str) -> str:
         """Limpa e formata o texto extraído para melhor processamento"""
-        if not raw_text:
-            return ""
-        
-        # Remove caracteres especiais e normaliza espaços
-        text = re.sub(r'\s+', ' ', raw_text)
-        text = text.strip()
-        
-        # Correções comuns de OCR
-        corrections = {
-            'À': 'λ',  # Lambda mal reconhecido
-            'µ': 'μ',  # Mu
-            'p': 'ρ',  # Rho (quando apropriado)
-            '|': 'l',  # Pipe como L
-            '0': 'O',  # Zero como O (quando apropriado)
-            '1/': '1/',  # Frações
-        }
-        
-        for wrong, correct in corrections.items():
-            text = text.replace(wrong, correct)
-        
-        # Melhora formatação de números e frações
-        text = re.sub(r'(\d)\s*[/]\s*(\d)', r'\1/\2', text)  # 1 / 3 → 1/3
-        text = re.sub(r'λ\s*=\s*', 'λ=', text)  # λ = → λ=
-        text = re.sub(r'μ\s*=\s*', 'μ=', text)  # μ = → μ=
-        
-        return text
+        # Passagem única por linha: símbolos corrigidos só em contexto matemático, números preservados
+        lines = (normalize_ocr_text(line) for line in raw_text.splitlines())
+        return "\n".join(line for line in lines if line)
     
+    def layout_results(self, img_array: np.ndarray, results: List) -> Dict[str, Any]:
+        """Converte o resultado do EasyOCR em texto estruturado (linhas, colunas e confiança)"""
+        boxes = [OCRBox.from_easyocr(bbox, text, confidence) for (bbox, text, confidence) in results]
+        return build_reading_order(self.reread_low_confidence(img_array, boxes))
+
+    def reread_low_confidence(self, img_array: np.ndarray, boxes: List[OCRBox]) -> List[OCRBox]:
+        """Relê, apenas no recorte ampliado da caixa, os números com baixa confiança"""
+        height, width = img_array.shape[:2]
+        reread = []
+
+        for box in boxes:
+            if not box.is_numeric or box.confidence >= LOW_CONFIDENCE_NUMBER:
+                reread.append(box)
+                continue
+
+            pad = max(2, int(box.height * 0.2))
+            x0, y0 = max(0, int(box.x0) - pad), max(0, int(box.y0) - pad)
+            x1, y1 = min(width, int(box.x1) + pad), min(height, int(box.y1) + pad)
+            if x1 <= x0 or y1 <= y0:
+                reread.append(box)
+                continue
+
+            crop = Image.fromarray(img_array[y0:y1, x0:x1])
+            crop = np.array(crop.resize((2 * (x1 - x0), 2 * (y1 - y0)), Image.BICUBIC))
+
+            # Caixas só com número são relidas restritas a dígitos
+            allowlist = NUMBER_ALLOWLIST if NUMERIC_ONLY.match(box.text) else None
+            results = self.reader.readtext(crop, allowlist=allowlist)
+
+            if results:
+                confidence = min(float(r[2]) for r in results)
+                if confidence > box.confidence:
+                    box = box._replace(text=" ".join(r[1] for r in results), confidence=confidence)
+
+            reread.append(box)
+
+        return reread
+
+    def extract_text_batch(self, images: Sequence[Image.Image]) -> List[str]:
+        """
+        Extrai texto de várias páginas com readtext_batched
+        Páginas de mesmo tamanho são agrupadas, pois o detector exige dimensões iguais no lote
+        """
+        if self.reader is None:
+            return ["Erro: OCR não inicializado"] * len(images)
+
+        arrays = [np.array(image.convert("RGB")) for image in images]
+
+        groups: Dict[Tuple[int, ...], List[int]] = {}
+        for index, array in enumerate(arrays):
+            groups.setdefault(array.shape, []).append(index)
+
+        texts = [""] * len(arrays)
+        for indices in groups.values():
+            batch_results = self.reader.readtext_batched([arrays[i] for i in indices])
+            for index, results in zip(indices, batch_results):
+                texts[index] = self.layout_results(arrays[index], results)["text"]
+
+        return texts
+
+    @staticmethod
+    def is_pdf(data: bytes, name: str = "") -> bool:
+        """Identifica PDFs pela extensão ou pela assinatura do arquivo"""
+        return name.lower().endswith(".pdf") or data[:5] == b"%PDF-"
+
+    @staticmethod
+    def count_pages(data: bytes, name: str = "") -> int:
+        """Conta as páginas de um documento (imagens têm uma página)"""
+        if not OCRProcessor.is_pdf(data, name):
+            return 1
+
+        import pypdfium2 as pdfium
+        pdf = pdfium.PdfDocument(data)
+        try:
+            return len(pdf)
+        finally:
+            pdf.close()
+
+    @staticmethod
+    def iter_document_pages(data: bytes, name: str = "",
+                            page_indices: Optional[Sequence[int]] = None) -> Iterator[Image.Image]:
+        """Rasteriza as páginas sob demanda, uma de cada vez"""
+        if not OCRProcessor.is_pdf(data, name):
+            yield Image.open(io.BytesIO(data)).convert("RGB")
+            return
+
+        import pypdfium2 as pdfium
+        pdf = pdfium.PdfDocument(data)
+        try:
+            indices = range(len(pdf)) if page_indices is None else page_indices
+            for index in indices:
+                page = pdf[index]
+                try:
+                    yield page.render(scale=PDF_RENDER_DPI / 72).to_pil().convert("RGB")
+                finally:
+                    page.close()
+        finally:
+            pdf.close()
+
     def process_exercise_image(self, image: Image.Image) -> Tuple[str, str]:
         """
         Processa uma imagem de exercício completa
         Retorna: (texto_extraído, texto_limpo)
+        O tempo de cada etapa fica em self.last_timings
         """
+        # Pré-processa (camadas conforme OCR_PREPROCESS)
+        image, timings = self.preprocess_image(image)
+
         # Extrai texto bruto
+        start = time.perf_counter()
         raw_text = self.extract_text_from_image(image)
+        timings["ocr"] = time.perf_counter() - start
         
         # Limpa e formata
+        start = time.perf_counter()
         clean_text = self.clean_and_format_text(raw_text)
-        
+        timings["clean"] = time.perf_counter() - start
+
+        self.last_timings = timings
         return raw_text, clean_text
     
-    def enhance_image_quality(self, image: Image.Image) -> Image.Image:
-        """Melhora a qualidade da imagem para melhor OCR"""
+    @staticmethod
+    def estimate_noise(gray: np.ndarray) -> float:
+        """Estimativa rápida do desvio do ruído (método de Immerkær, uma convolução)"""
+        import cv2
+
+        kernel = np.array([[1, -2, 1], [-2, 4, -2], [1, -2, 1]], dtype=np.float32)
+        response = cv2.filter2D(gray.astype(np.float32), -1, kernel)[1:-1, 1:-1]
+        height, width = response.shape
+        if height == 0 or width == 0:
+            return 0.0
+        return float(np.sqrt(np.pi / 2) * np.abs(response).sum() / (6 * width * height))
+
+    @staticmethod
+    def estimate_sharpness(gray: np.ndarray) -> float:
+        """Nitidez pela variância do Laplaciano (valores baixos indicam imagem borrada)"""
+        import cv2
+        return float(cv2.Laplacian(gray, cv2.CV_64F).var())
+
+    def preprocess_image(self, image: Image.Image, mode: Optional[str] = None) -> Tuple[Image.Image, Dict[str, float]]:
+        """
+        Pipeline de pré-processamento em camadas
+        - "fast": escala de cinza, redimensionamento, limiar adaptativo e filtro de mediana
+        - "auto": como "fast", com NLM apenas quando a estimativa de ruído indicar ganho
+        - "full": como "fast", sempre com NLM
+        - "off": imagem original
+        Retorna a imagem processada e o tempo (s) de cada etapa
+        """
+        mode = mode or OCR_PREPROCESS
+        timings: Dict[str, float] = {}
+
+        if mode == "off":
+            return image, timings
+
         try:
             import cv2
-            
-            # Converte para numpy
+
+            # Escala de cinza
+            start = time.perf_counter()
             img_array = np.array(image)
-            
-            # Converte para escala de cinza se colorida
             if len(img_array.shape) == 3:
-                gray = cv2.cvtColor(img_array, cv2.COLOR_RGB2GRAY)
+                gray = cv2.cvtColor(img_array, cv2.COLOR_RGBA2GRAY if img_array.shape[2] == 4 else cv2.COLOR_RGB2GRAY)
             else:
                 gray = img_array
-            
-            # Aplica filtros para melhorar OCR
-            # Denoising
-            denoised = cv2.fastNlMeansDenoising(gray)
-            
-            # Aumenta contraste
-            enhanced = cv2.convertScaleAbs(denoised, alpha=1.2, beta=10)
-            
-            # Converte de volta para PIL
-            return Image.fromarray(enhanced)
-            
+            timings["grayscale"] = time.perf_counter() - start
+
+            # Redimensiona para a faixa em que o OCR funciona bem (e o NLM fica barato)
+            start = time.perf_counter()
+            longest_side = max(gray.shape[:2])
+            if longest_side > OCR_MAX_SIDE:
+                scale = OCR_MAX_SIDE / longest_side
+                gray = cv2.resize(gray, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+            elif longest_side < OCR_MIN_SIDE:
+                scale = OCR_MIN_SIDE / longest_side
+                gray = cv2.resize(gray, None, fx=scale, fy=scale, interpolation=cv2.INTER_CUBIC)
+            timings["resize"] = time.perf_counter() - start
+
+            # Denoising NLM só quando compensa (ruído alto em imagem nítida)
+            if mode in ("auto", "full"):
+                start = time.perf_counter()
+                noise = self.estimate_noise(gray)
+                sharpness = self.estimate_sharpness(gray)
+                timings["estimate"] = time.perf_counter() - start
+
+                if mode == "full" or (noise > NLM_NOISE_THRESHOLD and sharpness > NLM_MIN_SHARPNESS):
+                    start = time.perf_counter()
+                    gray = cv2.fastNlMeansDenoising(gray, h=float(np.clip(noise, 5, 15)))
+                    timings["denoise"] = time.perf_counter() - start
+
+            # Binarização local (substitui o ajuste global de contraste)
+            start = time.perf_counter()
+            binary = cv2.adaptiveThreshold(
+                gray, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C, cv2.THRESH_BINARY, 31, 15
+            )
+            timings["threshold"] = time.perf_counter() - start
+
+            # Remove pontos isolados deixados pela binarização
+            start = time.perf_counter()
+            enhanced = cv2.medianBlur(binary, 3)
+            timings["median"] = time.perf_counter() - start
+
+            return Image.fromarray(enhanced), timings
+
         except ImportError:
-            st.warning("⚠️ OpenCV não disponível. Usando imagem original.")
-            return image
+            if self.interactive:
+                st.warning("⚠️ OpenCV não disponível. Usando imagem original.")
+            return image, timings
         except Exception as e:
-            st.warning(f"⚠️ Erro no processamento da imagem: {e}")
-            return image
+            if self.interactive:
+                st.warning(f"⚠️ Erro no processamento da imagem: {e}")
+            return image, timings
+
+    def enhance_image_quality(self, image: Image.Image, mode: Optional[str] = None) -> Image.Image:
+        """Melhora a qualidade da imagem para melhor OCR"""
+        enhanced, self.last_timings = self.preprocess_image(image, mode)
+        return enhanced
     
-    def validate_mm1_content(self, text: str) -> bool:
+    @staticmethod
+    def validate_mm1_content(text: str) -> bool:
         """Verifica se o texto contém conteúdo relacionado a M/M/1"""
         mm1_keywords = [
             'fila', 'queue', 'teoria das filas', 'queueing',
@@ -150,3 +338,130 @@ class OCRProcessor:
 def get_ocr_processor():
     """Retorna instância cached do processador OCR"""
     return OCRProcessor()
+
+
+# Processador do worker (um por processo do pool)
+_worker_processor: Optional[OCRProcessor] = None
+
+
+def _init_ocr_worker(torch_threads: int):
+    """Inicializa o EasyOCR dentro do processo worker, limitando as threads do torch"""
+    global _worker_processor
+
+    # Precisa ser definido antes de o torch ser importado
+    os.environ["OMP_NUM_THREADS"] = str(torch_threads)
+    os.environ["MKL_NUM_THREADS"] = str(torch_threads)
+
+    try:
+        import torch
+        torch.set_num_threads(torch_threads)
+        torch.set_num_interop_threads(1)
+    except ImportError:
+        pass
+
+    import easyocr
+    reader = easyocr.Reader(['pt', 'en'], gpu=False, verbose=False)
+    _worker_processor = OCRProcessor(reader=reader)
+
+
+def _run_ocr_job(img_array: np.ndarray) -> Dict[str, Any]:
+    """Executa o OCR de uma imagem no processo worker"""
+    start = time.perf_counter()
+    raw_text, clean_text = _worker_processor.process_exercise_image(Image.fromarray(img_array))
+
+    return {
+        "raw_text": raw_text,
+        "clean_text": clean_text,
+        "timings": _worker_processor.last_timings,
+        "layout": _worker_processor.last_layout,
+        "elapsed": time.perf_counter() - start
+    }
+
+
+def _run_ocr_pages_job(data: bytes, name: str, page_indices: List[int]) -> List[Dict[str, Any]]:
+    """Rasteriza e lê um bloco de páginas no processo worker"""
+    pages = [
+        _worker_processor.preprocess_image(page)[0]
+        for page in OCRProcessor.iter_document_pages(data, name, page_indices)
+    ]
+    raw_texts = _worker_processor.extract_text_batch(pages)
+
+    return [
+        {
+            "source": name,
+            "page": page_index,
+            "raw_text": raw_text,
+            "clean_text": _worker_processor.clean_and_format_text(raw_text)
+        }
+        for page_index, raw_text in zip(page_indices, raw_texts)
+    ]
+
+
+class OCRWorkerService:
+    """
+    Serviço de OCR fora da thread de script do Streamlit
+
+    O EasyOCR roda em um pool de processos próprio (com threads do torch
+    limitadas), e a interface apenas consulta o Future retornado por submit().
+    """
+
+    def __init__(self, max_workers: Optional[int] = None, torch_threads: Optional[int] = None):
+        self.max_workers = max_workers or int(os.getenv("OCR_WORKERS", "1"))
+        self.torch_threads = torch_threads or int(os.getenv("OCR_TORCH_THREADS", "2"))
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def is_available() -> bool:
+        """Verifica se o EasyOCR está instalado sem carregá-lo no processo principal"""
+        return importlib.util.find_spec("easyocr") is not None
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        """Cria o pool sob demanda (spawn evita herdar o estado do servidor Streamlit)"""
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_init_ocr_worker,
+                    initargs=(self.torch_threads,)
+                )
+            return self._executor
+
+    def _submit(self, fn, *args) -> Future:
+        """Agenda fn(*args) no pool; se o pool estiver quebrado (ex.: worker morreu), recria e tenta de novo"""
+        try:
+            return self._get_executor().submit(fn, *args)
+        except RuntimeError:
+            self.shutdown()
+            return self._get_executor().submit(fn, *args)
+
+    def submit(self, image: Image.Image) -> Future:
+        """Agenda o OCR de uma imagem e retorna o Future com {raw_text, clean_text, timings, layout, elapsed}"""
+        return self._submit(_run_ocr_job, np.array(image.convert("RGB")))
+
+    def submit_document(self, data: bytes, name: str, batch_size: Optional[int] = None) -> List[Future]:
+        """
+        Agenda o OCR de um documento (PDF ou imagem) em blocos de páginas
+        Retorna um Future por bloco, em ordem de página, cada um com a lista de páginas lidas
+        """
+        batch_size = batch_size or OCR_BATCH_SIZE
+        total_pages = OCRProcessor.count_pages(data, name)
+
+        return [
+            self._submit(_run_ocr_pages_job, data, name, list(range(start, min(start + batch_size, total_pages))))
+            for start in range(0, total_pages, batch_size)
+        ]
+
+    def shutdown(self, wait: bool = False):
+        """Encerra o pool de processos"""
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=wait, cancel_futures=True)
+                self._executor = None
+
+
+@st.cache_resource
+def get_ocr_service():
+    """Retorna instância cached do serviço de OCR em processos"""
+    return OCRWorkerService()
@@ -0,0 +1,158 @@
+"""
+Prompts de sistema compartilhados pelo GroqClient
+
+Layout pensado para o cache de prefixo do provedor: todas as rotas começam pelo
+mesmo BASE_PROMPT (identidade, idioma e fórmulas) e só a tarefa final muda por rota.
+Tudo o que varia por pergunta (enunciado, cálculos, contexto do OCR) vai na
+mensagem do usuário, nunca no prompt de sistema.
+
+max_tokens por rota vem de data/route_max_tokens.json quando existir (gerado a
+partir dos traces com `python -m utils.prompts --fit traces.jsonl`); sem o arquivo,
+valem as estimativas de ROUTE_MAX_TOKENS.
+"""
+
+import os
+import json
+import math
+import argparse
+from functools import lru_cache
+from typing import Dict, List
+
+
+ROUTE_BUDGETS_PATH = os.getenv(
+    "GROQ_ROUTE_BUDGETS",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "route_max_tokens.json")
+)
+
+# Folga sobre o p95 dos tokens gerados, arredondada para múltiplos de BUDGET_STEP
+BUDGET_HEADROOM = 1.25
+BUDGET_STEP = 50
+MIN_BUDGET = 256
+
+BASE_PROMPT = """Você é o Bosquinho, especialista em Teoria das Filas M/M/1. Responda SEMPRE em português brasileiro, de forma didática, com markdown e emojis.
+
+Fórmulas M/M/1 (estável se ρ = λ/μ < 1):
+L = ρ/(1-ρ) · Lq = ρ²/(1-ρ) · W = 1/(μ-λ) · Wq = ρ/(μ-λ) · P0 = 1-ρ · Pn = (1-ρ)ρⁿ · P(N>k) = ρᵏ⁺¹"""
+
+ANSWER_LAYOUT = "Estrutura: 🎯 resumo · 📊 parâmetros · 🔢 resultados · 💡 interpretação prática · ✅ resposta a cada pergunta (letras a), b), c) se houver)."
+
+ROUTE_INSTRUCTIONS = {
+    "explain_calculation": (
+        "Tarefa: explique o resultado calculado - o que significa, a fórmula com os valores "
+        "substituídos, a interpretação prática e se o sistema é estável."
+    ),
+    "example": (
+        "Tarefa: explique o exemplo resolvido - o cenário real, cada métrica com sua fórmula, "
+        "a interpretação de cada resultado e uma conclusão sobre o desempenho do sistema."
+    ),
+    "problem_with_context": (
+        "Tarefa: os cálculos já foram feitos; use exatamente esses valores e relacione-os ao cenário. "
+        "Diferencie L (no sistema) de Lq (aguardando na fila).\n" + ANSWER_LAYOUT
+    ),
+    "calculate_and_explain": (
+        "Tarefa: os cálculos principais já foram feitos e a tabela de resultados já aparece acima da sua "
+        "resposta - não a repita. Use esses valores, mostre as fórmulas relevantes e responda exatamente ao "
+        "que foi perguntado, no contexto real do problema.\n"
+        "Estrutura: 💡 interpretação prática · ✅ resposta a cada pergunta (letras a), b), c) se houver)."
+    ),
+    "ai_solve": (
+        "Tarefa: resolva o problema do zero. Identifique λ e μ mesmo implícitos: intervalos viram taxas "
+        "(\"a cada 3 minutos\" → λ = 1/3 por minuto) e capacidade de atendimento é μ. "
+        "Calcule as métricas pedidas e responda a cada pergunta.\n" + ANSWER_LAYOUT
+    ),
+    "general_help": (
+        "Tarefa: saudação → apresente-se; conceito → explique com um exemplo; cálculo com λ e μ → "
+        "passo a passo; cálculo sem λ e μ → peça os parâmetros; exemplo citado sem parâmetros → "
+        "mostre os exemplos prontos.\nExemplos prontos: {examples}"
+    ),
+    "error": "Tarefa: explique o erro encontrado de forma didática e diga como corrigir os parâmetros."
+}
+
+# Estimativas iniciais de tokens gerados por rota (substituídas por --fit com traces reais)
+ROUTE_MAX_TOKENS = {
+    "explain_calculation": 700,
+    "example": 900,
+    "problem_with_context": 1000,
+    "calculate_and_explain": 1000,
+    "ai_solve": 1400,
+    "general_help": 500,
+    "error": 300
+}
+
+
+def estimate_tokens(text: str) -> int:
+    """Estimativa de tokens (~4 caracteres por token, a mesma do Groq simulado)"""
+    return max(1, len(text) // 4)
+
+
+@lru_cache(maxsize=1)
+def _featured_examples() -> str:
+    from utils.examples import get_all_examples
+
+    return "; ".join(
+        f"{example['title']} (λ={example['lambda_rate']:.4g}, μ={example['mu_rate']:.4g})"
+        for example in get_all_examples()
+    )
+
+
+@lru_cache(maxsize=None)
+def system_prompt(route: str) -> str:
+    """Prompt de sistema da rota: prefixo comum + tarefa (montado uma vez por processo)"""
+    instructions = ROUTE_INSTRUCTIONS[route]
+    if "{examples}" in instructions:
+        instructions = instructions.format(examples=_featured_examples())
+    return f"{BASE_PROMPT}\n\n{instructions}"
+
+
+@lru_cache(maxsize=1)
+def _route_budgets() -> Dict[str, int]:
+    budgets = dict(ROUTE_MAX_TOKENS)
+    if os.path.exists(ROUTE_BUDGETS_PATH):
+        with open(ROUTE_BUDGETS_PATH, encoding="utf-8") as f:
+            budgets.update({route: int(value) for route, value in json.load(f).items()})
+    return budgets
+
+
+def route_max_tokens(route: str, cap: int) -> int:
+    """max_tokens da rota, limitado ao teto configurado (GROQ_MAX_TOKENS)"""
+    return min(_route_budgets().get(route, cap), cap)
+
+
+def fit_route_budgets(trace_paths: List[str], percentile: float = 95.0) -> Dict[str, int]:
+    """Calcula max_tokens por rota a partir dos spans groq.chat gravados em TRACE_JSONL"""
+    completions: Dict[str, List[int]] = {}
+    for path in trace_paths:
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                record = json.loads(line)
+                if record.get("span") == "groq.chat" and record.get("completion_tokens"):
+                    completions.setdefault(record["route"], []).append(int(record["completion_tokens"]))
+
+    budgets = {}
+    for route, values in sorted(completions.items()):
+        values.sort()
+        index = min(len(values) - 1, math.ceil(percentile / 100 * len(values)) - 1)
+        budget = math.ceil(values[index] * BUDGET_HEADROOM / BUDGET_STEP) * BUDGET_STEP
+        budgets[route] = max(MIN_BUDGET, budget)
+    return budgets
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Prompts e max_tokens por rota do GroqClient")
+    parser.add_argument("--fit", nargs="+", metavar="TRACE_JSONL", help="recalcula max_tokens a partir dos traces")
+    parser.add_argument("--percentile", type=float, default=95.0)
+    args = parser.parse_args()
+
+    if args.fit:
+        budgets = fit_route_budgets(args.fit, args.percentile)
+        with open(ROUTE_BUDGETS_PATH, "w", encoding="utf-8") as f:
+            json.dump(budgets, f, indent=2)
+        print(f"💾 {ROUTE_BUDGETS_PATH}")
+
+    print(f"{'rota':<24} {'prompt (tokens)':>16} {'max_tokens':>11}")
+    for route in ROUTE_INSTRUCTIONS:
+        print(f"{route:<24} {estimate_tokens(system_prompt(route)):>16} {_route_budgets().get(route, '-'):>11}")
+
+
+if __name__ == "__main__":
+    main()
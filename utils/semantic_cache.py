@@ -0,0 +1,263 @@
+"""
+Cache semântico de respostas da IA para perguntas parafraseadas
+"chega 1 avião a cada 3 minutos" e "aviões chegam a cada 3 min" viram vetores de
+n-gramas com hashing (sem modelo externo) e são comparados por cosseno numa matriz NumPy
+
+A similaridade só decide entre perguntas com a mesma assinatura: as taxas de chegada e
+de atendimento lidas do enunciado e normalizadas para "por minuto" ("1 a cada 3 minutos",
+"20 por hora" e "a cada 3 min" dão a mesma taxa), os demais números (k, n...) e as
+métricas pedidas. Uma paráfrase com outra taxa, λ e μ trocados ou outra métrica nunca
+reaproveita a resposta. Se o texto não define as duas taxas, valem o λ e o μ extraídos
+pelo agente; sem nenhum dos dois o cache não é usado
+"""
+
+import os
+import re
+import zlib
+import threading
+import unicodedata
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+
+
+SEMANTIC_CACHE_ENABLED = os.getenv("SEMANTIC_CACHE", "1").lower() in ("1", "true", "yes")
+SEMANTIC_CACHE_THRESHOLD = float(os.getenv("SEMANTIC_CACHE_THRESHOLD", "0.65"))
+SEMANTIC_CACHE_SIZE = int(os.getenv("SEMANTIC_CACHE_SIZE", "1024"))
+
+# Dimensão dos vetores (potência de 2; colisões de hash viram ruído pequeno)
+EMBEDDING_DIM = 4096
+
+STOPWORDS = {
+    "a", "o", "e", "de", "do", "da", "dos", "das", "em", "um", "uma", "por", "com", "que",
+    "os", "as", "no", "na", "nos", "nas", "cada", "se", "ao", "num", "numa", "para", "qual"
+}
+
+NUMBER = re.compile(r'\d+(?:[.,]\d+)?')
+WORD = re.compile(r'[a-z#]+')
+
+# Minutos em cada unidade de tempo (palavras sem acento): toda taxa vira "por minuto"
+TIME_UNITS = {
+    **dict.fromkeys(("s", "seg", "segundo", "segundos"), 1 / 60),
+    **dict.fromkeys(("min", "mins", "minuto", "minutos"), 1.0),
+    **dict.fromkeys(("h", "hr", "hrs", "hora", "horas"), 60.0),
+    **dict.fromkeys(("dia", "dias"), 1440.0),
+    **dict.fromkeys(("semana", "semanas"), 10080.0),
+    **dict.fromkeys(("mes", "meses"), 43200.0),
+    **dict.fromkeys(("ano", "anos"), 525600.0)
+}
+
+_NUM = r'(\d+(?:[.,]\d+)?)'
+_UNITS = "|".join(sorted(TIME_UNITS, key=len, reverse=True))
+_UNIT = "(" + _UNITS + r")\b"
+# Até duas palavras entre o número e a unidade ("3 aviões por", "1 cliente a cada"), nenhuma delas unidade
+_WORDS = r'(?:(?!(?:' + _UNITS + r')\b)[a-z]+\s*){0,2}?'
+
+# Padrões de taxa, na ordem em que são procurados: (regex, papel fixo ou None, forma)
+# Formas: "rate" = número por unidade, "interval" = [contagem] a cada [número] unidade,
+# "duration" = número unidade por cliente. Sem papel fixo, o verbo da oração decide
+RATE_PATTERNS = [
+    (re.compile(r'(?:λ|lambda)\s*=\s*' + _NUM + r'(?:\s*' + _WORDS + r'(?:por|/)\s*' + _UNIT + ')?'), "arrival", "rate"),
+    (re.compile(r'(?:μ|\bmu)\s*=\s*' + _NUM + r'(?:\s*' + _WORDS + r'(?:por|/)\s*' + _UNIT + ')?'), "service", "rate"),
+    (re.compile(r'(?:intervalo|tempo) (?:medio )?entre (?:as )?chegadas (?:e )?(?:de )?' + _NUM + r'\s*' + _UNIT),
+     "arrival", "duration"),
+    (re.compile(r'(?:\b(?:leva|levam|dura|duram|demora|demoram)|tempo (?:medio )?de (?:atendimento|servico) (?:e )?(?:de )?)'
+                r'\s*(?:em media\s+|cerca de\s+)?' + _NUM + r'\s*' + _UNIT), "service", "duration"),
+    (re.compile(r'(?:' + _NUM + r'\s+' + _WORDS + r')?\ba cada\s+(?:' + _NUM + r'\s*)?' + _UNIT), None, "interval"),
+    (re.compile(_NUM + r'\s*' + _WORDS + r'(?:por|/)\s*' + _UNIT), None, "rate")
+]
+ARRIVAL_WORDS = re.compile(r'\b(?:cheg|receb|entra|arriv|demanda)')
+SERVICE_WORDS = re.compile(r'\b(?:atend|serv|pous|process|despach|capacidade)')
+SENTENCE_END = re.compile(r'[.;!?](?!\d)')
+
+# Métricas pedidas: símbolos diferenciam maiúsculas, palavras não
+ASKED_METRICS = {
+    "rho": re.compile(r'ρ|\brho\b|(?i:utiliza|ocupa)'),
+    "L": re.compile(r'\bL\b|(?i:m[eé]dio de \w+ no sistema|n[uú]mero m[eé]dio no sistema)'),
+    "Lq": re.compile(r'\bLq\b|(?i:m[eé]dio de \w+ na fila|n[uú]mero m[eé]dio na fila|aguardando)'),
+    "W": re.compile(r'\bW\b|(?i:tempo m[eé]dio no sistema|tempo total)'),
+    "Wq": re.compile(r'\bWq\b|(?i:tempo m[eé]dio na fila|tempo m[eé]dio de espera|sobrevoando)'),
+    "P0": re.compile(r'\bP0\b|(?i:vazio|ocioso)'),
+    "Pn": re.compile(r'\bP[1-9]\d*\b|(?i:exatamente)'),
+    "P_greater": re.compile(r'P\(N\s*>|(?i:mais de|mais que)'),
+    "P_leq": re.compile(r'P\(N\s*[≤<]|(?i:n[aã]o mais|no m[aá]ximo|at[eé] \d)')
+}
+
+# Taxa normalizada: (valor por minuto, "min"), ou (valor, "") quando o enunciado não dá a unidade
+Rate = Tuple[float, str]
+Signature = Tuple[Rate, Rate, Tuple[float, ...], Tuple[str, ...]]
+
+
+def _strip_accents(text: str) -> str:
+    text = unicodedata.normalize("NFKD", text.lower())
+    return "".join(char for char in text if not unicodedata.combining(char))
+
+
+def _number(text: Optional[str], default: float = 1.0) -> float:
+    return float(text.replace(",", ".")) if text else default
+
+
+def _rounded(value: float) -> float:
+    """6 algarismos significativos: 1/3 por minuto lido de formas diferentes dá a mesma chave"""
+    return float(f"{value:.6g}")
+
+
+def _role(text: str, start: int, end: int) -> Optional[str]:
+    """Chegada ou atendimento, pelo último verbo antes da taxa na frase (ou o primeiro depois)"""
+    sentence_start = max((match.end() for match in SENTENCE_END.finditer(text, 0, start)), default=0)
+    sentence_end = SENTENCE_END.search(text, end)
+    before = text[sentence_start:start]
+    after = text[end:sentence_end.start() if sentence_end else len(text)]
+
+    last_arrival = max((match.start() for match in ARRIVAL_WORDS.finditer(before)), default=-1)
+    last_service = max((match.start() for match in SERVICE_WORDS.finditer(before)), default=-1)
+    if last_arrival != last_service:
+        return "arrival" if last_arrival > last_service else "service"
+
+    first_arrival = ARRIVAL_WORDS.search(after)
+    first_service = SERVICE_WORDS.search(after)
+    if first_arrival and (not first_service or first_arrival.start() < first_service.start()):
+        return "arrival"
+    return "service" if first_service else None
+
+
+def extract_rates(question: str) -> Tuple[Dict[str, List[Rate]], Tuple[float, ...]]:
+    """
+    Taxas de chegada e de atendimento citadas no enunciado, por minuto, e os demais números
+    "chega 1 avião a cada 3 minutos", "aviões chegam a cada 3 min" e "20 aviões por hora"
+    dão a mesma taxa de chegada; "o pouso leva 1 minuto" é atendimento de 1 por minuto
+    """
+    text = _strip_accents(question)
+    rates: Dict[str, List[Rate]] = {"arrival": [], "service": []}
+    used: List[Tuple[int, int]] = []
+
+    for pattern, fixed_role, form in RATE_PATTERNS:
+        for match in pattern.finditer(text):
+            if any(match.start() < end and start < match.end() for start, end in used):
+                continue
+            groups = match.groups()
+            unit = groups[-1]
+            minutes = TIME_UNITS[unit] if unit else None
+
+            if form == "interval":
+                value = _number(groups[0]) / (_number(groups[1]) * minutes)
+            elif form == "duration":
+                value = 1 / (_number(groups[0]) * minutes)
+            else:
+                value = _number(groups[0]) / (minutes or 1.0)
+            if value <= 0 or value == float("inf"):
+                continue
+
+            role = fixed_role or _role(text, match.start(), match.end())
+            if role is None:
+                continue
+            used.append(match.span())
+            rates[role].append((_rounded(value), "min" if minutes else ""))
+
+    others = tuple(sorted(
+        _rounded(_number(match.group()))
+        for match in NUMBER.finditer(text)
+        if not any(start <= match.start() < end for start, end in used)
+    ))
+    return rates, others
+
+
+def signature(question: str, lambda_rate: Optional[float] = None,
+              mu_rate: Optional[float] = None) -> Optional[Signature]:
+    """
+    O que precisa coincidir exatamente para reaproveitar uma resposta: taxas de chegada e de
+    atendimento normalizadas, os demais números (sem ordem) e as métricas pedidas
+    Se o texto não define uma única taxa de cada tipo, usa λ e μ extraídos pelo agente
+    (sem unidade) e todos os números do enunciado; sem eles devolve None
+    """
+    rates, others = extract_rates(question)
+    arrival, service = set(rates["arrival"]), set(rates["service"])
+    metrics = tuple(sorted(name for name, pattern in ASKED_METRICS.items() if pattern.search(question)))
+
+    if len(arrival) == 1 and len(service) == 1:
+        return arrival.pop(), service.pop(), others, metrics
+    if lambda_rate is None or mu_rate is None:
+        return None
+    numbers = tuple(sorted(_rounded(_number(number)) for number in NUMBER.findall(_strip_accents(question))))
+    return (_rounded(float(lambda_rate)), "?"), (_rounded(float(mu_rate)), "?"), numbers, metrics
+
+
+def embed(text: str) -> np.ndarray:
+    """Vetor normalizado de trigramas de caracteres, radicais e pares de palavras (hashing com sinal)"""
+    words = [word for word in WORD.findall(NUMBER.sub("#", _strip_accents(text))) if word not in STOPWORDS]
+
+    features = []
+    for word in words:
+        padded = f" {word} "
+        features.extend(padded[i:i + 3] for i in range(len(padded) - 2))
+        features.append("w:" + word[:5])
+    features.extend(f"b:{first[:5]}_{second[:5]}" for first, second in zip(words, words[1:]))
+
+    vector = np.zeros(EMBEDDING_DIM, dtype=np.float32)
+    for feature in features:
+        digest = zlib.crc32(feature.encode("utf-8"))
+        vector[digest % EMBEDDING_DIM] += 1.0 if digest & 0x80000000 else -1.0
+
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm else vector
+
+
+class SemanticCache:
+    """Respostas indexadas por assinatura exata e, dentro dela, por similaridade de cosseno"""
+
+    def __init__(self, threshold: float = SEMANTIC_CACHE_THRESHOLD, max_entries: int = SEMANTIC_CACHE_SIZE):
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self._vectors: Optional[np.ndarray] = None  # Alocada na primeira resposta guardada
+        self._signatures: List[Optional[Signature]] = [None] * max_entries
+        self._responses: List[Optional[str]] = [None] * max_entries
+        self._by_signature: Dict[Signature, List[int]] = {}
+        self._next = 0  # Próxima linha a gravar (buffer circular: a mais antiga sai primeiro)
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return sum(len(rows) for rows in self._by_signature.values())
+
+    def lookup(self, question: str, lambda_rate: Optional[float] = None,
+               mu_rate: Optional[float] = None) -> Optional[Tuple[str, float]]:
+        """Resposta de uma paráfrase já respondida e a similaridade, ou None"""
+        key = signature(question, lambda_rate, mu_rate)
+        if key is None:
+            return None
+        with self._lock:
+            rows = self._by_signature.get(key)
+            if not rows:
+                return None
+            similarities = self._vectors[rows] @ embed(question)
+            best = int(np.argmax(similarities))
+            if similarities[best] < self.threshold:
+                return None
+            return self._responses[rows[best]], float(similarities[best])
+
+    def add(self, question: str, lambda_rate: Optional[float], mu_rate: Optional[float], response: str):
+        """Guarda a resposta (só com as taxas definidas); com o cache cheio substitui a entrada mais antiga"""
+        key = signature(question, lambda_rate, mu_rate)
+        if key is None:
+            return
+        vector = embed(question)
+        with self._lock:
+            if self._vectors is None:
+                self._vectors = np.zeros((self.max_entries, EMBEDDING_DIM), dtype=np.float32)
+            row = self._next
+            old_key = self._signatures[row]
+            if old_key is not None:
+                self._by_signature[old_key].remove(row)
+                if not self._by_signature[old_key]:
+                    del self._by_signature[old_key]
+
+            self._vectors[row] = vector
+            self._signatures[row] = key
+            self._responses[row] = response
+            self._by_signature.setdefault(key, []).append(row)
+            self._next = (row + 1) % self.max_entries
+
+    def clear(self):
+        with self._lock:
+            self._signatures = [None] * self.max_entries
+            self._responses = [None] * self.max_entries
+            self._by_signature.clear()
+            self._next = 0
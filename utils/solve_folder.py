@@ -0,0 +1,362 @@
+"""
+Resolução offline de uma pasta de exercícios (fotos, PDFs e textos)
+
+Cada arquivo passa por OCR, separação dos exercícios, extração de λ/μ e cálculo em um
+pool de processos; o resultado de cada exercício vira um JSON em <saída>/<arquivo com extensão>/.
+Com --llm, o agente completo (IA) é chamado para os exercícios sem λ/μ (missing) ou
+para todos (all), com no máximo --llm-concurrency chamadas simultâneas.
+
+O progresso fica em <saída>/checkpoint.jsonl: ao rodar de novo, arquivos já concluídos
+(mesmo tamanho e data de modificação) são pulados e os que só faltavam a IA - inclusive
+de uma execução anterior sem --llm - não repetem o OCR.
+
+Uso:
+    python -m utils.solve_folder exercicios/ resolvidos/ --workers 4 --llm missing --llm-concurrency 2
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import threading
+import multiprocessing
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from typing import Any, Dict, List, Optional
+
+from utils import tracing
+from utils.exercise_batch import split_exercises, solve_exercises_locally
+
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".webp", ".bmp", ".tif", ".tiff")
+TEXT_EXTENSIONS = (".txt", ".md")
+PDF_EXTENSIONS = (".pdf",)
+
+CHECKPOINT_NAME = "checkpoint.jsonl"
+
+logger = tracing.get_logger("solve_folder")
+
+
+def discover(root: str) -> List[str]:
+    """Arquivos de exercício da pasta (recursivo), em ordem estável"""
+    extensions = IMAGE_EXTENSIONS + TEXT_EXTENSIONS + PDF_EXTENSIONS
+    found = []
+    for directory, subdirectories, files in os.walk(root):
+        subdirectories.sort()
+        found.extend(
+            os.path.relpath(os.path.join(directory, name), root)
+            for name in sorted(files) if name.lower().endswith(extensions)
+        )
+    return found
+
+
+def fingerprint(path: str) -> str:
+    stat = os.stat(path)
+    return f"{stat.st_size}:{stat.st_mtime_ns}"
+
+
+def needs_ocr(relative_path: str) -> bool:
+    return relative_path.lower().endswith(IMAGE_EXTENSIONS + PDF_EXTENSIONS)
+
+
+# Estado do processo worker (o EasyOCR só é carregado se a pasta tiver imagens ou PDFs)
+_ocr_ready = False
+
+
+def _init_worker(with_ocr: bool, torch_threads: int):
+    global _ocr_ready
+    if with_ocr:
+        from utils.ocr_processor import _init_ocr_worker
+        _init_ocr_worker(torch_threads)
+        _ocr_ready = True
+
+
+def _read_text(path: str) -> Dict[str, Any]:
+    """Texto do arquivo (OCR para imagens e PDFs) e tempos das etapas"""
+    lowered = path.lower()
+    if lowered.endswith(TEXT_EXTENSIONS):
+        with open(path, encoding="utf-8", errors="replace") as f:
+            return {"text": f.read(), "timings": {}}
+
+    if not _ocr_ready:
+        raise RuntimeError("OCR não disponível (pip install easyocr)")
+
+    from PIL import Image
+    from utils import ocr_processor
+
+    if lowered.endswith(PDF_EXTENSIONS):
+        with open(path, "rb") as f:
+            data = f.read()
+        start = time.perf_counter()
+        name = os.path.basename(path)
+        page_count = ocr_processor.OCRProcessor.count_pages(data, name)
+        pages = ocr_processor._run_ocr_pages_job(data, name, list(range(page_count)))
+        return {"text": " ".join(page["clean_text"] for page in pages),
+                "timings": {"ocr": time.perf_counter() - start}, "pages": len(pages)}
+
+    with Image.open(path) as image:
+        _, clean_text = ocr_processor._worker_processor.process_exercise_image(image.convert("RGB"))
+    return {"text": clean_text, "timings": dict(ocr_processor._worker_processor.last_timings)}
+
+
+def _solve_file_job(path: str) -> Dict[str, Any]:
+    """OCR, separação, extração e cálculo de um arquivo (no processo worker)"""
+    start = time.perf_counter()
+    read = _read_text(path)
+    exercises = split_exercises(read["text"])
+    solutions = solve_exercises_locally(exercises)
+    return {
+        "solutions": solutions,
+        "timings": {**read["timings"], "total": time.perf_counter() - start},
+        "pages": read.get("pages")
+    }
+
+
+class Checkpoint:
+    """Linhas {source, fingerprint, stage} - a última linha de cada arquivo vale"""
+
+    def __init__(self, output_dir: str):
+        self.path = os.path.join(output_dir, CHECKPOINT_NAME)
+        self.entries: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        if os.path.exists(self.path):
+            with open(self.path, encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except json.JSONDecodeError:
+                        continue  # Linha cortada por uma interrupção
+                    self.entries[entry["source"]] = entry
+
+    def stage(self, source: str, current_fingerprint: str) -> Optional[str]:
+        entry = self.entries.get(source)
+        if entry and entry["fingerprint"] == current_fingerprint:
+            return entry["stage"]
+        return None
+
+    def mark(self, source: str, current_fingerprint: str, stage: str, exercises: int):
+        entry = {"source": source, "fingerprint": current_fingerprint, "stage": stage, "exercises": exercises}
+        with self._lock:
+            self.entries[source] = entry
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+
+
+class FolderSolver:
+    """Resolve os arquivos de uma pasta com pool de processos e IA com concorrência limitada"""
+
+    def __init__(self, input_dir: str, output_dir: str, workers: Optional[int] = None,
+                 llm_mode: str = "off", llm_concurrency: int = 2, torch_threads: int = 1):
+        self.input_dir = input_dir
+        self.output_dir = output_dir
+        self.workers = workers or max(1, (os.cpu_count() or 2) - 1)
+        self.llm_mode = llm_mode
+        self.llm_concurrency = llm_concurrency
+        self.torch_threads = torch_threads
+        self.checkpoint = Checkpoint(output_dir) if os.path.isdir(output_dir) else None
+        self.stats = {"files": 0, "skipped": 0, "failed": 0, "exercises": 0, "llm_calls": 0}
+        self._agent = None
+        self._agent_lock = threading.Lock()
+
+    def exercise_dir(self, source: str) -> str:
+        # Com a extensão: lista.jpg e lista.pdf (ou ex.txt e ex.md) não dividem a pasta
+        return os.path.join(self.output_dir, source)
+
+    def clear_exercises(self, source: str):
+        """Apaga os JSONs de uma resolução anterior (o arquivo mudou e pode ter menos exercícios)"""
+        directory = self.exercise_dir(source)
+        if not os.path.isdir(directory):
+            return
+        for name in os.listdir(directory):
+            if name.startswith("exercicio_") and name.endswith((".json", ".json.tmp")):
+                os.remove(os.path.join(directory, name))
+
+    def exercise_path(self, source: str, index: int) -> str:
+        return os.path.join(self.exercise_dir(source), f"exercicio_{index:02d}.json")
+
+    def write_exercise(self, record: Dict[str, Any]):
+        """Grava o JSON do exercício de forma atômica"""
+        path = self.exercise_path(record["source"], record["index"])
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        temp_path = f"{path}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump(record, f, ensure_ascii=False, indent=2, default=str)
+        os.replace(temp_path, path)
+
+    def load_exercises(self, source: str, count: int) -> List[Dict[str, Any]]:
+        records = []
+        for index in range(1, count + 1):
+            with open(self.exercise_path(source, index), encoding="utf-8") as f:
+                records.append(json.load(f))
+        return records
+
+    def wants_llm(self, record: Dict[str, Any]) -> bool:
+        if record.get("answer") is not None:
+            return False
+        return self.llm_mode == "all" or (self.llm_mode == "missing" and record["results"] is None)
+
+    def solve_with_llm(self, record: Dict[str, Any]) -> Dict[str, Any]:
+        """Resposta completa do agente (roda em uma das llm_concurrency threads)"""
+        with self._agent_lock:
+            if self._agent is None:
+                from agents.bosquinho_agent import BosquinhoAgent
+                self._agent = BosquinhoAgent()
+
+        start = time.perf_counter()
+        result = self._agent.process_message([{"role": "user", "content": record["text"]}])
+        last = result["messages"][-1]
+        record["answer"] = last.get("content", "") if isinstance(last, dict) else str(getattr(last, "content", last))
+        record["answer_route"] = (result.get("calculation_result") or {}).get("type", "fallback")
+        record["timings"]["llm"] = time.perf_counter() - start
+        self.write_exercise(record)
+        return record
+
+    def _records(self, source: str, job: Dict[str, Any]) -> List[Dict[str, Any]]:
+        return [
+            {
+                "source": source,
+                "index": solution["index"],
+                "text": solution["text"],
+                "lambda": solution["lambda"],
+                "mu": solution["mu"],
+                "results": solution["results"],
+                "error": solution["error"],
+                "answer": None,
+                "timings": dict(job["timings"])
+            }
+            for solution in job["solutions"]
+        ]
+
+    def run(self) -> Dict[str, int]:
+        os.makedirs(self.output_dir, exist_ok=True)
+        self.checkpoint = self.checkpoint or Checkpoint(self.output_dir)
+
+        sources = discover(self.input_dir)
+        to_solve, llm_only = [], []
+        for source in sources:
+            stage = self.checkpoint.stage(source, fingerprint(os.path.join(self.input_dir, source)))
+            if stage == "done":
+                self.stats["skipped"] += 1
+            elif stage == "local" and self.llm_mode != "off":
+                llm_only.append(source)
+            elif stage == "local":
+                self.stats["skipped"] += 1
+            else:
+                to_solve.append(source)
+
+        with_ocr = any(needs_ocr(source) for source in to_solve)
+        if with_ocr:
+            from utils.ocr_processor import OCRWorkerService
+            if not OCRWorkerService.is_available():
+                logger.warning("EasyOCR não instalado: imagens e PDFs serão marcados como falha")
+                with_ocr = False
+
+        print(f"📂 {len(sources)} arquivo(s): {len(to_solve)} para resolver, {len(llm_only)} só com IA pendente, "
+              f"{self.stats['skipped']} já concluído(s)", file=sys.stderr)
+
+        llm_pool = ThreadPoolExecutor(max_workers=self.llm_concurrency, thread_name_prefix="llm") \
+            if self.llm_mode != "off" else None
+        # Arquivo -> chamadas de IA ainda em andamento (o checkpoint "done" espera todas)
+        llm_pending: Dict[str, List[Future]] = {}
+        file_records: Dict[str, int] = {}
+
+        def schedule_llm(source: str, records: List[Dict[str, Any]]):
+            futures = [llm_pool.submit(self.solve_with_llm, record) for record in records if self.wants_llm(record)]
+            self.stats["llm_calls"] += len(futures)
+            if futures:
+                llm_pending[source] = futures
+            else:
+                self.checkpoint.mark(source, fingerprint(os.path.join(self.input_dir, source)), "done", len(records))
+
+        def finish_llm(done_only: bool):
+            for source, futures in list(llm_pending.items()):
+                if done_only and not all(future.done() for future in futures):
+                    continue
+                failed = [future.exception() for future in futures if future.exception() is not None]
+                if failed:
+                    logger.warning("IA falhou em %d exercício(s) de %s: %s", len(failed), source, failed[0])
+                else:
+                    self.checkpoint.mark(source, fingerprint(os.path.join(self.input_dir, source)),
+                                         "done", file_records[source])
+                del llm_pending[source]
+
+        executor = ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(with_ocr, self.torch_threads)
+        )
+        try:
+            for source in llm_only:
+                entry = self.checkpoint.entries[source]
+                records = self.load_exercises(source, entry["exercises"])
+                file_records[source] = len(records)
+                schedule_llm(source, records)
+
+            futures = {executor.submit(_solve_file_job, os.path.join(self.input_dir, source)): source
+                       for source in to_solve}
+            while futures:
+                done, _ = wait(futures, timeout=1.0, return_when=FIRST_COMPLETED)
+                for future in done:
+                    source = futures.pop(future)
+                    self.stats["files"] += 1
+                    try:
+                        job = future.result()
+                    except Exception as e:
+                        self.stats["failed"] += 1
+                        print(f"❌ {source}: {e}", file=sys.stderr)
+                        continue
+
+                    records = self._records(source, job)
+                    self.clear_exercises(source)
+                    for record in records:
+                        self.write_exercise(record)
+                    self.stats["exercises"] += len(records)
+                    file_records[source] = len(records)
+                    self.checkpoint.mark(source, fingerprint(os.path.join(self.input_dir, source)),
+                                         "local", len(records))
+                    print(f"✅ {source}: {len(records)} exercício(s) em {job['timings']['total']:.1f}s "
+                          f"[{self.stats['files']}/{len(to_solve)}]", file=sys.stderr)
+                    if llm_pool is not None:
+                        schedule_llm(source, records)
+                finish_llm(done_only=True)
+
+            if llm_pool is not None:
+                llm_pool.shutdown(wait=True)
+                finish_llm(done_only=False)
+        except KeyboardInterrupt:
+            print("⏸️ Interrompido - rode de novo para continuar do checkpoint", file=sys.stderr)
+            raise
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+            if llm_pool is not None:
+                llm_pool.shutdown(wait=False, cancel_futures=True)
+
+        return self.stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Resolve offline uma pasta de exercícios M/M/1")
+    parser.add_argument("input_dir", help="pasta com fotos, PDFs e arquivos .txt/.md")
+    parser.add_argument("output_dir", help="pasta dos JSONs por exercício e do checkpoint")
+    parser.add_argument("--workers", type=int, default=None, help="processos de OCR e cálculo")
+    parser.add_argument("--torch-threads", type=int, default=int(os.getenv("OCR_TORCH_THREADS", "1")))
+    parser.add_argument("--llm", choices=["off", "missing", "all"], default="off",
+                        help="IA para exercícios sem λ/μ (missing) ou para todos (all)")
+    parser.add_argument("--llm-concurrency", type=int, default=int(os.getenv("LLM_CONCURRENCY", "2")),
+                        help="chamadas simultâneas à IA")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    stats = FolderSolver(args.input_dir, args.output_dir, args.workers, args.llm,
+                         args.llm_concurrency, args.torch_threads).run()
+    print(f"🏁 {stats['files']} arquivo(s), {stats['exercises']} exercício(s), {stats['llm_calls']} chamada(s) à IA, "
+          f"{stats['failed']} falha(s), {stats['skipped']} pulado(s) em {time.perf_counter() - start:.1f}s",
+          file=sys.stderr)
+    if stats["failed"]:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -2,45 +2,58 @@
 Utilitários para a interface Streamlit
 """
 
+import io
+import os
+import time
+import uuid
+import logging
 import streamlit as st
+from typing import Dict, List, Optional
+from utils import tracing
+from utils.conversation_store import CONVERSATION_WINDOW, get_conversation_store
+from utils.image_store import load_thumbnail, store_image
+
+logger = tracing.get_logger("ui")
+
+# Intervalo entre consultas ao serviço de OCR (segundos)
+OCR_POLL_INTERVAL = float(os.getenv("OCR_POLL_INTERVAL", "0.5"))
 
 
 def clean_qwen_response(content: str) -> str:
-    """Remove as tags <think> do Qwen QwQ - VERSÃO STREAMLIT COM LOGS"""
-    print(f"🔍 DEBUG - Conteúdo original (primeiros 200 chars): {content[:200] if content else 'VAZIO'}")
+    """Remove as tags <think> do Qwen QwQ (logs apenas com LOG_LEVEL=DEBUG)"""
+    debug = logger.isEnabledFor(logging.DEBUG)
+    if debug:
+        logger.debug("🔍 Conteúdo original (primeiros 200 chars): %s", content[:200] if content else 'VAZIO')
 
     if not content:
-        print("❌ DEBUG - Conteúdo vazio!")
+        logger.debug("❌ Conteúdo vazio!")
         return "🌳 **Bosquinho aqui!** Como posso ajudá-lo?"
 
     original_length = len(content)
 
     # MÉTODO SIMPLES: se tem <think>, pega só o que vem DEPOIS de </think>
     if '<think>' in content:
-        print("🔍 DEBUG - Encontrou tags <think>")
         if '</think>' in content:
             # Pega tudo depois da última tag </think>
             parts = content.split('</think>')
             content = parts[-1] if len(parts) > 1 else content
-            print(f"🔍 DEBUG - Após remoção de <think>: {content[:100]}...")
         else:
             # Se tem <think> mas não tem </think>, remove tudo a partir de <think>
             content = content.split('<think>')[0]
-            print(f"🔍 DEBUG - Removeu <think> sem fechamento: {content[:100]}...")
-    else:
-        print("✅ DEBUG - Não tem tags <think>")
 
     # Limpa espaços
     content = content.strip()
 
-    print(f"🔍 DEBUG - Tamanho: {original_length} -> {len(content)}")
+    if debug:
+        logger.debug("🔍 Tamanho: %d -> %d", original_length, len(content))
 
     # Se ficou vazio, retorna resposta padrão
     if not content:
-        print("❌ DEBUG - Conteúdo ficou vazio após limpeza!")
+        logger.debug("❌ Conteúdo ficou vazio após limpeza!")
         return "🌳 **Bosquinho aqui!** Como posso ajudá-lo com Teoria das Filas M/M/1?"
 
-    print(f"✅ DEBUG - Conteúdo final: {content[:100]}...")
+    if debug:
+        logger.debug("✅ Conteúdo final: %s...", content[:100])
     return content
 
 
@@ -65,24 +78,18 @@ def setup_sidebar():
         st.markdown("---")
         st.markdown("### 💡 Exemplos Reais")
 
-        # Exemplos de aeroporto
-        with st.expander("🛩️ Aeroporto - Sistema de Pouso"):
-            st.markdown("""
-            **Exemplo 1:** λ=1/3, μ=1 (aviões/min)
-            - "Taxa de utilização da pista com λ=0.33 e μ=1"
-            - "Probabilidade de não mais que 3 aviões com λ=0.33 e μ=1"
-
-            **Exemplo 2:** λ=1, μ=3 (aviões/min)
-            - "Utilização do sistema com λ=1 e μ=3"
-            - "Probabilidade de 1 avião com λ=1 e μ=3"
-            """)
-
-        with st.expander("🏦 Outros Exemplos"):
-            st.markdown("""
-            **Banco:** λ=2, μ=3 (clientes/min)
-            **Drive-thru:** λ=1.5, μ=2 (carros/min)
-            **Geral:** λ=2, μ=3 (qualquer unidade)
-            """)
+        # Exemplos em destaque vêm do catálogo; o clique é servido da solução memorizada
+        from utils.examples import get_all_examples
+        from utils.exercise_catalog import get_catalog
+
+        for example in get_all_examples():
+            with st.expander(example["title"]):
+                st.markdown(f"**λ={example['lambda_rate']:.4g}, μ={example['mu_rate']:.4g}** ({example['unit']})")
+                st.markdown("\n".join(f"- {question}" for question in example["questions"]))
+                if st.button("⚡ Resolver", key=f"example_{example['id']}"):
+                    process_example(example["id"])
+
+        st.caption(f"📚 {len(get_catalog())} exercícios com solução verificada no catálogo")
 
         return None  # Não retorna mais a chave, pois está no .env
 
@@ -118,58 +125,142 @@ Posso ajudá-lo a calcular:
 
 def initialize_session_state():
     """Inicializa o estado da sessão Streamlit"""
+    if "thread_id" not in st.session_state:
+        # O id da conversa fica na URL (?conversa=...): ao reconectar, a conversa é retomada
+        st.session_state.thread_id = st.query_params.get("conversa") or uuid.uuid4().hex
+        st.query_params["conversa"] = st.session_state.thread_id
+
     if "messages" not in st.session_state:
+        # Só as mensagens recentes voltam do disco; as antigas ficam no histórico salvo
         st.session_state.messages = [
             {
                 "role": "assistant",
                 "content": display_welcome_message()
             }
-        ]
+        ] + get_conversation_store().load_messages(st.session_state.thread_id)
 
     if "milanesa_agent" not in st.session_state:
         from agents.bosquinho_agent import BosquinhoAgent
-        st.session_state.milanesa_agent = BosquinhoAgent()
+        st.session_state.milanesa_agent = BosquinhoAgent(checkpointer=get_conversation_store())
+
+
+def trim_session_messages():
+    """Mantém na sessão a boas-vindas e as últimas CONVERSATION_WINDOW mensagens (a cada rerun completo)"""
+    messages = st.session_state.messages
+    if len(messages) > CONVERSATION_WINDOW + 1:
+        st.session_state.messages = messages[:1] + messages[-CONVERSATION_WINDOW:]
+
+
+def remember_messages(*messages: Dict):
+    """Mensagens que não passam pelo agente (exemplos, listas): vão para o chat e para o histórico salvo"""
+    st.session_state.messages.extend(messages)
+    get_conversation_store().append_messages(st.session_state.thread_id, list(messages))
+
+
+def ask_agent(on_partial) -> Optional[str]:
+    """
+    Envia a última mensagem do chat ao agente e devolve o texto da resposta
+    O histórico da conversa vem do checkpointer (thread_id da sessão), não da sessão
+    """
+    message = {key: value for key, value in st.session_state.messages[-1].items() if key != "image_thumbnail"}
+    result = st.session_state.milanesa_agent.process_message(
+        [message],
+        on_partial=on_partial,
+        thread_id=st.session_state.thread_id
+    )
+    if not result.get("messages"):
+        return None
+
+    # Último cenário calculado vira o ponto de partida do explorador "e se...?"
+    calculation = result.get("calculation_result") or {}
+    if calculation.get("lambda") is not None and calculation.get("mu"):
+        st.session_state.what_if_base = {"lambda": float(calculation["lambda"]), "mu": float(calculation["mu"])}
+
+    assistant_message = result["messages"][-1]
+    if hasattr(assistant_message, 'content'):
+        # É um objeto AIMessage
+        return str(assistant_message.content)
+    # Já é um dict
+    return assistant_message.get("content", "")
+
+
+def format_stage_timings(timings: Dict[str, float]) -> str:
+    """Formata os tempos por etapa do OCR em milissegundos"""
+    total = sum(timings.values())
+    stages = " · ".join(f"{stage}: {seconds * 1000:.0f} ms" for stage, seconds in timings.items())
+    return f"{stages} (total: {total * 1000:.0f} ms)"
+
+
+def render_message(message: Dict):
+    """Desenha uma mensagem do chat"""
+    with st.chat_message(message["role"]):
+        # Se a mensagem tem imagem, mostra a miniatura primeiro (a original fica no disco)
+        if message.get("image_hash"):
+            thumbnail = message.get("image_thumbnail") or load_thumbnail(message["image_hash"])
+            if thumbnail:
+                st.image(thumbnail, caption="📸 Exercício enviado")
+
+        # Tempo de cada etapa do OCR (pré-processamento, leitura, limpeza)
+        if message.get("ocr_timings"):
+            st.caption("⏱️ " + format_stage_timings(message["ocr_timings"]))
+
+        # Números que o OCR leu com baixa confiança
+        uncertain = message.get("ocr", {}).get("low_confidence_numbers")
+        if uncertain:
+            readings = ", ".join(f"`{item['text']}` ({item['confidence']:.0%})" for item in uncertain)
+            st.caption(f"⚠️ Números com leitura incerta: {readings}")
+
+        st.markdown(message["content"])
 
 
 def display_chat_messages():
-    """Exibe as mensagens do chat"""
+    """
+    Exibe o histórico (só nos reruns completos)
+    As mensagens seguintes são desenhadas por chat_fragment, que reexecuta sozinho a cada
+    pergunta: o histórico já desenhado, a sidebar e o CSS ficam como estão
+    """
+    trim_session_messages()
+    st.session_state.rendered_messages = len(st.session_state.messages)
     for message in st.session_state.messages:
-        with st.chat_message(message["role"]):
-            # Se a mensagem tem imagem, mostra ela primeiro
-            if "image" in message:
-                st.image(message["image"], caption="📸 Exercício enviado", use_column_width=True)
+        render_message(message)
 
-            st.markdown(message["content"])
 
-    # Processa resposta de imagem se necessário
-    if hasattr(st.session_state, 'process_image_response') and st.session_state.process_image_response:
+@st.fragment
+def chat_fragment():
+    """Turnos novos do chat: reexecuta só este trecho a cada pergunta"""
+    new_messages = st.session_state.messages[st.session_state.get("rendered_messages", 0):]
+    if len(new_messages) > CONVERSATION_WINDOW:
+        # Muitos turnos desde o último rerun completo: um rerun completo apara o histórico
+        st.rerun()
+    for message in new_messages:
+        render_message(message)
+
+    # Pergunta vinda de imagem: o OCR terminou e a mensagem do usuário já está no chat
+    if st.session_state.get("process_image_response"):
         st.session_state.process_image_response = False
+        respond_to_image()
 
-        with st.chat_message("assistant"):
-            with st.spinner("🍖 Milanesa está analisando a imagem..."):
-                try:
-                    result = st.session_state.milanesa_agent.process_message(
-                        st.session_state.messages.copy()
-                    )
+    if prompt := st.chat_input("🍖 Pergunte ao Milanesa sobre M/M/1 ou envie uma foto 📸"):
+        process_user_input(prompt)
 
-                    if result.get("messages") and len(result["messages"]) > len(st.session_state.messages):
-                        assistant_message = result["messages"][-1]
 
-                        if hasattr(assistant_message, 'content'):
-                            content = str(assistant_message.content)
-                        else:
-                            content = assistant_message.get("content", "")
+def respond_to_image():
+    """Responde a pergunta extraída da imagem (a última mensagem do chat)"""
+    with st.chat_message("assistant"):
+        # Tabela local aparece aqui assim que calculada; a explicação da IA a substitui completa
+        answer = st.empty()
+        with st.spinner("🍖 Milanesa está analisando a imagem..."):
+            try:
+                content = ask_agent(answer.markdown)
 
-                        message_dict = {"role": "assistant", "content": content}
-                        st.session_state.messages.append(message_dict)
-                        st.markdown(content)
-                        st.rerun()
+                if content is not None:
+                    st.session_state.messages.append({"role": "assistant", "content": content})
+                    answer.markdown(content)
 
-                except Exception as e:
-                    error_msg = f"❌ Erro ao processar imagem: {str(e)}"
-                    st.session_state.messages.append({"role": "assistant", "content": error_msg})
-                    st.markdown(error_msg)
-                    st.rerun()
+            except Exception as e:
+                error_msg = f"❌ Erro ao processar imagem: {str(e)}"
+                st.session_state.messages.append({"role": "assistant", "content": error_msg})
+                st.markdown(error_msg)
 
 
 def process_user_input(prompt: str):
@@ -182,32 +273,16 @@ def process_user_input(prompt: str):
 
     # Processa com o agente Bosquinho
     with st.chat_message("assistant"):
+        # Tabela local aparece aqui assim que calculada; a explicação da IA a substitui completa
+        answer = st.empty()
         with st.spinner("🍖 Milanesa está calculando..."):
             try:
-                # Executa o agente
-                result = st.session_state.milanesa_agent.process_message(
-                    st.session_state.messages.copy()
-                )
-
-                # Obtém a última mensagem (resposta do assistente)
-                if result.get("messages") and len(result["messages"]) > len(st.session_state.messages):
-                    assistant_message = result["messages"][-1]
-
-                    # Converte para dict se necessário
-                    if hasattr(assistant_message, 'content'):
-                        # É um objeto AIMessage
-                        content = str(assistant_message.content)
-                    else:
-                        # Já é um dict
-                        content = assistant_message.get("content", "")
-
-                    message_dict = {
-                        "role": "assistant",
-                        "content": content
-                    }
-
-                    st.session_state.messages.append(message_dict)
-                    st.markdown(content)
+                # Executa o agente (pergunta e resposta ficam salvas na conversa)
+                content = ask_agent(answer.markdown)
+
+                if content is not None:
+                    st.session_state.messages.append({"role": "assistant", "content": content})
+                    answer.markdown(content)
                 else:
                     # Fallback se algo der errado
                     fallback_msg = "Desculpe, houve um problema. Tente novamente com uma pergunta mais específica."
@@ -220,11 +295,28 @@ def process_user_input(prompt: str):
                 st.markdown(error_msg)
 
 
+def process_example(example_key: str):
+    """Resolve um exemplo do catálogo com a solução e a explicação memorizadas"""
+    from utils.examples import get_example, explain_example
+
+    initialize_session_state()
+    example = get_example(example_key)
+
+    with tracing.span("ui.example", example=example_key):
+        with st.spinner("🍖 Milanesa está preparando o exemplo..."):
+            explanation = explain_example(example_key)
+
+    remember_messages(
+        {"role": "user", "content": f"Resolva o exemplo: {example['title']}"},
+        {"role": "assistant", "content": explanation}
+    )
+
+
 def process_image_upload(uploaded_file):
-    """Processa upload de imagem e extrai texto"""
+    """Processa upload de imagem e agenda a extração de texto no serviço de OCR"""
     try:
         from PIL import Image
-        from utils.ocr_processor import get_ocr_processor
+        from utils.ocr_processor import get_ocr_service
 
         # Verifica se já processou esta imagem (evita loop)
         if hasattr(st.session_state, 'last_processed_image') and st.session_state.last_processed_image == uploaded_file.name:
@@ -233,22 +325,83 @@ def process_image_upload(uploaded_file):
         # Marca como processada
         st.session_state.last_processed_image = uploaded_file.name
 
-        # Carrega a imagem
-        image = Image.open(uploaded_file)
+        # Carrega a imagem; no chat fica só a miniatura e o hash, a original vai para o disco
+        data = uploaded_file.getvalue()
+        image = Image.open(io.BytesIO(data))
+        image.load()
 
-        # Processa com OCR
-        ocr_processor = get_ocr_processor()
+        # Processa com OCR fora da thread do Streamlit
+        ocr_service = get_ocr_service()
 
-        if ocr_processor.reader is None:
+        if not ocr_service.is_available():
             st.error("❌ OCR não disponível. Instale: pip install easyocr")
             return
 
-        # Extrai texto
-        raw_text, clean_text = ocr_processor.process_exercise_image(image)
+        st.session_state.ocr_job = {
+            "future": ocr_service.submit(image),
+            **store_image(data, image),
+            "submitted_at": time.time()
+        }
+
+    except Exception as e:
+        st.error(f"❌ Erro ao processar imagem: {str(e)}")
+
+
+def notify(kind: str, text: str):
+    """Aviso do OCR mostrado no próximo rerun completo (o fragmento de progresso se apaga)"""
+    st.session_state.setdefault("ocr_notices", []).append((kind, text))
+
+
+def show_ocr_notices():
+    """Mostra e descarta os avisos deixados pelo OCR"""
+    for kind, text in st.session_state.pop("ocr_notices", []):
+        getattr(st, kind)(text)
+
+
+def has_pending_ocr() -> bool:
+    return bool(st.session_state.get("ocr_job") or st.session_state.get("ocr_batch"))
+
+
+@st.fragment(run_every=OCR_POLL_INTERVAL)
+def ocr_progress_fragment():
+    """
+    Acompanha o OCR reexecutando só este trecho a cada OCR_POLL_INTERVAL
+    Só é chamado enquanto há OCR pendente; ao terminar, um rerun completo leva o resultado ao chat
+    """
+    poll_ocr_job()
+    poll_ocr_batch()
+
+
+def poll_ocr_job():
+    """Consulta o OCR em andamento sem bloquear a sessão"""
+    job = st.session_state.get("ocr_job")
+    if not job:
+        return
+
+    future = job["future"]
+
+    if not future.done():
+        elapsed = time.time() - job["submitted_at"]
+        st.info(f"🔍 Extraindo texto da imagem... ({elapsed:.0f}s)")
+        return
+
+    del st.session_state.ocr_job
+
+    try:
+        from utils.ocr_processor import OCRProcessor
+
+        ocr_result = future.result()
+        clean_text = ocr_result["clean_text"]
+
+        # Spans por etapa do OCR (medidas no processo worker)
+        for stage, seconds in ocr_result.get("timings", {}).items():
+            tracing.record_span(f"ocr.{stage}", seconds)
+        tracing.record_span("ocr.job", time.time() - job["submitted_at"])
+        layout = ocr_result.get("layout") or {}
 
         # Valida se é conteúdo M/M/1
-        if not ocr_processor.validate_mm1_content(clean_text):
-            st.warning("⚠️ Não detectei conteúdo de Teoria das Filas. Verifique se a imagem está clara.")
+        if not OCRProcessor.validate_mm1_content(clean_text):
+            notify("warning", "⚠️ Não detectei conteúdo de Teoria das Filas. Verifique se a imagem está clara.")
 
         # Processa como pergunta normal se extraiu texto
         if clean_text.strip():
@@ -259,24 +412,233 @@ def process_image_upload(uploaded_file):
             st.session_state.messages.append({
                 "role": "user",
                 "content": prompt,
-                "image": image  # Adiciona a imagem para mostrar no chat
+                "image_hash": job["image_hash"],  # Original no disco (utils/image_store)
+                "image_thumbnail": job["image_thumbnail"],  # Miniatura JPEG mostrada no chat
+                "ocr_timings": ocr_result.get("timings", {}),
+                "ocr": {
+                    "confidence": layout.get("confidence", 0.0),
+                    "low_confidence_numbers": layout.get("low_confidence_numbers", [])
+                }
             })
 
-            # Marca que precisa processar a resposta
+            # Marca que precisa processar a resposta (o chat_fragment responde)
             st.session_state.process_image_response = True
 
-            # Força atualização da interface para mostrar no chat central
+        else:
+            notify("error", "❌ Não consegui extrair texto da imagem. Tente uma imagem mais clara.")
+
+    except Exception as e:
+        notify("error", f"❌ Erro ao processar imagem: {str(e)}")
+
+    # Um único rerun completo mostra a pergunta no chat e encerra o acompanhamento
+    st.rerun()
+
+
+def process_uploads(uploaded_files):
+    """Encaminha os arquivos enviados: uma imagem vai para o chat, listas e PDFs para o lote"""
+    if not uploaded_files:
+        return
+
+    if len(uploaded_files) == 1 and not uploaded_files[0].name.lower().endswith(".pdf"):
+        process_image_upload(uploaded_files[0])
+    else:
+        process_batch_upload(uploaded_files)
+
+
+def process_batch_upload(uploaded_files):
+    """Agenda o OCR em lote de várias imagens e/ou PDFs"""
+    try:
+        from utils.ocr_processor import get_ocr_service
+
+        # Verifica se já processou este conjunto de arquivos (evita loop)
+        batch_key = tuple(f.name for f in uploaded_files)
+        if st.session_state.get("last_processed_batch") == batch_key:
+            return
+
+        st.session_state.last_processed_batch = batch_key
+
+        ocr_service = get_ocr_service()
+
+        if not ocr_service.is_available():
+            st.error("❌ OCR não disponível. Instale: pip install easyocr")
+            return
+
+        futures = []
+        for uploaded_file in uploaded_files:
+            futures.extend(ocr_service.submit_document(uploaded_file.getvalue(), uploaded_file.name))
+
+        st.session_state.ocr_batch = {
+            "futures": futures,
+            "files": list(batch_key),
+            "submitted_at": time.time()
+        }
+
+    except ImportError:
+        st.error("❌ Leitura de PDF não disponível. Instale: pip install pypdfium2")
+    except Exception as e:
+        st.error(f"❌ Erro ao processar arquivos: {str(e)}")
+
+
+def poll_ocr_batch():
+    """Mostra as páginas conforme são lidas e resolve a lista quando o lote termina"""
+    batch = st.session_state.get("ocr_batch")
+    if not batch:
+        return
+
+    # Páginas concluídas, em ordem (o lote segue a ordem dos arquivos e páginas)
+    pages = []
+    for future in batch["futures"]:
+        if not future.done():
+            break
+        if future.exception() is None:
+            pages.extend(future.result())
+
+    finished = all(future.done() for future in batch["futures"])
+
+    if not finished:
+        elapsed = time.time() - batch["submitted_at"]
+        st.info(f"📄 Lendo a lista de exercícios... {len(pages)} página(s) prontas ({elapsed:.0f}s)")
+        for page in pages:
+            with st.expander(f"📄 {page['source']} · página {page['page'] + 1}"):
+                st.text(page["clean_text"])
+        return
+
+    del st.session_state.ocr_batch
+
+    try:
+        from utils.exercise_batch import split_exercises, solve_exercises_locally, format_batch_summary
+
+        failed = sum(1 for future in batch["futures"] if future.exception() is not None)
+        if failed:
+            notify("warning", f"⚠️ {failed} bloco(s) de páginas não puderam ser lidos.")
+
+        # Um exercício pode continuar na página seguinte do mesmo arquivo
+        texts_by_source: Dict[str, List[str]] = {}
+        for page in pages:
+            texts_by_source.setdefault(page["source"], []).append(page["clean_text"])
+
+        exercises = []
+        for texts in texts_by_source.values():
+            exercises.extend(split_exercises(" ".join(texts)))
+
+        if not exercises:
+            notify("error", "❌ Não consegui extrair texto dos arquivos. Tente imagens mais claras.")
             st.rerun()
 
-        else:
-            st.error("❌ Não consegui extrair texto da imagem. Tente uma imagem mais clara.")
+        solutions = solve_exercises_locally(exercises)
+
+        remember_messages(
+            {
+                "role": "user",
+                "content": f"📄 **Lista de exercícios:** {', '.join(batch['files'])} "
+                           f"({len(pages)} página(s), {len(exercises)} exercício(s))"
+            },
+            {
+                "role": "assistant",
+                "content": format_batch_summary(solutions)
+            }
+        )
 
     except Exception as e:
-        st.error(f"❌ Erro ao processar imagem: {str(e)}")
+        notify("error", f"❌ Erro ao resolver a lista: {str(e)}")
+
+    # Um único rerun completo mostra a lista resolvida e encerra o acompanhamento
+    st.rerun()
+
+
+@st.cache_data(max_entries=32, show_spinner=False)
+def what_if_grid(mu_rate: float, servers: int):
+    """Grade do explorador memorizada por (μ, c): mover o λ reaproveita a mesma grade"""
+    from utils.what_if import build_grid
+    return build_grid(mu_rate, servers)
+
+
+@st.fragment
+def what_if_fragment():
+    """
+    Explorador "e se...?": sliders de λ, μ e c com as métricas na hora, sem chamar a IA
+    Só este trecho reexecuta ao mover um slider; as curvas vêm da grade memorizada
+    """
+    import altair as alt
+    from utils.what_if import CHART_METRICS, point_metrics, window
+
+    base = st.session_state.get("what_if_base") or {"lambda": 2.0, "mu": 3.0}
+    lambda_rate = st.slider("λ (chegadas)", 0.0, float(max(10.0, 3 * base["lambda"])), base["lambda"], 0.05)
+    mu_rate = st.slider("μ (atendimentos por servidor)", 0.05, float(max(10.0, 3 * base["mu"])), base["mu"], 0.05)
+    servers = st.slider("c (servidores)", 1, 10, 1)
+
+    current = point_metrics(lambda_rate, mu_rate, servers)
+    if "error" in current:
+        st.warning(f"⚠️ {current['error']}")
+    else:
+        reference = point_metrics(base["lambda"], base["mu"])
+        columns = st.columns(3)
+        for column, metric in zip(columns, CHART_METRICS):
+            delta = current[metric] - reference[metric] if "error" not in reference else None
+            column.metric(metric, f"{current[metric]:.3g}",
+                          delta=f"{delta:+.3g}" if delta is not None else None, delta_color="inverse")
+
+    data = window(what_if_grid(mu_rate, servers), lambda_rate).melt(
+        id_vars="lambda", value_vars=CHART_METRICS, var_name="métrica", value_name="valor"
+    )
+    lines = alt.Chart().mark_line().encode(
+        x=alt.X("lambda:Q", title="λ"),
+        y=alt.Y("valor:Q", title=None),
+        color=alt.Color("métrica:N", legend=None)
+    )
+    marker = alt.Chart().mark_rule(strokeDash=[4, 4]).encode(x=alt.datum(lambda_rate))
+    chart = alt.layer(lines, marker, data=data).properties(height=90).facet(
+        row=alt.Row("métrica:N", title=None)
+    ).resolve_scale(y="independent")
+    st.altair_chart(chart, width="stretch")
+    st.caption(f"Ponto de partida: λ={base['lambda']:.4g}, μ={base['mu']:.4g} (último cálculo do chat)")
+
+
+def process_sweep_upload(uploaded_file, output_format: str):
+    """
+    Varre um arquivo de cenários (CSV/Parquet) bloco a bloco e oferece o resultado para download
+    O resultado vai para um arquivo temporário; a mesma combinação de arquivo e formato não é refeita
+    """
+    import tempfile
+    from utils.sweep import file_format, iter_sweep
+
+    sweep_key = (uploaded_file.name, uploaded_file.size, output_format)
+    result = st.session_state.get("sweep_result")
+
+    if not result or result["key"] != sweep_key:
+        counts = {"rows": 0, "errors": 0}
+        progress = st.empty()
+        try:
+            with tempfile.NamedTemporaryFile(suffix=f".{output_format}", delete=False) as output:
+                for data in iter_sweep(uploaded_file, file_format(uploaded_file.name), output_format, counts=counts):
+                    output.write(data)
+                    progress.caption(f"📊 {counts['rows']} cenários calculados...")
+        except Exception as e:
+            progress.empty()
+            st.error(f"❌ Não consegui ler os cenários: {str(e)}")
+            return
+        progress.empty()
+
+        if result and os.path.exists(result["path"]):
+            os.remove(result["path"])
+        result = st.session_state.sweep_result = {"key": sweep_key, "path": output.name, **counts}
+
+    st.success(f"✅ {result['rows']} cenários ({result['errors']} inválidos ou instáveis)")
+    with open(result["path"], "rb") as f:
+        st.download_button(
+            f"⬇️ Baixar resultados (.{output_format})",
+            data=f,
+            file_name=f"{os.path.splitext(uploaded_file.name)[0]}_resultados.{output_format}",
+            mime="text/csv" if output_format == "csv" else "application/vnd.apache.parquet"
+        )
 
 
 def clear_conversation():
     """Limpa a conversa mantendo apenas a mensagem de boas-vindas"""
     if st.button("🗑️ Limpar Conversa"):
+        # Apaga a conversa salva e começa outra com um novo id
+        get_conversation_store().delete_thread(st.session_state.thread_id)
+        st.session_state.thread_id = uuid.uuid4().hex
+        st.query_params["conversa"] = st.session_state.thread_id
         st.session_state.messages = [st.session_state.messages[0]]
         st.rerun()
@@ -0,0 +1,300 @@
+"""
+Varredura em lote de cenários de fila (CSV/Parquet -> CSV/Parquet)
+
+Cada linha é um cenário (λ, μ e, opcionalmente, n, k e c servidores). O arquivo é lido
+em blocos de SWEEP_CHUNK_ROWS linhas, as métricas de cada bloco são calculadas de uma
+vez com NumPy e o bloco é gravado antes de o próximo ser lido - nem a entrada nem a
+saída inteiras ficam em memória.
+
+Sem a coluna c (ou com c = 1) os resultados são os do MM1Calculator; com c > 1 valem
+as fórmulas de M/M/c (Erlang C), calculadas em escala logarítmica para c grande.
+Cenários inválidos ou instáveis ficam com as métricas vazias e a mensagem em "error".
+Colunas que não são parâmetros passam adiante como texto.
+
+Uso:
+    python -m utils.sweep cenarios.csv resultados.parquet --chunk-rows 100000
+"""
+
+import os
+import sys
+import math
+import argparse
+from typing import IO, Dict, Iterator, Optional, Union
+
+import numpy as np
+import pandas as pd
+
+
+SWEEP_CHUNK_ROWS = int(os.getenv("SWEEP_CHUNK_ROWS", "50000"))
+# Maior número de servidores aceito (o somatório de Erlang C percorre servidor a servidor)
+SWEEP_MAX_SERVERS = int(os.getenv("SWEEP_MAX_SERVERS", "1000"))
+
+# n e k viram int64 nos cálculos
+MAX_INDEX = float(2 ** 63)
+
+# Nomes aceitos para cada coluna de entrada
+COLUMN_ALIASES = {
+    "lambda": ("lambda", "lambda_rate", "λ", "arrival_rate"),
+    "mu": ("mu", "mu_rate", "μ", "service_rate"),
+    "n": ("n",),
+    "k": ("k",),
+    "c": ("c", "servers")
+}
+
+METRIC_COLUMNS = ["rho", "L", "Lq", "W", "Wq", "P0"]
+
+UNSTABLE = "Sistema instável (ρ ≥ 1). O sistema não pode processar a demanda."
+
+Source = Union[str, IO[bytes]]
+
+
+def _log_factorials(max_value: int) -> np.ndarray:
+    return np.array([math.lgamma(i + 1) for i in range(max_value + 1)])
+
+
+def _column(chunk: pd.DataFrame, name: str, required: bool = False) -> Optional[np.ndarray]:
+    for alias in COLUMN_ALIASES[name]:
+        if alias in chunk.columns:
+            return pd.to_numeric(chunk[alias], errors="coerce").to_numpy(dtype=float)
+    if required:
+        raise ValueError(f"Coluna obrigatória ausente: {name} (aceita {', '.join(COLUMN_ALIASES[name])})")
+    return None
+
+
+def compute_metrics(lambda_rate: np.ndarray, mu_rate: np.ndarray, n: Optional[np.ndarray] = None,
+                    k: Optional[np.ndarray] = None, c: Optional[np.ndarray] = None) -> Dict[str, np.ndarray]:
+    """
+    Métricas de todos os cenários de uma vez (arrays do mesmo tamanho)
+    Devolve colunas rho, L, Lq, W, Wq, P0 (+ Pn, P_greater_k) e error ("" quando válido)
+    """
+    lam = np.asarray(lambda_rate, dtype=float)
+    mu = np.asarray(mu_rate, dtype=float)
+    rows = lam.shape[0]
+    servers = np.ones(rows) if c is None else np.asarray(c, dtype=float)
+
+    error = np.full(rows, "", dtype=object)
+    error[np.isnan(lam) | np.isnan(mu)] = "λ e μ precisam ser números"
+    error[(error == "") & ~(np.isfinite(lam) & np.isfinite(mu))] = "λ e μ precisam ser finitos"
+    error[(error == "") & (lam < 0)] = "Taxa de chegada (λ) deve ser não-negativa"
+    error[(error == "") & (mu <= 0)] = "Taxa de atendimento (μ) deve ser positiva"
+    error[(error == "") & ~((servers >= 1) & (servers == np.floor(servers)))] = "Número de servidores (c) deve ser inteiro ≥ 1"
+    error[(error == "") & (servers > SWEEP_MAX_SERVERS)] = f"Número de servidores (c) deve ser no máximo {SWEEP_MAX_SERVERS}"
+    for name, values in (("n", n), ("k", k)):
+        if values is not None:
+            values = np.asarray(values, dtype=float)
+            invalid = ~np.isnan(values) & ((values < 0) | (values != np.floor(values)) | np.isinf(values))
+            error[(error == "") & invalid] = f"Valor de {name} deve ser inteiro não-negativo"
+            error[(error == "") & (values >= MAX_INDEX)] = f"Valor de {name} grande demais (máximo 2^63 - 1)"
+
+    valid = error == ""
+    with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+        a = np.where(valid, lam / mu, np.nan)   # Carga oferecida (λ/μ)
+        s = np.where(valid, servers, 1).astype(np.int64)
+        rho = a / s
+
+    error[valid & (rho >= 1)] = UNSTABLE
+    stable = error == ""
+
+    metrics = {name: np.full(rows, np.nan) for name in METRIC_COLUMNS}
+    metrics["rho"] = np.where(valid, rho, np.nan)
+
+    if stable.any():
+        a_s, s_s, lam_s, mu_s, rho_s = a[stable], s[stable], lam[stable], mu[stable], rho[stable]
+        log_fact = _log_factorials(int(s_s.max()))
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            log_a = np.log(a_s)
+            log_rho = np.log(rho_s)
+
+            def log_term(i: np.ndarray) -> np.ndarray:
+                """log(aⁱ/i!) para i ≤ c, com a⁰ = 1 mesmo para λ = 0"""
+                return np.where(i == 0, 0.0, i * log_a) - log_fact[i]
+
+            def log_pn(values: np.ndarray) -> np.ndarray:
+                """log Pn: aⁿ/n!·P0 abaixo de c, aᶜ/c!·ρ^(n-c)·P0 a partir de c"""
+                return log_term(np.minimum(values, s_s)) \
+                    + np.where(values > s_s, (values - s_s) * log_rho, 0.0) + log_p0
+
+            # log Σ_{i<c} aⁱ/i! acumulado até o maior c do bloco (logsumexp incremental)
+            log_head = np.full(a_s.shape, -np.inf)
+            for i in range(int(s_s.max())):
+                log_head = np.where(i < s_s, np.logaddexp(log_head, log_term(np.full(a_s.shape, i))), log_head)
+
+            log_tail = log_term(s_s) - np.log1p(-rho_s)      # log aᶜ/(c!(1-ρ))
+            log_p0 = -np.logaddexp(log_head, log_tail)
+            wait_probability = np.exp(log_tail + log_p0)     # Erlang C: P(N ≥ c)
+
+            Lq = wait_probability * rho_s / (1 - rho_s)
+            Wq = np.where(lam_s > 0, Lq / lam_s, 0.0)
+            metrics["Lq"][stable] = Lq
+            metrics["Wq"][stable] = Wq
+            metrics["W"][stable] = Wq + 1 / mu_s
+            metrics["L"][stable] = Lq + a_s
+            metrics["P0"][stable] = np.exp(log_p0)
+
+            if n is not None:
+                n_s = np.asarray(n, dtype=float)[stable]
+                values = np.where(np.isnan(n_s), 0, n_s).astype(np.int64)
+                metrics["Pn"] = np.full(rows, np.nan)
+                metrics["Pn"][stable] = np.where(np.isnan(n_s), np.nan, np.exp(log_pn(values)))
+
+            if k is not None:
+                k_s = np.asarray(k, dtype=float)[stable]
+                values = np.where(np.isnan(k_s), 0, k_s).astype(np.int64)
+                # k ≥ c-1: cauda geométrica P(N>k) = P(N≥c)·ρ^(k-c+1); k < c-1: 1 - Σ_{j≤k} Pj
+                P_greater = wait_probability * rho_s ** np.maximum(values - s_s + 1, 0)
+                below = values < s_s - 1
+                if below.any():
+                    head = np.zeros(a_s.shape)
+                    for j in range(int(values[below].max()) + 1):
+                        head = np.where(j <= values, head + np.exp(log_pn(np.full(a_s.shape, j))), head)
+                    P_greater = np.where(below, 1 - head, P_greater)
+                metrics["P_greater_k"] = np.full(rows, np.nan)
+                metrics["P_greater_k"][stable] = np.where(np.isnan(k_s), np.nan, P_greater)
+
+    for name in ("Pn", "P_greater_k"):
+        if (n if name == "Pn" else k) is not None and name not in metrics:
+            metrics[name] = np.full(rows, np.nan)
+
+    metrics["error"] = error
+    return metrics
+
+
+def sweep_chunk(chunk: pd.DataFrame) -> pd.DataFrame:
+    """Colunas de entrada seguidas das métricas do bloco"""
+    metrics = compute_metrics(
+        _column(chunk, "lambda", required=True),
+        _column(chunk, "mu", required=True),
+        _column(chunk, "n"),
+        _column(chunk, "k"),
+        _column(chunk, "c")
+    )
+    result = chunk.reset_index(drop=True).copy()
+    # Colunas reconhecidas viram float e as demais texto: o esquema do Parquet não muda entre
+    # blocos (uma coluna vazia no primeiro bloco e com texto depois não quebra a escrita)
+    known = {alias for aliases in COLUMN_ALIASES.values() for alias in aliases}
+    for column in result.columns:
+        if column in known:
+            result[column] = pd.to_numeric(result[column], errors="coerce").astype(float)
+        else:
+            result[column] = result[column].astype("string")
+    for name, values in metrics.items():
+        result[name] = values
+    result["error"] = result["error"].astype(str)
+    return result
+
+
+def file_format(name: str, default: str = "csv") -> str:
+    """csv ou parquet, pela extensão do arquivo"""
+    lowered = name.lower()
+    if lowered.endswith((".parquet", ".pq")):
+        return "parquet"
+    if lowered.endswith((".csv", ".txt")):
+        return "csv"
+    return default
+
+
+def iter_chunks(source: Source, fmt: str, chunk_rows: int = SWEEP_CHUNK_ROWS) -> Iterator[pd.DataFrame]:
+    """Blocos de cenários do arquivo de entrada"""
+    if fmt == "parquet":
+        import pyarrow.parquet as pq
+
+        for batch in pq.ParquetFile(source).iter_batches(batch_size=chunk_rows):
+            yield batch.to_pandas()
+    else:
+        yield from pd.read_csv(source, chunksize=chunk_rows)
+
+
+class _ByteSink:
+    """Arquivo de escrita que acumula bytes até alguém recolhê-los (saída em streaming)"""
+
+    def __init__(self):
+        self.parts = []
+        self.closed = False
+
+    def write(self, data) -> int:
+        self.parts.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def drain(self) -> bytes:
+        data = b"".join(self.parts)
+        self.parts.clear()
+        return data
+
+
+def _swept_chunks(source: Source, input_format: str, chunk_rows: int,
+                  counts: Optional[Dict[str, int]]) -> Iterator[pd.DataFrame]:
+    for chunk in iter_chunks(source, input_format, chunk_rows):
+        result = sweep_chunk(chunk)
+        if counts is not None:
+            counts["rows"] = counts.get("rows", 0) + len(result)
+            counts["errors"] = counts.get("errors", 0) + int((result["error"] != "").sum())
+        yield result
+
+
+def iter_sweep(source: Source, input_format: str, output_format: str, chunk_rows: int = SWEEP_CHUNK_ROWS,
+               counts: Optional[Dict[str, int]] = None) -> Iterator[bytes]:
+    """
+    Resultados em bytes, bloco a bloco (CSV com cabeçalho no primeiro; Parquet um row group por bloco)
+    counts, se passado, acumula linhas e cenários inválidos/instáveis
+    """
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+    import pyarrow.parquet as pq
+
+    sink = _ByteSink()
+    writer = None
+    header = True
+    for result in _swept_chunks(source, input_format, chunk_rows, counts):
+        table = pa.Table.from_pandas(result, preserve_index=False)
+        if output_format == "parquet":
+            if writer is None:
+                writer = pq.ParquetWriter(sink, table.schema)
+            writer.write_table(table.cast(writer.schema))
+        else:
+            # Escritor CSV do Arrow: ~10x mais rápido que DataFrame.to_csv nos floats
+            pa_csv.write_csv(table, sink, pa_csv.WriteOptions(include_header=header, quoting_style="needed"))
+            header = False
+        yield sink.drain()
+
+    if output_format == "parquet" and writer is not None:
+        writer.close()
+        yield sink.drain()
+
+
+def sweep_file(input_path: str, output_path: str, chunk_rows: int = SWEEP_CHUNK_ROWS) -> Dict[str, int]:
+    """Varre o arquivo de entrada gravando a saída bloco a bloco; devolve as contagens"""
+    counts = {"rows": 0, "errors": 0}
+    temp_path = f"{output_path}.{os.getpid()}.tmp"
+    with open(temp_path, "wb") as output:
+        for data in iter_sweep(input_path, file_format(input_path), file_format(output_path), chunk_rows, counts):
+            output.write(data)
+    os.replace(temp_path, output_path)
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Varredura de cenários de fila (CSV/Parquet)")
+    parser.add_argument("input", help="arquivo .csv ou .parquet com colunas lambda, mu (n, k, c opcionais)")
+    parser.add_argument("output", help="arquivo .csv ou .parquet de saída ('-' para CSV na saída padrão)")
+    parser.add_argument("--chunk-rows", type=int, default=SWEEP_CHUNK_ROWS)
+    args = parser.parse_args()
+
+    if args.output == "-":
+        for data in iter_sweep(args.input, file_format(args.input), "csv", args.chunk_rows):
+            sys.stdout.buffer.write(data)
+        return
+
+    counts = sweep_file(args.input, args.output, args.chunk_rows)
+    print(f"✅ {counts['rows']} cenários ({counts['errors']} inválidos ou instáveis) → {args.output}",
+          file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
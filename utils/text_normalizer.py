@@ -0,0 +1,88 @@
+"""
+Normalizador do texto extraído por OCR
+Passagem única com padrões pré-compilados: símbolos só são corrigidos em
+contexto matemático e números são preservados
+"""
+
+import re
+
+
+# Leituras erradas frequentes de cada símbolo (só valem antes de "=")
+SYMBOL_CONFUSIONS = {
+    'λ': 'λΛÀÁÂÃʎ',
+    'μ': 'μµuU',
+    'ρ': 'ρp',
+}
+
+_SYMBOL_MAP = {wrong: symbol for symbol, wrongs in SYMBOL_CONFUSIONS.items() for wrong in wrongs}
+
+# Número com O lido no lugar de 0 ("1O" → "10") e separador decimal, sem o primeiro dígito
+_NUMBER_REST = r'(?:[\dO]|[.,](?=\d))*'
+_NUMBER = r'\d' + _NUMBER_REST
+_SYMBOLS = "".join(_SYMBOL_MAP)
+
+# O padrão começa por uma classe de caracteres (o primeiro caractere de qualquer token): o
+# motor do re pula em C as posições que não podem iniciar um token, em vez de tentar cada
+# alternativa em cada posição. As alternativas conferem esse caractere com lookbehind.
+# Palavras não são tokens: símbolos, µ e "|" só casam fora delas (o "p" de "pista" nunca é
+# visto isolado) pelas condições de contorno; "(?<!\w.)" olha o caractere antes do primeiro.
+# Um µ logo depois de número com O ("1Oµ") continua isolado, como quando o número era consumido antes
+_TOKEN_RE = re.compile(
+    rf'[\s\d{_SYMBOLS}|]'
+    rf'(?:(?<=\s)(?P<space>\s+|(?<=[^\S ]))'
+    rf'|(?<=\d)(?P<fraction>(?P<numerator>{_NUMBER_REST})\s*/\s*(?P<denominator>{_NUMBER}))'
+    rf'|(?<=\d)(?P<number>{_NUMBER_REST})'
+    rf'|(?<!\w.)(?<=[{_SYMBOLS}])(?!\w)\s*(?P<operator>[=≈])\s*'
+    rf'|(?<=µ)(?:(?<![^\W\d_].)|(?<=\dO.)|(?<=\dOO.))(?![^\W\d_])(?P<micro>)'
+    rf'|(?<=\|)(?<=[^\W\d_].)(?=[^\W\d_])(?P<pipe>))'
+)
+
+
+def _normalize_number(token: str) -> str:
+    """Corrige O→0 e converte vírgula decimal sem alterar o valor"""
+    token = token.replace('O', '0')
+
+    if ',' in token:
+        if token.count(',') == 1 and '.' in token and token.index('.') < token.index(','):
+            # 1.234,5 → 1234.5
+            token = token.replace('.', '').replace(',', '.')
+        elif token.count(',') == 1 and '.' not in token:
+            # 1,5 → 1.5
+            token = token.replace(',', '.')
+
+    return token
+
+
+def _replace(match: re.Match) -> str:
+    """Aplica a correção correspondente ao tipo do token (o primeiro caractere é match[0][0])"""
+    kind = match.lastgroup
+    token = match.group(0)
+
+    if kind == 'space':
+        return ' '
+    if kind == 'number':
+        return _normalize_number(token)
+    if kind == 'fraction':
+        return f"{_normalize_number(token[0] + match.group('numerator'))}/{_normalize_number(match.group('denominator'))}"
+    if kind == 'operator':
+        # O grupo do operador fecha por último no padrão "símbolo = "
+        return f"{_SYMBOL_MAP[token[0]]}{match.group('operator')}"
+    if kind == 'micro':
+        return 'μ'
+    if kind == 'pipe':
+        return 'l'
+    return token
+
+
+def normalize_ocr_text(raw_text: str) -> str:
+    """
+    Normaliza o texto do OCR em uma única passagem
+    - espaços repetidos viram um só
+    - "À = 2", "u = 3", "p = 0,5" → "λ=2", "μ=3", "ρ=0.5" (apenas antes de "=")
+    - números preservados: "1O" → "10", "1,5" → "1.5", "1 / 3" → "1/3"
+    - "|" entre letras vira "l"
+    """
+    if not raw_text:
+        return ""
+
+    return _TOKEN_RE.sub(_replace, raw_text).strip()
@@ -0,0 +1,250 @@
+"""
+Rastreamento e métricas do sistema Bosquinho
+
+- Spans por nó do LangGraph, por chamada ao Groq e por etapa do OCR
+- Exportação em JSONL (TRACE_JSONL=caminho) e endpoint Prometheus/OpenMetrics
+  (TRACE_METRICS_PORT=porta, rota /metrics)
+- Logs com nível (LOG_LEVEL, padrão WARNING): com debug desligado nada é formatado
+
+Sem exportador configurado, span() devolve um contexto vazio e record_span() retorna
+imediatamente, então produção não paga pelo rastreamento.
+"""
+
+import os
+import json
+import time
+import uuid
+import logging
+import threading
+import contextvars
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+
+LOG_LEVEL = os.getenv("LOG_LEVEL", "WARNING").upper()
+TRACE_JSONL = os.getenv("TRACE_JSONL")
+TRACE_METRICS_PORT = os.getenv("TRACE_METRICS_PORT")
+
+# Limites dos buckets dos histogramas (segundos)
+DURATION_BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+METRIC_PREFIX = "bosquinho"
+
+_trace_id: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar("trace_id", default=None)
+
+
+def get_logger(name: str) -> logging.Logger:
+    """Logger do sistema com o nível de LOG_LEVEL (um único handler por processo)"""
+    root = logging.getLogger(METRIC_PREFIX)
+    if not root.handlers:
+        handler = logging.StreamHandler()
+        handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s - %(message)s"))
+        root.addHandler(handler)
+        root.setLevel(LOG_LEVEL)
+        root.propagate = False
+    return root.getChild(name)
+
+
+def _escape_label(value: Any) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class MetricsRegistry:
+    """Histogramas e contadores em memória, exportados no formato texto do Prometheus"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._histograms: Dict[Tuple[str, Tuple], Dict[str, Any]] = {}
+        self._counters: Dict[Tuple[str, Tuple], float] = {}
+
+    def observe(self, name: str, value: float, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = {"buckets": [0] * len(DURATION_BUCKETS), "sum": 0.0, "count": 0}
+            for index, bound in enumerate(DURATION_BUCKETS):
+                if value <= bound:
+                    histogram["buckets"][index] += 1
+            histogram["sum"] += value
+            histogram["count"] += 1
+
+    def count(self, name: str, value: float = 1.0, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0.0) + value
+
+    @staticmethod
+    def _labels(labels: Tuple, extra: Optional[Tuple] = None) -> str:
+        items = list(labels) + ([extra] if extra else [])
+        if not items:
+            return ""
+        return "{" + ",".join(f'{key}="{_escape_label(value)}"' for key, value in items) + "}"
+
+    def render(self) -> str:
+        """Texto no formato de exposição do Prometheus (compatível com OpenMetrics)"""
+        lines = []
+        with self._lock:
+            histograms = sorted(self._histograms.items())
+            counters = sorted(self._counters.items())
+
+        typed = set()
+        for (name, labels), histogram in histograms:
+            metric = f"{METRIC_PREFIX}_{name}"
+            if metric not in typed:
+                lines.append(f"# TYPE {metric} histogram")
+                typed.add(metric)
+            for bound, bucket in zip(DURATION_BUCKETS, histogram["buckets"]):
+                lines.append(f"{metric}_bucket{self._labels(labels, ('le', f'{bound:g}'))} {bucket}")
+            lines.append(f"{metric}_bucket{self._labels(labels, ('le', '+Inf'))} {histogram['count']}")
+            lines.append(f"{metric}_sum{self._labels(labels)} {histogram['sum']:.6f}")
+            lines.append(f"{metric}_count{self._labels(labels)} {histogram['count']}")
+
+        for (name, labels), value in counters:
+            metric = f"{METRIC_PREFIX}_{name}"
+            if metric not in typed:
+                lines.append(f"# TYPE {metric} counter")
+                typed.add(metric)
+            lines.append(f"{metric}{self._labels(labels)} {value:g}")
+
+        return "\n".join(lines) + "\n"
+
+
+class Tracer:
+    """Registra spans e métricas nos exportadores habilitados"""
+
+    def __init__(self, jsonl_path: Optional[str] = None, metrics_port: Optional[int] = None):
+        self.jsonl_path = jsonl_path
+        self.metrics = MetricsRegistry()
+        self.metrics_enabled = metrics_port is not None
+        self.enabled = bool(jsonl_path) or self.metrics_enabled
+        self._jsonl_lock = threading.Lock()
+        self._jsonl_file = None
+        self._server = None
+
+        if self.metrics_enabled:
+            self._server = start_metrics_server(self.metrics, metrics_port)
+
+    def _write_jsonl(self, record: Dict[str, Any]):
+        line = json.dumps(record, ensure_ascii=False, default=str)
+        with self._jsonl_lock:
+            if self._jsonl_file is None:
+                self._jsonl_file = open(self.jsonl_path, "a", encoding="utf-8", buffering=1)
+            self._jsonl_file.write(line + "\n")
+
+    def record_span(self, name: str, duration: float, error: Optional[str] = None, **attributes):
+        """Registra um span já medido (ex.: tempos devolvidos pelo worker de OCR)"""
+        if not self.enabled:
+            return
+
+        if self.metrics_enabled:
+            self.metrics.observe("span_duration_seconds", duration, span=name)
+            if error:
+                self.metrics.count("span_errors_total", span=name)
+
+        if self.jsonl_path:
+            record = {
+                "ts": time.time(),
+                "trace_id": _trace_id.get(),
+                "span": name,
+                "duration_ms": round(duration * 1000, 3),
+                **attributes
+            }
+            if error:
+                record["error"] = error
+            self._write_jsonl(record)
+
+    @contextmanager
+    def span(self, name: str, **attributes) -> Iterator[Dict[str, Any]]:
+        """Mede o bloco; atributos podem ser adicionados ao dicionário devolvido"""
+        start = time.perf_counter()
+        error = None
+        try:
+            yield attributes
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            self.record_span(name, time.perf_counter() - start, error, **attributes)
+
+
+@contextmanager
+def _noop_span(name: str, **attributes) -> Iterator[Dict[str, Any]]:
+    yield attributes
+
+
+def _metrics_handler(registry: MetricsRegistry):
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?")[0] != "/metrics":
+                self.send_response(404)
+                self.end_headers()
+                return
+            body = registry.render().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    return MetricsHandler
+
+
+def start_metrics_server(registry: MetricsRegistry, port: int, host: str = "127.0.0.1") -> Optional[ThreadingHTTPServer]:
+    """Sobe o endpoint /metrics em uma thread daemon"""
+    try:
+        server = ThreadingHTTPServer((host, int(port)), _metrics_handler(registry))
+    except OSError as e:
+        # Outro processo (ex.: segunda sessão) já expõe a porta
+        get_logger("tracing").warning("Endpoint de métricas não iniciado na porta %s: %s", port, e)
+        return None
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+tracer = Tracer(TRACE_JSONL, int(TRACE_METRICS_PORT) if TRACE_METRICS_PORT else None)
+
+
+def span(name: str, **attributes):
+    """Span do rastreador global (contexto vazio quando o rastreamento está desligado)"""
+    if not tracer.enabled:
+        return _noop_span(name, **attributes)
+    return tracer.span(name, **attributes)
+
+
+def record_span(name: str, duration: float, error: Optional[str] = None, **attributes):
+    """Registra no rastreador global um span medido externamente"""
+    if tracer.enabled:
+        tracer.record_span(name, duration, error, **attributes)
+
+
+def observe(name: str, value: float, **labels):
+    """Observa um valor em um histograma (ex.: tempo até o primeiro token)"""
+    if tracer.metrics_enabled:
+        tracer.metrics.observe(name, value, **labels)
+
+
+def count(name: str, value: float = 1.0, **labels):
+    """Incrementa um contador (ex.: tokens por rota)"""
+    if tracer.metrics_enabled:
+        tracer.metrics.count(name, value, **labels)
+
+
+@contextmanager
+def trace(name: str, **attributes) -> Iterator[Dict[str, Any]]:
+    """Abre um trace (um turno do chat): os spans internos compartilham o trace_id"""
+    if not tracer.enabled:
+        yield attributes
+        return
+
+    token = _trace_id.set(uuid.uuid4().hex[:16])
+    try:
+        with span(name, **attributes) as attrs:
+            yield attrs
+    finally:
+        _trace_id.reset(token)
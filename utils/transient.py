@@ -0,0 +1,162 @@
+"""
+Análise transitória da M/M/1: Pn(t) e E[N(t)] a partir de um estado inicial
+
+As fórmulas do MM1Calculator valem em regime permanente. Para saber como a fila cresce
+depois que um pico começa (ex.: P(N>k) 10 minutos após a abertura), a cadeia de
+nascimento e morte é truncada em K estados e resolvida por uniformização:
+
+    p(t) = Σ_n e^{-Λt} (Λt)^n / n! · v_n,    v_n = v_{n-1} P,    P = I + Q/Λ
+
+Os produtos v_n = p(0) Pⁿ não dependem de t, então são calculados uma vez e somados com
+os pesos de Poisson de todos os instantes da grade. O número de termos é adaptativo:
+para quando o peso de Poisson restante de todos os instantes fica abaixo de ε, ou antes,
+quando v_n para de mudar (a cadeia já chegou ao regime permanente).
+"""
+
+import math
+from typing import Any, Dict, Optional, Sequence
+
+import numpy as np
+
+# Tolerância padrão (massa de probabilidade desprezada no truncamento)
+TRANSIENT_EPSILON = 1e-10
+# Limites de segurança: estados da cadeia truncada e termos da série
+TRANSIENT_MAX_STATES = 20000
+TRANSIENT_MAX_TERMS = 1_000_000
+
+
+def _poisson_upper_bound(mean: float, epsilon: float) -> int:
+    """
+    m com P(Poisson(mean) > m) < ε, pela desigualdade de Bernstein
+    P(X ≥ mean + t) ≤ exp(-t² / (2(mean + t/3))) - fórmula fechada, sem somar a série
+    """
+    if mean <= 0:
+        return 0
+    log_inverse = math.log(1 / epsilon)
+    margin = log_inverse / 3 + math.sqrt(log_inverse ** 2 / 9 + 2 * log_inverse * mean)
+    return math.ceil(mean + margin)
+
+
+def truncation_level(lambda_rate: float, mu_rate: float, horizon: float, initial_state: int = 0,
+                     epsilon: float = TRANSIENT_EPSILON) -> int:
+    """
+    Número de clientes K a partir do qual P(N(t) > K) < ε para todo t ≤ horizon
+    Com ρ < 1, N(t) fica estocasticamente abaixo de n0 + G, com G geométrica
+    (P(G > m) = ρ^{m+1}); em qualquer caso, nunca passa de n0 + chegadas em [0, t] (Poisson(λt))
+    """
+    rho = lambda_rate / mu_rate
+    arrivals = lambda_rate * horizon
+    if 0 < rho < 1:
+        level = math.ceil(math.log(epsilon) / math.log(rho))
+        # A cota de Poisson só ajuda em horizontes curtos (λt abaixo da cota geométrica)
+        if arrivals < level:
+            level = min(level, _poisson_upper_bound(arrivals, epsilon))
+        return initial_state + level
+    return initial_state + _poisson_upper_bound(arrivals, epsilon)
+
+
+def uniformize(birth: np.ndarray, death: np.ndarray, initial: np.ndarray, times: Sequence[float],
+               epsilon: float = TRANSIENT_EPSILON) -> Dict[str, Any]:
+    """
+    Distribuição transitória de uma cadeia de nascimento e morte finita
+    birth[i] é a taxa i → i+1 (birth[-1] = 0) e death[i] a taxa i → i-1 (death[0] = 0).
+    Devolve probabilities com forma (instantes, estados) e terms (termos da série usados)
+    """
+    times = np.asarray(times, dtype=float)
+    birth = np.asarray(birth, dtype=float)
+    death = np.asarray(death, dtype=float)
+    vector = np.asarray(initial, dtype=float).copy()
+
+    rate = float((birth + death).max())
+    probabilities = np.zeros((times.shape[0], vector.shape[0]))
+    if rate == 0:
+        probabilities[:] = vector
+        return {"probabilities": probabilities, "terms": 0}
+
+    # Matriz P tridiagonal, guardada só pelas três diagonais
+    up = birth / rate
+    down = death / rate
+    stay = 1 - up - down
+
+    # Pesos de Poisson em escala logarítmica (e^{-Λt} some para Λt > ~745)
+    scaled = rate * times
+    with np.errstate(divide="ignore"):
+        log_scaled = np.log(scaled)
+    log_weight = -scaled
+    accumulated = np.zeros(times.shape[0])
+    # Sem contribuição relevante para o resultado: ignora o peso na soma
+    floor = math.log(epsilon) - 40
+
+    for n in range(TRANSIENT_MAX_TERMS):
+        if n:
+            log_weight = log_weight + log_scaled - math.log(n)
+            following = stay * vector
+            following[1:] += up[:-1] * vector[:-1]
+            following[:-1] += down[1:] * vector[1:]
+
+            # Regime permanente: os termos seguintes são todos iguais a v_n
+            if np.abs(following - vector).sum() < epsilon * 1e-3:
+                probabilities += (1 - accumulated)[:, None] * following[None, :]
+                return {"probabilities": probabilities, "terms": n}
+            vector = following
+
+        active = log_weight > floor
+        if active.any():
+            weight = np.exp(log_weight[active])
+            probabilities[active] += weight[:, None] * vector[None, :]
+            accumulated[active] += weight
+
+        # Parar só depois da moda de todos os instantes (antes dela o peso restante ainda cresce)
+        if n >= scaled.max() and (1 - accumulated).max() < epsilon:
+            return {"probabilities": probabilities, "terms": n + 1}
+
+    raise ValueError(f"Uniformização não convergiu em {TRANSIENT_MAX_TERMS} termos; reduza o horizonte de tempo")
+
+
+def transient_mm1(lambda_rate: float, mu_rate: float, times: Sequence[float], initial_state: int = 0,
+                  capacity: Optional[int] = None, epsilon: float = TRANSIENT_EPSILON) -> Dict[str, Any]:
+    """
+    Pn(t) e E[N(t)] da M/M/1 em cada instante de times, partindo de N(0) = initial_state
+    capacity limita o sistema (M/M/1/K); sem ela, a truncagem é escolhida para que a massa
+    perdida fique abaixo de ε. Vale também para ρ ≥ 1 (a fila cresce sem regime permanente)
+    """
+    if lambda_rate < 0:
+        raise ValueError("Taxa de chegada (λ) deve ser não-negativa")
+    if mu_rate <= 0:
+        raise ValueError("Taxa de atendimento (μ) deve ser positiva")
+    if initial_state < 0 or int(initial_state) != initial_state:
+        raise ValueError("Estado inicial deve ser inteiro não-negativo")
+
+    times = np.atleast_1d(np.asarray(times, dtype=float))
+    if (times < 0).any() or not np.isfinite(times).all():
+        raise ValueError("Instantes de tempo devem ser finitos e não-negativos")
+
+    if capacity is None:
+        capacity = truncation_level(lambda_rate, mu_rate, float(times.max()), initial_state, epsilon)
+    if capacity < initial_state:
+        raise ValueError("Capacidade menor que o estado inicial")
+    if capacity + 1 > TRANSIENT_MAX_STATES:
+        raise ValueError(f"Truncagem exigiria {capacity + 1} estados (máximo {TRANSIENT_MAX_STATES}); "
+                         "reduza o horizonte de tempo")
+
+    states = np.arange(capacity + 1)
+    birth = np.where(states < capacity, float(lambda_rate), 0.0)
+    death = np.where(states > 0, float(mu_rate), 0.0)
+    initial = np.zeros(capacity + 1)
+    initial[int(initial_state)] = 1.0
+
+    solution = uniformize(birth, death, initial, times, epsilon)
+    probabilities = solution["probabilities"]
+    return {
+        "times": times,
+        "states": states,
+        "Pn": probabilities,
+        "L": probabilities @ states,
+        "capacity": capacity,
+        "terms": solution["terms"]
+    }
+
+
+def prob_greater_than(result: Dict[str, Any], k: int) -> np.ndarray:
+    """P(N(t) > k) em cada instante de um resultado de transient_mm1"""
+    return result["Pn"][:, k + 1:].sum(axis=1)
@@ -0,0 +1,47 @@
+"""
+Explorador "e se...?": métricas em uma grade de λ para μ e c fixos
+
+A grade cobre toda a faixa estável (ρ de 0 a 1) de uma vez, com a calculadora vetorizada
+da varredura; mover o λ só recorta a janela em volta do ponto atual, sem recalcular.
+Uma grade nova só é necessária quando μ ou c mudam.
+"""
+
+from typing import Any, Dict
+
+import numpy as np
+import pandas as pd
+
+from utils.sweep import compute_metrics
+
+# Pontos da grade e utilização máxima (perto de ρ = 1 as métricas explodem)
+WHAT_IF_GRID_POINTS = 600
+WHAT_IF_MAX_RHO = 0.98
+# Largura da janela desenhada em volta do λ atual (±50%)
+WHAT_IF_SPAN = 0.5
+
+CHART_METRICS = ["L", "Wq", "rho"]
+
+
+def build_grid(mu_rate: float, servers: int = 1, points: int = WHAT_IF_GRID_POINTS) -> pd.DataFrame:
+    """Métricas para λ de ~0 até WHAT_IF_MAX_RHO·c·μ (μ e c fixos)"""
+    lambdas = np.linspace(0, WHAT_IF_MAX_RHO * servers * mu_rate, points + 1)[1:]
+    metrics = compute_metrics(lambdas, np.full(points, float(mu_rate)), c=np.full(points, float(servers)))
+    grid = pd.DataFrame({name: values for name, values in metrics.items() if name != "error"})
+    grid.insert(0, "lambda", lambdas)
+    return grid
+
+
+def window(grid: pd.DataFrame, lambda_rate: float, span: float = WHAT_IF_SPAN) -> pd.DataFrame:
+    """Recorte da grade em volta de λ (a grade está ordenada por λ)"""
+    low, high = np.searchsorted(grid["lambda"].to_numpy(), [lambda_rate * (1 - span), lambda_rate * (1 + span)])
+    # λ além da grade (perto de ρ = 1 ou instável): mostra o fim da faixa estável
+    low = min(low, len(grid) - 2)
+    return grid.iloc[low:max(high, low + 2)]
+
+
+def point_metrics(lambda_rate: float, mu_rate: float, servers: int = 1) -> Dict[str, Any]:
+    """Métricas exatas do ponto escolhido ({"error": ...} se inválido ou instável)"""
+    metrics = compute_metrics(np.array([lambda_rate]), np.array([mu_rate]), c=np.array([float(servers)]))
+    if metrics["error"][0]:
+        return {"error": metrics["error"][0]}
+    return {name: float(values[0]) for name, values in metrics.items() if name != "error"}